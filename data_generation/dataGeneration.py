@@ -1,181 +1,399 @@
-import random
-from datetime import datetime, timedelta
-import csv
-
-def write_csv(filename, headers, data):
-    with open(filename, 'w', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=headers)
-        writer.writeheader()
-        writer.writerows(data)
-
-class DataGenerator:
-    def __init__(self, num_users, num_employers, num_companies, num_job_offers, num_applications):
-        self.num_users = num_users
-        self.num_employers = num_employers  # New parameter
-        self.num_companies = num_companies
-        self.num_job_offers = num_job_offers
-        self.num_applications = num_applications
-        
-        # Store IDs for reference
-        self.employer_ids = []
-        self.worker_ids = []
-
-    def generate_users_and_split(self):
-        users = []
-        # Generate all users first
-        for i in range(1, self.num_users + 1):
-            users.append({
-                "UserID": i,
-                "FirstName": f"First{i}",
-                "Surname": f"Last{i}",
-                "Name": f"First{i} Last{i}",
-                "Email": f"user{i}@example.com",
-                "PhoneNumber": f"+1-555-{random.randint(100,999)}-{random.randint(1000,9999)}"
-            })
-        
-        # Randomly select employer IDs
-        self.employer_ids = random.sample(range(1, self.num_users + 1), self.num_employers)
-        # Remaining IDs are workers
-        self.worker_ids = [i for i in range(1, self.num_users + 1) if i not in self.employer_ids]
-        
-        return users
-
-    def generate_employers(self):
-        employers = []
-        for user_id in self.employer_ids:
-            employers.append({
-                "CompanyID": None,  # Will be updated after company creation
-                "UserID": user_id
-            })
-        return employers
-
-    def generate_companies(self):
-        companies = []
-        # First create companies without CreatedBy
-        for i in range(1, self.num_companies + 1):
-            companies.append({
-                "CompanyID": i,
-                "CreatedBy": random.choice(self.employer_ids),  # Randomly assign an employer
-                "Name": f"Company{i}",
-            })
-        return companies
-
-    def update_employers_with_companies(self, employers, companies):
-        # Make sure each company gets exactly one employer
-        company_employer_pairs = []
-        available_employers = self.employer_ids.copy()
-        
-        # First, assign one unique employer to each company
-        for company in companies:
-            if not available_employers:  # If we run out of employers
-                raise ValueError("Not enough employers for companies. Each company needs a unique employer.")
-            
-            # Pick a random employer from available ones
-            employer_id = random.choice(available_employers)
-            available_employers.remove(employer_id)  # Remove this employer from available pool
-            
-            # Update company's CreatedBy
-            company["CreatedBy"] = employer_id
-            company_employer_pairs.append((company["CompanyID"], employer_id))
-        
-        # Now update employers list with company assignments
-        updated_employers = []
-        for employer in employers:
-            # Find if this employer was assigned a company
-            assigned_company = next(
-                (pair[0] for pair in company_employer_pairs if pair[1] == employer["UserID"]), 
-                None
-            )
-            updated_employers.append({
-                "CompanyID": assigned_company,  # Will be None if employer wasn't assigned a company
-                "UserID": employer["UserID"]
-            })
-        
-        return updated_employers
-
-    def generate_workers(self):
-        workers = []
-        for user_id in self.worker_ids:  # Only use non-employer user IDs
-            workers.append({
-                "UserID": user_id,
-                "Experiences": f"Experience for User{user_id}",
-                "Description": f"Worker{user_id} description"
-            })
-        return workers
-
-    def generate_locations(self, companies):
-        locations = []
-        # Generate exactly one location for each company
-        for company in companies:
-            locations.append({
-                "LocationID": company["CompanyID"],  # Match LocationID with CompanyID for simplicity
-                "CompanyID": company["CompanyID"],
-                "Number": str(random.randint(1, 999)),  # Building number
-                "Street": f"Street{random.randint(1, 50)}",  # More variety in street names
-                "City": random.choice([  # List of actual cities for more realism
-                    "Istanbul", "Ankara", "Izmir", "Antalya", "Bursa",
-                    "Eskisehir", "Konya", "Trabzon", "Gaziantep", "Adana"
-                ])
-            })
-        return locations
-    
-    def generate_job_offers(self, locations):
-        job_offers = []
-        for i in range(1, self.num_job_offers + 1):
-            location = random.choice(locations)
-            created_by = random.choice(self.employer_ids)  # Only employers can create job offers
-            job_offers.append({
-                "JobOfferID": i,
-                "LocationID": location["LocationID"],
-                "CreatedBy": created_by,
-                "Status": random.choice(["Open", "Confirmed", "Running", "Completed"]),
-                "Date": (datetime.now() - timedelta(days=random.randint(0, 365))).strftime("%Y-%m-%d"),
-                "StartTime": "09:00:00",
-                "EndTime": "17:00:00",
-                "MaxWage": round(random.uniform(20.0, 50.0), 2),
-                "WorkingDays": random.randint(1, 5),
-                "Hours": random.randint(4, 8)
-            })
-        return job_offers
-
-    def generate_applications(self, job_offers):
-        applications = []
-        for i in range(1, self.num_applications + 1):
-            worker_id = random.choice(self.worker_ids)  # Only workers can apply
-            job_offer_id = random.choice(job_offers)["JobOfferID"]
-            applications.append({
-                "WorkerID": worker_id,
-                "JobOfferID": job_offer_id,
-                "Status": random.choice(["Pending", "Accepted", "Refused"]),
-                "Date": (datetime.now() - timedelta(days=random.randint(0, 30))).strftime("%Y-%m-%d"),
-                "WageOffer": round(random.uniform(15.0, 45.0), 2)
-            })
-        return applications
-
-# Main execution
-num_users = 100  # Total users
-num_employers = 20  # Subset of users who are employers
-num_companies = 20 # This will also be the number of locations
-num_job_offers = 30
-num_applications = 40
-
-data_gen = DataGenerator(num_users, num_employers, num_companies, num_job_offers, num_applications)
-
-# Generate data in correct order
-users = data_gen.generate_users_and_split()
-employers = data_gen.generate_employers()
-companies = data_gen.generate_companies()
-employers = data_gen.update_employers_with_companies(employers, companies)
-locations = data_gen.generate_locations(companies)
-workers = data_gen.generate_workers()
-job_offers = data_gen.generate_job_offers(locations)
-applications = data_gen.generate_applications(job_offers)
-
-# Write CSV files
-write_csv("./data/User.csv", ["UserID", "FirstName", "Surname", "Name", "Email", "PhoneNumber"], users)
-write_csv("./data/Employer.csv", ["CompanyID", "UserID"], employers)
-write_csv("./data/Company.csv", ["CompanyID", "CreatedBy", "Name"], companies)
-write_csv("./data/Location.csv", ["LocationID", "CompanyID", "Number", "Street", "City"], locations)
-write_csv("./data/Worker.csv", ["UserID", "Experiences", "Description"], workers)
-write_csv("./data/JobOffer.csv", ["JobOfferID", "LocationID", "CreatedBy", "Status", "Date", "StartTime", "EndTime", "MaxWage", "WorkingDays", "Hours"], job_offers)
-write_csv("./data/Application.csv", ["WorkerID", "JobOfferID", "Status", "Date", "WageOffer"], applications)
\ No newline at end of file
+import argparse
+import random
+from datetime import datetime, timedelta
+import csv
+import os
+import time
+
+import numpy as np
+
+# City centres (latitude, longitude) the generated locations are scattered around
+CITY_COORDINATES = {
+    "Istanbul": (41.0082, 28.9784),
+    "Ankara": (39.9334, 32.8597),
+    "Izmir": (38.4237, 27.1428),
+    "Antalya": (36.8969, 30.7133),
+    "Bursa": (40.1885, 29.0610),
+    "Eskisehir": (39.7767, 30.5206),
+    "Konya": (37.8746, 32.4932),
+    "Trabzon": (41.0027, 39.7168),
+    "Gaziantep": (37.0662, 37.3833),
+    "Adana": (37.0000, 35.3213),
+}
+CITY_SPREAD_DEGREES = 0.05
+
+def write_csv(filename, headers, data):
+    with open(filename, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=headers)
+        writer.writeheader()
+        writer.writerows(data)
+
+class DataGenerator:
+    def __init__(self, num_users, num_employers, num_companies, num_job_offers, num_applications):
+        self.num_users = num_users
+        self.num_employers = num_employers  # New parameter
+        self.num_companies = num_companies
+        self.num_job_offers = num_job_offers
+        self.num_applications = num_applications
+        
+        # Store IDs for reference
+        self.employer_ids = []
+        self.worker_ids = []
+
+    def generate_users_and_split(self):
+        users = []
+        # Generate all users first
+        for i in range(1, self.num_users + 1):
+            users.append({
+                "UserID": i,
+                "FirstName": f"First{i}",
+                "Surname": f"Last{i}",
+                "Name": f"First{i} Last{i}",
+                "Email": f"user{i}@example.com",
+                "PhoneNumber": f"+1-555-{random.randint(100,999)}-{random.randint(1000,9999)}"
+            })
+        
+        # Randomly select employer IDs
+        self.employer_ids = random.sample(range(1, self.num_users + 1), self.num_employers)
+        # Remaining IDs are workers
+        employer_set = set(self.employer_ids)
+        self.worker_ids = [i for i in range(1, self.num_users + 1) if i not in employer_set]
+        
+        return users
+
+    def generate_employers(self):
+        employers = []
+        for user_id in self.employer_ids:
+            employers.append({
+                "CompanyID": None,  # Will be updated after company creation
+                "UserID": user_id
+            })
+        return employers
+
+    def generate_companies(self):
+        companies = []
+        # First create companies without CreatedBy
+        for i in range(1, self.num_companies + 1):
+            companies.append({
+                "CompanyID": i,
+                "CreatedBy": random.choice(self.employer_ids),  # Randomly assign an employer
+                "Name": f"Company{i}",
+            })
+        return companies
+
+    def update_employers_with_companies(self, employers, companies):
+        # Make sure each company gets exactly one employer
+        company_employer_pairs = []
+        available_employers = self.employer_ids.copy()
+        
+        if len(companies) > len(available_employers):  # If we run out of employers
+            raise ValueError("Not enough employers for companies. Each company needs a unique employer.")
+        
+        # First, assign one unique employer to each company: shuffling once
+        # replaces picking and removing random employers one at a time
+        random.shuffle(available_employers)
+        for company, employer_id in zip(companies, available_employers):
+            # Update company's CreatedBy
+            company["CreatedBy"] = employer_id
+            company_employer_pairs.append((company["CompanyID"], employer_id))
+        
+        # Now update employers list with company assignments
+        company_by_employer = {employer_id: company_id for company_id, employer_id in company_employer_pairs}
+        updated_employers = []
+        for employer in employers:
+            # Find if this employer was assigned a company
+            assigned_company = company_by_employer.get(employer["UserID"])
+            updated_employers.append({
+                "CompanyID": assigned_company,  # Will be None if employer wasn't assigned a company
+                "UserID": employer["UserID"]
+            })
+        
+        return updated_employers
+
+    def generate_workers(self):
+        workers = []
+        for user_id in self.worker_ids:  # Only use non-employer user IDs
+            workers.append({
+                "UserID": user_id,
+                "Experiences": f"Experience for User{user_id}",
+                "Description": f"Worker{user_id} description"
+            })
+        return workers
+
+    def generate_locations(self, companies):
+        locations = []
+        # Generate exactly one location for each company
+        for company in companies:
+            city = random.choice(list(CITY_COORDINATES))  # List of actual cities for more realism
+            lat, lon = CITY_COORDINATES[city]
+            locations.append({
+                "LocationID": company["CompanyID"],  # Match LocationID with CompanyID for simplicity
+                "CompanyID": company["CompanyID"],
+                "Number": str(random.randint(1, 999)),  # Building number
+                "Street": f"Street{random.randint(1, 50)}",  # More variety in street names
+                "City": city,
+                # Scattered around the city centre (about 5 km standard deviation)
+                "Latitude": round(random.gauss(lat, CITY_SPREAD_DEGREES), 6),
+                "Longitude": round(random.gauss(lon, CITY_SPREAD_DEGREES), 6)
+            })
+        return locations
+    
+    def generate_job_offers(self, locations):
+        job_offers = []
+        for i in range(1, self.num_job_offers + 1):
+            location = random.choice(locations)
+            created_by = random.choice(self.employer_ids)  # Only employers can create job offers
+            job_offers.append({
+                "JobOfferID": i,
+                "LocationID": location["LocationID"],
+                "CreatedBy": created_by,
+                "Status": random.choice(["Open", "Confirmed", "Running", "Completed"]),
+                "Date": (datetime.now() - timedelta(days=random.randint(0, 365))).strftime("%Y-%m-%d"),
+                "StartTime": "09:00:00",
+                "EndTime": "17:00:00",
+                "MaxWage": round(random.uniform(20.0, 50.0), 2),
+                "WorkingDays": random.randint(1, 5),
+                "Hours": random.randint(4, 8)
+            })
+        return job_offers
+
+    def generate_applications(self, job_offers):
+        applications = []
+        for i in range(1, self.num_applications + 1):
+            worker_id = random.choice(self.worker_ids)  # Only workers can apply
+            job_offer_id = random.choice(job_offers)["JobOfferID"]
+            applications.append({
+                "WorkerID": worker_id,
+                "JobOfferID": job_offer_id,
+                "Status": random.choice(["Pending", "Accepted", "Refused"]),
+                "Date": (datetime.now() - timedelta(days=random.randint(0, 30))).strftime("%Y-%m-%d"),
+                "WageOffer": round(random.uniform(15.0, 45.0), 2)
+            })
+        return applications
+
+CITIES = np.array(list(CITY_COORDINATES))
+CITY_CENTRES = np.array(list(CITY_COORDINATES.values()))
+JOB_STATUSES = np.array(["Open", "Confirmed", "Running", "Completed"])
+APPLICATION_STATUSES = np.array(["Pending", "Accepted", "Refused"])
+
+HEADERS = {
+    "User": ["UserID", "FirstName", "Surname", "Name", "Email", "PhoneNumber"],
+    "Employer": ["CompanyID", "UserID"],
+    "Company": ["CompanyID", "CreatedBy", "Name"],
+    "Location": ["LocationID", "CompanyID", "Number", "Street", "City", "Latitude", "Longitude"],
+    "Worker": ["UserID", "Experiences", "Description"],
+    "JobOffer": ["JobOfferID", "LocationID", "CreatedBy", "Status", "Date", "StartTime", "EndTime", "MaxWage", "WorkingDays", "Hours"],
+    "Application": ["WorkerID", "JobOfferID", "Status", "Date", "WageOffer"],
+}
+
+class CsvChunkWriter:
+    def __init__(self, filename, headers):
+        self.file = open(filename, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(headers)
+
+    def write(self, columns):
+        # None cells are written as empty strings, like csv.DictWriter does
+        self.writer.writerows(zip(*(
+            col.tolist() if isinstance(col, np.ndarray) else col for col in columns
+        )))
+
+    def close(self):
+        self.file.close()
+
+class ParquetChunkWriter:
+    def __init__(self, filename, headers):
+        import pyarrow  # optional dependency, only needed for --format parquet
+        import pyarrow.parquet
+        self.pa = pyarrow
+        self.headers = headers
+        self.filename = filename
+        self.writer = None
+
+    def write(self, columns):
+        table = self.pa.table(dict(zip(self.headers, columns)))
+        if self.writer is None:
+            self.writer = self.pa.parquet.ParquetWriter(self.filename, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+class BulkDataGenerator:
+    # NumPy version of DataGenerator for multi-million-row datasets: every
+    # table is produced column-wise in chunks of `chunk_size` rows and written
+    # straight to disk, so memory stays bounded by the chunk size plus a few
+    # per-user / per-job arrays. Output is reproducible for a given seed.
+    def __init__(self, num_users, num_employers, num_companies, num_job_offers, num_applications,
+                 seed=None, chunk_size=1_000_000):
+        if num_companies > num_employers:
+            raise ValueError("Not enough employers for companies. Each company needs a unique employer.")
+        self.num_users = num_users
+        self.num_employers = num_employers
+        self.num_companies = num_companies
+        self.num_job_offers = num_job_offers
+        self.num_applications = num_applications
+        self.chunk_size = chunk_size
+        self.rng = np.random.default_rng(seed)
+        self.today = np.datetime64(datetime.now().date(), 'D')
+
+        # Boolean membership mask instead of `i not in employer_ids` scans
+        self.employer_ids = np.sort(self.rng.choice(np.arange(1, num_users + 1, dtype=np.int32), num_employers, replace=False))
+        is_employer = np.zeros(num_users + 1, dtype=bool)
+        is_employer[self.employer_ids] = True
+        self.worker_ids = np.flatnonzero(~is_employer[1:]).astype(np.int32) + 1
+
+        # Company i is created by a unique employer; LocationID == CompanyID
+        self.company_creators = self.rng.permutation(self.employer_ids)[:num_companies]
+
+    def _chunks(self, total):
+        for start in range(0, total, self.chunk_size):
+            yield start, min(start + self.chunk_size, total)
+
+    def _dates(self, n, max_days_ago):
+        days = self.rng.integers(0, max_days_ago + 1, n)
+        return np.datetime_as_string(self.today - days, unit='D')
+
+    def write_users(self, out):
+        for start, end in self._chunks(self.num_users):
+            ids = np.arange(start + 1, end + 1).astype(str)
+            n = end - start
+            first = np.char.add("First", ids)
+            last = np.char.add("Last", ids)
+            phone = np.char.add(
+                np.char.add("+1-555-", self.rng.integers(100, 1000, n).astype(str)),
+                np.char.add("-", self.rng.integers(1000, 10000, n).astype(str))
+            )
+            out.write([ids, first, last, np.char.add(np.char.add(first, " "), last),
+                       np.char.add(np.char.add("user", ids), "@example.com"), phone])
+
+    def write_employers(self, out):
+        company_of = dict(zip(self.company_creators.tolist(), range(1, self.num_companies + 1)))
+        employer_ids = self.employer_ids.tolist()
+        out.write([[company_of.get(user_id) for user_id in employer_ids], employer_ids])
+
+    def write_companies(self, out):
+        ids = np.arange(1, self.num_companies + 1)
+        out.write([ids, self.company_creators, np.char.add("Company", ids.astype(str))])
+
+    def write_locations(self, out):
+        n = self.num_companies
+        ids = np.arange(1, n + 1)
+        cities = self.rng.integers(0, len(CITIES), n)
+        coordinates = np.round(self.rng.normal(CITY_CENTRES[cities], CITY_SPREAD_DEGREES), 6)
+        out.write([ids, ids, self.rng.integers(1, 1000, n).astype(str),
+                   np.char.add("Street", self.rng.integers(1, 51, n).astype(str)),
+                   CITIES[cities], coordinates[:, 0], coordinates[:, 1]])
+
+    def write_workers(self, out):
+        for start, end in self._chunks(len(self.worker_ids)):
+            ids = self.worker_ids[start:end].astype(str)
+            out.write([ids, np.char.add("Experience for User", ids),
+                       np.char.add(np.char.add("Worker", ids), " description")])
+
+    def write_job_offers(self, out):
+        for start, end in self._chunks(self.num_job_offers):
+            n = end - start
+            location_ids = self.rng.integers(1, self.num_companies + 1, n)
+            out.write([
+                np.arange(start + 1, end + 1),
+                location_ids,
+                # Offers are created by the employer owning the location
+                self.company_creators[location_ids - 1],
+                JOB_STATUSES[self.rng.integers(0, len(JOB_STATUSES), n)],
+                self._dates(n, 365),
+                np.full(n, "09:00:00"),
+                np.full(n, "17:00:00"),
+                np.round(self.rng.uniform(20.0, 50.0, n), 2),
+                self.rng.integers(1, 6, n),
+                self.rng.integers(4, 9, n),
+            ])
+
+    def write_applications(self, out):
+        num_workers = len(self.worker_ids)
+
+        # Applications per job offer, drawn in chunks to keep memory bounded
+        per_job = np.zeros(self.num_job_offers, dtype=np.int64)
+        for start, end in self._chunks(self.num_applications):
+            per_job += np.bincount(self.rng.integers(0, self.num_job_offers, end - start),
+                                   minlength=self.num_job_offers)
+        # A worker applies at most once per job offer
+        np.minimum(per_job, num_workers, out=per_job)
+
+        # Each job offer takes a run of distinct workers starting at a random
+        # offset, which keeps (JobOfferID, WorkerID) unique without a global set
+        jobs_per_chunk = max(1, self.chunk_size * self.num_job_offers // max(1, self.num_applications))
+        for job_start in range(0, self.num_job_offers, jobs_per_chunk):
+            counts = per_job[job_start:job_start + jobs_per_chunk]
+            n = int(counts.sum())
+            if n == 0:
+                continue
+            job_ids = np.repeat(np.arange(job_start + 1, job_start + len(counts) + 1), counts)
+            offsets = np.repeat(self.rng.integers(0, num_workers, len(counts)), counts)
+            rank = np.arange(n) - np.repeat(np.cumsum(counts) - counts, counts)
+            out.write([
+                self.worker_ids[(offsets + rank) % num_workers],
+                job_ids,
+                APPLICATION_STATUSES[self.rng.integers(0, len(APPLICATION_STATUSES), n)],
+                self._dates(n, 30),
+                np.round(self.rng.uniform(15.0, 45.0, n), 2),
+            ])
+
+    def write_all(self, out_dir, fmt='csv'):
+        writer_class = ParquetChunkWriter if fmt == 'parquet' else CsvChunkWriter
+        # Generate data in correct order
+        for table, write in [
+            ("User", self.write_users),
+            ("Employer", self.write_employers),
+            ("Company", self.write_companies),
+            ("Location", self.write_locations),
+            ("Worker", self.write_workers),
+            ("JobOffer", self.write_job_offers),
+            ("Application", self.write_applications),
+        ]:
+            start = time.perf_counter()
+            out = writer_class(os.path.join(out_dir, f"{table}.{fmt}"), HEADERS[table])
+            write(out)
+            out.close()
+            print(f"  {table}: {time.perf_counter() - start:.1f}s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate synthetic Job2main data")
+    parser.add_argument('--users', type=int, default=100, help="total users")
+    parser.add_argument('--employers', type=int, default=20, help="subset of users who are employers")
+    parser.add_argument('--companies', type=int, default=20, help="this will also be the number of locations")
+    parser.add_argument('--job-offers', type=int, default=30)
+    parser.add_argument('--applications', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=None, help="seed for reproducible output")
+    parser.add_argument('--bulk', action='store_true', help="use the chunked NumPy generator (large datasets)")
+    parser.add_argument('--chunk-size', type=int, default=1_000_000, help="rows per chunk in --bulk mode")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help="output format in --bulk mode")
+    parser.add_argument('--out-dir', default='./data')
+    args = parser.parse_args()
+
+    if args.bulk:
+        BulkDataGenerator(
+            args.users, args.employers, args.companies, args.job_offers, args.applications,
+            seed=args.seed, chunk_size=args.chunk_size
+        ).write_all(args.out_dir, args.format)
+    else:
+        random.seed(args.seed)
+        data_gen = DataGenerator(args.users, args.employers, args.companies, args.job_offers, args.applications)
+
+        # Generate data in correct order
+        users = data_gen.generate_users_and_split()
+        employers = data_gen.generate_employers()
+        companies = data_gen.generate_companies()
+        employers = data_gen.update_employers_with_companies(employers, companies)
+        locations = data_gen.generate_locations(companies)
+        workers = data_gen.generate_workers()
+        job_offers = data_gen.generate_job_offers(locations)
+        applications = data_gen.generate_applications(job_offers)
+
+        # Write CSV files
+        for table, rows in [
+            ("User", users), ("Employer", employers), ("Company", companies), ("Location", locations),
+            ("Worker", workers), ("JobOffer", job_offers), ("Application", applications),
+        ]:
+            write_csv(os.path.join(args.out_dir, f"{table}.csv"), HEADERS[table], rows)
@@ -1,45 +1,178 @@
+import argparse
 import csv
 import mysql.connector
 import os
+import time
+from collections import Counter
+
+from mysql.connector import errorcode
+
+# Tables in foreign key order, with a column of their primary / unique key
+# (ON DUPLICATE KEY UPDATE sets it to itself)
+TABLES = [
+    ('User.csv', 'User', 'UserID'),
+    ('Company.csv', 'Company', 'CompanyID'),
+    ('Employer.csv', 'Employer', 'UserID'),
+    ('Worker.csv', 'Worker', 'UserID'),
+    ('Location.csv', 'Location', 'LocationID'),
+    ('JobOffer.csv', 'JobOffer', 'JobOfferID'),
+    ('Application.csv', 'Application', 'JobOfferID'),
+]
 
 # Database connection
-def get_db_connection():
+def get_db_connection(allow_local_infile=False):
     return mysql.connector.connect(
-        host='localhost',
-        user='root',
-        # password='your_password_here',
-        database='Job2main'
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        # password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME', 'Job2main'),
+        allow_local_infile=allow_local_infile
     )
 
-# Function to load CSV data into a table
-def load_csv_to_table(file_path, table_name, primary_key):
-    conn = get_db_connection()
+def print_progress(table_name, loaded, skipped, start):
+    elapsed = time.perf_counter() - start
+    rate = loaded / elapsed if elapsed > 0 else 0
+    print(f"  {table_name}: {loaded} rows loaded, {skipped} skipped ({rate:,.0f} rows/s)")
+
+def statement_warnings(cursor):
+    # Warnings of the last statement other than duplicate keys, by code
+    # (SHOW WARNINGS keeps at most max_error_count of them)
+    if not cursor.warning_count:
+        return Counter()
+    cursor.execute("SHOW WARNINGS")
+    return Counter(code for _, code, _ in cursor.fetchall() if code != errorcode.ER_DUP_ENTRY)
+
+def print_warnings(table_name, warnings):
+    if warnings:
+        codes = ', '.join(f"{code} x{count}" for code, count in sorted(warnings.items()))
+        print(f"  {table_name}: {sum(warnings.values())} warnings other than duplicate keys ({codes})")
+
+# Function to load CSV data into a table with batched multi-row INSERTs,
+# one transaction per batch. Only key conflicts are absorbed: rows already
+# in the table or repeated in the file hit the keys of
+# sql_queries/migrations/001_primary_keys.sql and are left as they are
+# (ON DUPLICATE KEY UPDATE key = key), foreign key and conversion errors
+# stop the load (strict sql_mode, see main). Employer rows without a
+# company are not deduplicated, a unique key allows several NULLs.
+def load_csv_to_table(conn, file_path, table_name, key_column, batch_size=10000):
     cursor = conn.cursor()
-    
-    with open(file_path, 'r') as csvfile:
-        reader = csv.DictReader(csvfile)
-        columns = reader.fieldnames
+    start = time.perf_counter()
+    loaded = skipped = 0
+    warnings = Counter()
+
+    with open(file_path, 'r', newline='') as csvfile:
+        reader = csv.reader(csvfile)
+        columns = next(reader)
+        placeholders = ', '.join(['%s'] * len(columns))
+        query = (f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders}) "
+                 f"ON DUPLICATE KEY UPDATE {key_column} = {key_column}")
+
+        batch = []
         for row in reader:
-            # Check if the entry already exists
-            check_query = f"SELECT COUNT(*) FROM {table_name} WHERE {primary_key} = %s"
-            cursor.execute(check_query, (row[primary_key],))
-            if cursor.fetchone()[0] == 0:
-                values = [row[col] for col in columns]
-                placeholders = ', '.join(['%s'] * len(columns))
-                query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
-                cursor.execute(query, values)
-    
+            # Empty CSV cells are NULLs (e.g. Employer.CompanyID)
+            batch.append([value if value != '' else None for value in row])
+
+            if len(batch) >= batch_size:
+                inserted = insert_batch(conn, cursor, query, batch, warnings)
+                loaded += inserted
+                skipped += len(batch) - inserted
+                batch = []
+                print_progress(table_name, loaded, skipped, start)
+
+        if batch:
+            inserted = insert_batch(conn, cursor, query, batch, warnings)
+            loaded += inserted
+            skipped += len(batch) - inserted
+
+    cursor.close()
+    print_progress(table_name, loaded, skipped, start)
+    print_warnings(table_name, warnings)
+    return loaded
+
+def insert_batch(conn, cursor, query, batch, warnings):
+    # Inserted rows: a key conflict left as is counts 0 affected rows
+    cursor.executemany(query, batch)
+    inserted = cursor.rowcount
+    warnings.update(statement_warnings(cursor))
     conn.commit()
+    return inserted
+
+# Function to load CSV data with LOAD DATA LOCAL INFILE: fastest path, needs
+# local_infile enabled on the server. LOCAL turns every error into a warning
+# (the server cannot stop the upload), so the file goes into a temporary
+# table with the columns of the file and no index (InnoDB temporary tables
+# cannot hold the SPATIAL index of Location): any warning (conversion,
+# truncation) stops the load. The rows are then copied with INSERT ...
+# SELECT, where a foreign key error fails the statement and only key
+# conflicts, with the table or within the file, are absorbed.
+# csv.writer ends lines with \r\n.
+def load_infile_to_table(conn, file_path, table_name, key_column):
+    cursor = conn.cursor()
+    with open(file_path, 'r', newline='') as csvfile:
+        columns = next(csv.reader(csvfile))
+
+    staging = f"load_{table_name}"
+    variables = ', '.join(f"@{col}" for col in columns)
+    assignments = ', '.join(f"{col} = NULLIF(@{col}, '')" for col in columns)
+    start = time.perf_counter()
+    cursor.execute(f"CREATE TEMPORARY TABLE {staging} SELECT {', '.join(columns)} FROM {table_name} LIMIT 0")
+    try:
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE %s
+            INTO TABLE {staging}
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+            LINES TERMINATED BY '\\r\\n'
+            IGNORE 1 LINES
+            ({variables})
+            SET {assignments}
+        """, (os.path.abspath(file_path),))
+        warnings = statement_warnings(cursor)
+        if warnings:
+            print_warnings(table_name, warnings)
+            raise RuntimeError(f"{file_path}: rows the server could not load as is, see the warnings above")
+
+        cursor.execute(f"""
+            INSERT INTO {table_name} ({', '.join(columns)})
+            SELECT {', '.join(columns)} FROM {staging}
+            ON DUPLICATE KEY UPDATE {table_name}.{key_column} = {table_name}.{key_column}
+        """)
+        loaded = cursor.rowcount
+        warnings = statement_warnings(cursor)
+        conn.commit()
+    finally:
+        cursor.execute(f"DROP TEMPORARY TABLE {staging}")
+        cursor.close()
+    with open(file_path, 'r', newline='') as csvfile:
+        skipped = sum(1 for _ in csv.reader(csvfile)) - 1 - loaded
+    print_progress(table_name, loaded, skipped, start)
+    print_warnings(table_name, warnings)
+    return loaded
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load the generated CSV files into Job2main")
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--batch-size', type=int, default=10000, help="rows per INSERT batch / transaction")
+    parser.add_argument('--infile', action='store_true', help="use LOAD DATA LOCAL INFILE instead of batched INSERTs")
+    args = parser.parse_args()
+
+    conn = get_db_connection(allow_local_infile=args.infile)
+    # Conversion and truncation errors fail the statement instead of
+    # storing a changed value with a warning, foreign keys are checked
+    cursor = conn.cursor()
+    cursor.execute("SET SESSION sql_mode = TRIM(BOTH ',' FROM CONCAT(@@SESSION.sql_mode, ',STRICT_ALL_TABLES'))")
+    cursor.execute("SET SESSION foreign_key_checks = 1")
     cursor.close()
-    conn.close()
+    total = 0
+    start = time.perf_counter()
 
-# Load data into tables
-load_csv_to_table('data/User.csv', 'User', 'UserID')
-load_csv_to_table('data/Company.csv', 'Company', 'CompanyID')
-load_csv_to_table('data/Employer.csv', 'Employer', 'UserID')
-load_csv_to_table('data/Worker.csv', 'Worker', 'UserID')
-load_csv_to_table('data/Location.csv', 'Location', 'LocationID')
-load_csv_to_table('data/JobOffer.csv', 'JobOffer', 'JobOfferID')
-load_csv_to_table('data/Application.csv', 'Application', 'WorkerID')
+    # Load data into tables
+    for filename, table_name, key_column in TABLES:
+        file_path = os.path.join(args.data_dir, filename)
+        if args.infile:
+            total += load_infile_to_table(conn, file_path, table_name, key_column)
+        else:
+            total += load_csv_to_table(conn, file_path, table_name, key_column, args.batch_size)
 
-print("Data loaded successfully!")
\ No newline at end of file
+    conn.close()
+    elapsed = time.perf_counter() - start
+    print(f"Data loaded successfully! {total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
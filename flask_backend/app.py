@@ -1,67 +1,177 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
-from mysql.connector import Error
-import mysql.connector
+from mysql.connector import Error, IntegrityError, errorcode
 import os
 from dotenv import load_dotenv
-from datetime import date
+from datetime import date, datetime
 
 # fill .env file with your credentials
 # DB_HOST=localhost
 # DB_USER=root
 # DB_PASSWORD=your_password_here
 # DB_NAME=Job2main  
+# DB_POOL_SIZE=10            (max open connections per process)
+# DB_POOL_TIMEOUT=5          (seconds to wait for a free connection)
+# DB_POOL_PING_INTERVAL=30   (ping connections idle longer than this on borrow, 0 = always)
+# METRICS_ENABLED=1          (request / SQL timings on GET /metrics)
+# SLOW_QUERY_MS=200          (log statements slower than this)
+# LOG_LEVEL=WARNING          (INFO adds one JSON access line per request)
+# DB_REPLICAS=host1,host2:3307   (optional read replicas for @read_only views)
+# DB_REPLICA_MAX_LAG=5       (evict replicas further behind, in seconds)
+# DB_STICKY_PRIMARY_SECONDS=5    (reads of a client stay on the primary after its writes)
+# ETAG_TTL=30               (max age of the ETags of polled listings, 0 = until the next write)
+# READ_MODEL=0               (1 = serve job offer listings from the in-process read model)
 load_dotenv()
 
+from db import init_app, get_db_connection, get_pool, get_replicas, read_only, replica_lag
+from cache import cached, invalidate, cache_stats
+from conditional import conditional
+import metrics
+import serialization
+from serialization import fetch_dicts
+import repository
+import read_model
+from geo import DEFAULT_NEARBY_LIMIT, MAX_NEARBY_LIMIT, MAX_RADIUS_KM, parse_coordinates, find_nearby
+from search import WORKER_SEARCH_QUERY, JOB_OFFER_SEARCH_QUERY, parse_search_args, add_highlights
+from job_search import (DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, build_available_jobs_query, make_cursor,
+                        parse_available_jobs_args)
+
 app = Flask(__name__)
 CORS(app)
-
-def get_db_connection():
-    try:
-        print("Attempting database connection...")
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST'),
-            user=os.getenv('DB_USER'),
-            # password=os.getenv('DB_PASSWORD'),
-            database=os.getenv('DB_NAME')
-        )
-        print("Database connection successful!")
-        return connection
-    except Error as e:
-        print(f"Database connection failed: {e}")
-        return None
+init_app(app)
+serialization.init_app(app)
+metrics.init_app(app)
 
 @app.route('/')
 def hello():
     return "Hello, World!"
 
+# Load balancer probes. Liveness never touches the database; readiness
+# costs one pooled connection, SELECT 1 and the replica status, plus one
+# replica status per read replica, whatever the size of the tables. /test
+# is kept for the existing health checks.
+READY_MAX_LAG_SECONDS = float(os.getenv('READY_MAX_LAG_SECONDS', 30))
+# Healthy read replicas needed (capped at the number configured); with
+# fewer, every read falls back to the primary
+READY_MIN_REPLICAS = int(os.getenv('READY_MIN_REPLICAS', 1))
+
+@app.route('/health/live')
+def liveness():
+    return jsonify({"status": "ok"})
+
+@app.route('/health/ready')
 @app.route('/test')
-def test_connection():
+def readiness():
     conn = get_db_connection()
-    if conn and conn.is_connected():
-        cursor = conn.cursor(dictionary=True)
-        
-        # Get all table names
-        cursor.execute("SHOW TABLES")
-        tables_raw = cursor.fetchall()
-        
-        # Store data from each table
-        data = {}
-        for table_dict in tables_raw:
-            # Get the first (and only) value from the dictionary
-            table_name = list(table_dict.values())[0]
-            cursor.execute(f"SELECT * FROM {table_name}")
-            data[table_name] = cursor.fetchall()
-        
+    if not conn:
+        return jsonify({"status": "unavailable", "error": "Database connection failed",
+                        "pool": get_pool().stats()}), 503
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
         cursor.close()
+        lag = replica_lag(conn)
         conn.close()
-        
-        return jsonify({
-            "message": "Database connection successful!",
-            "data": data
-        })
-    
-    return jsonify({"message": "Database connection failed!"}), 500
+    except Error as e:
+        return jsonify({"status": "unavailable", "error": str(e), "pool": get_pool().stats()}), 503
+
+    # A replica whose replication stopped reports an infinite lag
+    status = "ok" if lag is None or lag <= READY_MAX_LAG_SECONDS else "lagging"
+    replicas = get_replicas()
+    if replicas and status == "ok":
+        # Pinged now: a dead or lagging replica is evicted here, not on the
+        # next read that picks it
+        healthy = replicas.check()
+        if healthy < min(READY_MIN_REPLICAS, len(replicas.pools)):
+            status = "replicas_unavailable"
+        elif healthy < len(replicas.pools):
+            status = "degraded"
+    return jsonify({
+        "status": status,
+        "replica_lag_seconds": lag,
+        "pool": get_pool().stats(),
+        "replicas": replicas.stats() if replicas else None
+    }), 200 if status in ("ok", "degraded") else 503
+
+@app.route('/api/admin/pool', methods=['GET'])
+def pool_stats():
+    return jsonify(get_pool().stats())
+
+@app.route('/api/admin/replicas', methods=['GET'])
+def replica_stats():
+    replicas = get_replicas()
+    return jsonify(replicas.stats() if replicas else {})
+
+@app.route('/api/admin/cache', methods=['GET'])
+def cache_stats_route():
+    return jsonify(cache_stats())
+
+@app.route('/api/admin/read-model', methods=['GET'])
+def read_model_route():
+    # ?check=1 reloads the model now and returns its differences with the
+    # live one (a full scan of the offers)
+    if request.args.get('check') == '1' and read_model.READ_MODEL:
+        try:
+            read_model.rebuild()
+        except Error as e:
+            return jsonify({"error": str(e)}), 500
+    return jsonify(read_model.read_model_stats())
+
+# Tables of the admin export with the key they are paginated on; NULL
+# Employer.CompanyID sorts as 0
+EXPORT_TABLES = {
+    'User': ('UserID',),
+    'Company': ('CompanyID',),
+    'Employer': ('UserID', 'COALESCE(CompanyID, 0)'),
+    'Worker': ('UserID',),
+    'Location': ('LocationID',),
+    'JobOffer': ('JobOfferID',),
+    'Application': ('JobOfferID', 'WorkerID'),
+}
+EXPORT_PAGE_SIZE = 10000
+MAX_EXPORT_PAGE_SIZE = 100000
+
+@app.route('/api/admin/export/<table>', methods=['GET'])
+@read_only
+def export_table(table):
+    # One page of a table as NDJSON, streamed from an unbuffered cursor.
+    # Next page: ?after=<key of the last row>, e.g. after=12 or after=12,7
+    if table not in EXPORT_TABLES:
+        return jsonify({"error": f"Unknown table. Must be one of: {', '.join(EXPORT_TABLES)}"}), 404
+    key = EXPORT_TABLES[table]
+
+    limit = request.args.get('limit', EXPORT_PAGE_SIZE, type=int)
+    if not 1 <= limit <= MAX_EXPORT_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {MAX_EXPORT_PAGE_SIZE}"}), 400
+
+    query = f"SELECT * FROM {table}"
+    params = []
+    if request.args.get('after'):
+        try:
+            after = [int(value) for value in request.args['after'].split(',')]
+        except ValueError:
+            after = []
+        if len(after) != len(key):
+            return jsonify({"error": f"after must be {len(key)} comma separated integers"}), 400
+        query += f" WHERE ({', '.join(key)}) > ({', '.join(['%s'] * len(key))})"
+        params += after
+    query += f" ORDER BY {', '.join(key)} LIMIT %s"
+    params.append(limit)
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    return Response(
+        stream_with_context(stream_rows(conn, query, params)),
+        mimetype='application/x-ndjson'
+    )
+
+@app.route('/metrics', methods=['GET'])
+def metrics_route():
+    # Prometheus text format, see metrics.py
+    return metrics.metrics_response([('db_pool', get_pool().stats()), ('cache', cache_stats())])
 
 #  Employer Endpoints 
 
@@ -76,41 +186,18 @@ def create_company(employer_id):
     conn = get_db_connection()
     if conn:
         try:
-            cursor = conn.cursor(dictionary=True)
-            
-            # First verify if the employer_id exists in Employer table
-            cursor.execute("SELECT UserID FROM Employer WHERE UserID = %s", (employer_id,))
-            employer = cursor.fetchall()
+            # Company and Employer rows are written in one transaction; the
+            # Company insert only happens when employer_id is an employer
+            conn.start_transaction()
+            next_id = repository.create_company(conn, employer_id, data['name'])
             
-            if not employer:
+            if next_id is None:
+                conn.rollback()
                 return jsonify({
                     "error": "Invalid employer ID. The user must be an employer to create a company."
                 }), 400
             
-            # Get the maximum CompanyID to determine the next ID
-            cursor.execute("SELECT MAX(CompanyID) as max_id FROM Company")
-            result = cursor.fetchall()
-            next_id = 1 if result[0]['max_id'] is None else result[0]['max_id'] + 1
-            
-            # Insert new company with columns specified in correct order
-            query = "INSERT INTO Company (CompanyID, CreatedBy, Name) VALUES (%s, %s, %s)"
-            values = (
-                next_id,  # Use the next available ID
-                employer_id,  # employer ID from URL parameter
-                data['name'],
-            )
-            
-            cursor.execute(query, values)
-            
-            # Insert a new row in the Employer table for this company
-            cursor.execute("""
-                INSERT INTO Employer (CompanyID, UserID) 
-                VALUES (%s, %s)
-            """, (next_id, employer_id))
-            
             conn.commit()
-            
-            cursor.close()
             conn.close()
             
             return jsonify({
@@ -133,50 +220,39 @@ def join_company(company_id):
     conn = get_db_connection()
     if conn:
         try:
-            cursor = conn.cursor(dictionary=True)
+            # Employer, company and membership checks in one statement
+            check = repository.join_company_check(conn, data['employer_id'], company_id)
             
-            # First verify if the employer exists
-            cursor.execute("SELECT UserID FROM Employer WHERE UserID = %s", (data['employer_id'],))
-            employer = cursor.fetchall()
-            
-            if not employer:
+            if not check['EmployerExists']:
                 return jsonify({
                     "error": "Invalid employer ID"
                 }), 400
             
-            # Verify if the company exists
-            cursor.execute("SELECT CompanyID, Name FROM Company WHERE CompanyID = %s", (company_id,))
-            company = cursor.fetchall()
-            
-            if not company:
+            if not check['CompanyExists']:
                 return jsonify({
                     "error": "Company not found"
                 }), 404
             
-            # Check if employer is already in this company
-            cursor.execute("""
-                SELECT * FROM Employer  
-                WHERE UserID = %s AND CompanyID = %s
-            """, (data['employer_id'], company_id))
-            
-            if cursor.fetchone():
+            if check['AlreadyMember']:
                 return jsonify({
                     "error": "Employer is already part of this company"
                 }), 400
             
-            # Insert new row in Employer table
-            cursor.execute("""
-                INSERT INTO Employer (CompanyID, UserID) 
-                VALUES (%s, %s)
-            """, (company_id, data['employer_id']))
-            
-            conn.commit()
+            # Insert new row in Employer table; the unique key still rejects
+            # a concurrent join of the same company
+            try:
+                repository.add_employer(conn, company_id, data['employer_id'])
+            except IntegrityError as e:
+                if e.errno != errorcode.ER_DUP_ENTRY:
+                    raise
+                return jsonify({
+                    "error": "Employer is already part of this company"
+                }), 400
             
-            cursor.close()
             conn.close()
             
             return jsonify({
-                "message": f"Successfully joined company {company[0]['Name']}"
+                "message": f"Successfully joined company {check['CompanyName']}"
             })
             
         except Error as e:
@@ -240,40 +316,27 @@ def add_location(company_id):
         return jsonify({
             "error": "Street, number, and city are required"
         }), 400
+
+    # Optional coordinates, used by GET /api/joboffers/nearby
+    latitude = longitude = None
+    if data.get('latitude') is not None or data.get('longitude') is not None:
+        try:
+            latitude, longitude = parse_coordinates(data.get('latitude'), data.get('longitude'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
     
     conn = get_db_connection()
     if conn:
         try:
-            cursor = conn.cursor(dictionary=True)
-            
-            # First verify if the company exists
-            cursor.execute("SELECT CompanyID FROM Company WHERE CompanyID = %s", (company_id,))
-            company = cursor.fetchone()
+            # Inserted only if the company exists, LocationID is assigned by AUTO_INCREMENT
+            next_id = repository.add_location(conn, company_id, data['street'], data['number'],
+                                              data['city'], latitude, longitude)
             
-            if not company:
+            if next_id is None:
                 return jsonify({
                     "error": "Company not found"
                 }), 404
             
-            # Get the maximum LocationID to determine the next ID
-            cursor.execute("SELECT MAX(LocationID) as max_id FROM Location")
-            result = cursor.fetchone()
-            next_id = 1 if result['max_id'] is None else result['max_id'] + 1
-            
-            # Insert new location
-            query = "INSERT INTO Location (LocationID, CompanyID, Street, Number, City) VALUES (%s, %s, %s, %s, %s)"
-            values = (
-                next_id,
-                company_id,
-                data['street'],
-                data['number'],
-                data['city']
-            )
-            
-            cursor.execute(query, values)
-            conn.commit()
-            
-            cursor.close()
             conn.close()
             
             return jsonify({
@@ -296,52 +359,27 @@ def delete_location(company_id):
     conn = get_db_connection()
     if conn:
         try:
-            cursor = conn.cursor(dictionary=True)
+            # Ownership, location count and job offers checked in one statement
+            check = repository.delete_location_check(conn, data['location_id'], company_id)
             
-            # First verify if the location exists and belongs to the company
-            cursor.execute("""
-                SELECT LocationID, CompanyID 
-                FROM Location 
-                WHERE LocationID = %s AND CompanyID = %s
-            """, (data['location_id'], company_id))
-            location = cursor.fetchone()
-            
-            if not location:
+            if not check['BelongsToCompany']:
                 return jsonify({
                     "error": "Location not found or doesn't belong to this company"
                 }), 404
             
-            # Check if this is the company's only location
-            cursor.execute("""
-                SELECT COUNT(*) as count 
-                FROM Location 
-                WHERE CompanyID = %s
-            """, (company_id,))
-            location_count = cursor.fetchone()['count']
-            
-            if location_count <= 1:
+            if check['CompanyLocations'] <= 1:
                 return jsonify({
                     "error": "Cannot delete the only location of a company. Company must have at least one location."
                 }), 400
             
-            # Check if there are any job offers for this location
-            cursor.execute("""
-                SELECT COUNT(*) as count 
-                FROM JobOffer 
-                WHERE LocationID = %s
-            """, (data['location_id'],))
-            joboffer_count = cursor.fetchone()['count']
-            
-            if joboffer_count > 0:
+            if check['HasJobOffers']:
                 return jsonify({
                     "error": "Cannot delete location with active job offers. Please delete the job offers first."
                 }), 400
             
             # If all checks pass, delete the location
-            cursor.execute("DELETE FROM Location WHERE LocationID = %s", (data['location_id'],))
-            conn.commit()
+            repository.delete_location(conn, data['location_id'])
             
-            cursor.close()
             conn.close()
             
             return jsonify({
@@ -369,63 +407,32 @@ def create_job_offer(employer_id):
     conn = get_db_connection()
     if conn:
         try:
-            cursor = conn.cursor(dictionary=True)
-            
-            # First verify if the employer exists
-            cursor.execute("""
-                SELECT e.UserID, e.CompanyID 
-                FROM Employer e
-                WHERE e.UserID = %s
-            """, (employer_id,))
-            employer = cursor.fetchall()  # Fetch ALL results
-            
-            if not employer:
-                return jsonify({
-                    "error": "Invalid employer ID"
-                }), 404
-            
-            # Verify if the location exists and belongs to employer's company
-            cursor.execute("""
-                SELECT LocationID, CompanyID 
-                FROM Location 
-                WHERE LocationID = %s AND CompanyID = %s
-            """, (data['location_id'], employer[0]['CompanyID']))
-            location = cursor.fetchall()  # Fetch ALL results
+            # The offer and its feed event are written in one transaction
+            conn.start_transaction()
+            
+            # Inserted only if the location belongs to one of the employer's
+            # companies, JobOfferID is assigned by AUTO_INCREMENT
+            next_id = repository.create_job_offer(
+                conn, employer_id, data['location_id'], data['date'], data['start_time'],
+                data['end_time'], data['max_wage'], data['working_days'], data['hours']
+            )
             
-            if not location:
+            if next_id is None:
+                conn.rollback()
+                # Rejected by the guard: find out why (failure path only)
+                if not repository.employer_exists(conn, employer_id):
+                    return jsonify({
+                        "error": "Invalid employer ID"
+                    }), 404
                 return jsonify({
                     "error": "Location not found or doesn't belong to your company"
                 }), 404
             
-            # Get the maximum JobOfferID to determine the next ID
-            cursor.execute("SELECT MAX(JobOfferID) as max_id FROM JobOffer")
-            result = cursor.fetchall()  # Fetch ALL results
-            next_id = 1 if result[0]['max_id'] is None else result[0]['max_id'] + 1
-            
-            # Insert new job offer
-            query = """
-                INSERT INTO JobOffer (
-                    JobOfferID, LocationID, CreatedBy, Status, Date, 
-                    StartTime, EndTime, MaxWage, WorkingDays, Hours
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            values = (
-                next_id,
-                data['location_id'],
-                employer_id,  # CreatedBy from URL parameter
-                'Open',      # Default status
-                data['date'],
-                data['start_time'],
-                data['end_time'],
-                data['max_wage'],
-                data['working_days'],
-                data['hours']
-            )
-            
-            cursor.execute(query, values)
+            repository.record_changes(conn, [('job_offer', next_id, None, 'Open')])
             conn.commit()
+            invalidate('available_jobs', f'employer_joboffers:{employer_id}')
+            read_model.sync_after_write(conn)
             
-            cursor.close()
             conn.close()
             
             return jsonify({
@@ -438,81 +445,166 @@ def create_job_offer(employer_id):
             
     return jsonify({"error": "Database connection failed"}), 500
 
-@app.route('/api/employers/<int:employer_id>/joboffers', methods=['GET'])
-def get_my_job_offers(employer_id):
-    # Optional status filter from query parameters
-    status = request.args.get('status')
+MAX_BATCH_SIZE = 1000
+
+JOB_OFFER_FIELDS = ['location_id', 'date', 'start_time', 'end_time', 'max_wage', 'working_days', 'hours']
+
+def job_offer_error(item):
+    # Per-item validation of the batch endpoint, None when the offer is valid
+    if not isinstance(item, dict) or any(field not in item for field in JOB_OFFER_FIELDS):
+        return f"Required fields: {', '.join(JOB_OFFER_FIELDS)}"
+    try:
+        int(item['location_id'])
+        date.fromisoformat(str(item['date']))
+        for field in ('start_time', 'end_time'):
+            datetime.strptime(str(item[field]), '%H:%M:%S' if str(item[field]).count(':') == 2 else '%H:%M')
+        float(item['max_wage'])
+        int(item['working_days'])
+        int(item['hours'])
+    except (TypeError, ValueError):
+        return "Invalid value: date must be YYYY-MM-DD, times HH:MM[:SS], other fields numbers"
+    return None
+
+@app.route('/api/employers/<int:employer_id>/joboffers/batch', methods=['POST'])
+def create_job_offers(employer_id):
+    # Batch version of create_job_offer: {"job_offers": [{...}, ...]}
+    # Invalid offers are reported and skipped, valid ones are inserted together
+    data = request.json
+    if not data or not isinstance(data.get('job_offers'), list) or not data['job_offers']:
+        return jsonify({
+            "error": "Required field: job_offers (non-empty list)"
+        }), 400
+    
+    if len(data['job_offers']) > MAX_BATCH_SIZE:
+        return jsonify({
+            "error": f"At most {MAX_BATCH_SIZE} job offers per request"
+        }), 400
+    
+    results = []
+    valid = []
+    for index, item in enumerate(data['job_offers']):
+        result = {"index": index}
+        error = job_offer_error(item)
+        if error:
+            result.update(status=400, error=error)
+        else:
+            valid.append((item, result))
+        results.append(result)
     
     conn = get_db_connection()
     if conn:
         try:
             cursor = conn.cursor(dictionary=True)
             
-            # First verify if the employer exists
-            cursor.execute("""
-                SELECT UserID FROM Employer 
-                WHERE UserID = %s
-            """, (employer_id,))
-            employer = cursor.fetchall()
+            # Employer check and location ownership (any of the employer's
+            # companies) in one query
+            location_ids = list({int(item['location_id']) for item, _ in valid}) or [None]
+            cursor.execute(f"""
+                SELECT e.CompanyID, l.LocationID
+                FROM Employer e
+                LEFT JOIN Location l
+                  ON l.CompanyID = e.CompanyID
+                 AND l.LocationID IN ({', '.join(['%s'] * len(location_ids))})
+                WHERE e.UserID = %s
+            """, location_ids + [employer_id])
+            rows = cursor.fetchall()
             
-            if not employer:
+            if not rows:
                 return jsonify({
                     "error": "Invalid employer ID"
                 }), 404
             
-            # Base query with joins to get location and company info
-            base_query = """
-                SELECT 
-                    j.JobOfferID,
-                    j.LocationID,
-                    j.Status,
-                    j.Date,
-                    j.StartTime,
-                    j.EndTime,
-                    j.MaxWage,
-                    j.WorkingDays,
-                    j.Hours,
-                    l.Street,
-                    l.Number,
-                    l.City,
-                    c.Name as CompanyName
-                FROM JobOffer j, Location l, Company c
-                WHERE j.LocationID = l.LocationID
-                  AND l.CompanyID = c.CompanyID
-                  AND j.CreatedBy = %s
-            """
-            
-            # Add status filter if provided
-            if status:
-                base_query += " AND j.Status = %s"
-                cursor.execute(base_query, (employer_id, status))
-            else:
-                cursor.execute(base_query, (employer_id,))
-            
-            job_offers = cursor.fetchall()
-            
-            # Convert datetime/timedelta objects to strings
-            for job in job_offers:
-                if job.get('Date'):
-                    job['Date'] = job['Date'].strftime('%Y-%m-%d')
-                if job.get('StartTime'):
-                    # Convert timedelta to string in HH:MM:SS format
-                    total_seconds = int(job['StartTime'].total_seconds())
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    seconds = total_seconds % 60
-                    job['StartTime'] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                if job.get('EndTime'):
-                    # Convert timedelta to string in HH:MM:SS format
-                    total_seconds = int(job['EndTime'].total_seconds())
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    seconds = total_seconds % 60
-                    job['EndTime'] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+            owned = {row['LocationID'] for row in rows if row['LocationID'] is not None}
+            to_insert = []
+            for item, result in valid:
+                if int(item['location_id']) in owned:
+                    to_insert.append((item, result))
+                else:
+                    result.update(status=404, error="Location not found or doesn't belong to your company")
+            
+            if to_insert:
+                values = [(
+                    item['location_id'],
+                    employer_id,  # CreatedBy from URL parameter
+                    'Open',      # Default status
+                    item['date'],
+                    item['start_time'],
+                    item['end_time'],
+                    item['max_wage'],
+                    item['working_days'],
+                    item['hours']
+                ) for item, _ in to_insert]
+                
+                # The snapshot is taken before the INSERT, so the read back
+                # below only sees this statement's rows of the employer
+                conn.start_transaction(consistent_snapshot=True)
+                cursor.execute(f"""
+                    INSERT INTO JobOffer (
+                        LocationID, CreatedBy, Status, Date, 
+                        StartTime, EndTime, MaxWage, WorkingDays, Hours
+                    ) VALUES {', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(values))}
+                """, [value for row in values for value in row])
+                # lastrowid is the first ID of the statement; with interleaved
+                # auto-increment (innodb_autoinc_lock_mode=2) the others may
+                # not follow it, but they increase in row order
+                cursor.execute("""
+                    SELECT JobOfferID
+                    FROM JobOffer
+                    WHERE CreatedBy = %s AND JobOfferID >= %s
+                    ORDER BY JobOfferID
+                    LIMIT %s
+                """, (employer_id, cursor.lastrowid, len(values)))
+                new_ids = [row['JobOfferID'] for row in cursor.fetchall()]
+                repository.record_changes(conn, [('job_offer', job_offer_id, None, 'Open') for job_offer_id in new_ids])
+                conn.commit()
+                invalidate('available_jobs', f'employer_joboffers:{employer_id}')
+                read_model.sync_after_write(conn)
+                
+                for (_, result), job_offer_id in zip(to_insert, new_ids):
+                    result.update(status=201, job_offer_id=job_offer_id)
             
             cursor.close()
             conn.close()
             
+            return jsonify({
+                "message": f"{len(to_insert)} of {len(results)} job offers created",
+                "results": results
+            }), 201 if to_insert else 400
+            
+        except Error as e:
+            return jsonify({"error": str(e)}), 500
+            
+    return jsonify({"error": "Database connection failed"}), 500
+
+@app.route('/api/employers/<int:employer_id>/joboffers', methods=['GET'])
+@cached('employer_joboffers:{employer_id}')
+@read_only
+def get_my_job_offers(employer_id):
+    # Optional status filter from query parameters
+    status = request.args.get('status')
+    
+    # From memory when the read model knows this employer
+    model = read_model.get_read_model()
+    job_offers = model.employer_job_offers(employer_id, status) if model is not None else None
+    if job_offers is not None:
+        return jsonify({
+            "message": "Job offers retrieved successfully",
+            "job_offers": job_offers
+        })
+    
+    conn = get_db_connection()
+    if conn:
+        try:
+            # Employer check and job offers (with location and company) in one statement
+            known, job_offers = repository.employer_job_offers(conn, employer_id, status)
+            
+            conn.close()
+            
+            if not known:
+                return jsonify({
+                    "error": "Invalid employer ID"
+                }), 404
+            
             return jsonify({
                 "message": "Job offers retrieved successfully",
                 "job_offers": job_offers
@@ -523,6 +615,35 @@ def get_my_job_offers(employer_id):
             
     return jsonify({"error": "Database connection failed"}), 500
 
+@app.route('/api/employers/<int:employer_id>/dashboard', methods=['GET'])
+@read_only
+def get_employer_dashboard(employer_id):
+    # Applicant counts and wage offers per job offer, read from the
+    # ApplicationStats summary: one row per offer, whatever the applications
+    status = request.args.get('status')
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        known, job_offers = repository.employer_dashboard(conn, employer_id, status)
+        conn.close()
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+
+    if not known:
+        return jsonify({"error": "Invalid employer ID"}), 404
+
+    return jsonify({
+        "message": "Dashboard retrieved successfully",
+        "job_offers": job_offers,
+        "totals": {
+            column: sum(offer[column] for offer in job_offers)
+            for column in ('Applicants', 'Pending', 'Accepted', 'Refused')
+        }
+    })
+
 # Application Management
 @app.route('/api/applications/status', methods=['PUT'])
 def update_application_status():
@@ -545,12 +666,17 @@ def update_application_status():
         try:
             cursor = conn.cursor(dictionary=True)
             
-            # First verify if the application exists
+            # Check and updates run in one transaction
+            conn.start_transaction()
+            
+            # First verify if the application exists, locking the rows to
+            # update so a concurrent decision waits for this one
             cursor.execute("""
-                SELECT a.JobOfferID, a.WorkerID, a.Status, j.Status as JobStatus
+                SELECT a.JobOfferID, a.WorkerID, a.Status, j.Status as JobStatus, j.CreatedBy
                 FROM Application a, JobOffer j
                 WHERE a.JobOfferID = j.JobOfferID
                   AND a.JobOfferID = %s AND a.WorkerID = %s
+                FOR UPDATE
             """, (data['job_offer_id'], data['worker_id']))
             application = cursor.fetchone()
             
@@ -578,8 +704,16 @@ def update_application_status():
                 WHERE JobOfferID = %s AND WorkerID = %s
             """, (data['new_status'], data['job_offer_id'], data['worker_id']))
             
+            changes = [('application', data['job_offer_id'], data['worker_id'], data['new_status'])]
+            
             # If accepting the application, close the job offer
             if data['new_status'] == 'Accepted':
+                # Applications refused below, for the feed
+                others = [pair for pair in repository.pending_applications(conn, [data['job_offer_id']])
+                          if pair[1] != int(data['worker_id'])]
+                changes.append(('job_offer', data['job_offer_id'], None, 'Completed'))
+                changes += [('application', job_id, worker_id, 'Refused') for job_id, worker_id in others]
+                
                 cursor.execute("""
                     UPDATE JobOffer 
                     SET Status = 'Completed' 
@@ -595,7 +729,14 @@ def update_application_status():
                     AND Status = 'Pending'
                 """, (data['job_offer_id'], data['worker_id']))
             
+            repository.record_changes(conn, changes)
             conn.commit()
+            if data['new_status'] == 'Accepted':
+                # Other applicants of this offer were refused as well
+                invalidate('worker_applications', f"employer_joboffers:{application['CreatedBy']}")
+                read_model.sync_after_write(conn)
+            else:
+                invalidate(f"worker_applications:{data['worker_id']}")
             
             cursor.close()
             conn.close()
@@ -609,91 +750,394 @@ def update_application_status():
             
     return jsonify({"error": "Database connection failed"}), 500
 
-@app.route('/api/workers', methods=['GET'])
-def get_all_workers():
+@app.route('/api/applications/status/batch', methods=['PUT'])
+def update_application_statuses():
+    # Batch version of update_application_status:
+    # {"decisions": [{"job_offer_id": 1, "worker_id": 2, "new_status": "Accepted"}, ...]}
+    # Decisions are applied in order with the same rules, in one transaction,
+    # and each one gets its own result.
+    data = request.json
+    if not data or not isinstance(data.get('decisions'), list) or not data['decisions']:
+        return jsonify({
+            "error": "Required field: decisions (non-empty list)"
+        }), 400
+    
+    if len(data['decisions']) > MAX_BATCH_SIZE:
+        return jsonify({
+            "error": f"At most {MAX_BATCH_SIZE} decisions per request"
+        }), 400
+    
+    valid_statuses = ['Accepted', 'Refused']
+    results = []
+    decisions = []
+    for item in data['decisions']:
+        if not isinstance(item, dict) or 'new_status' not in item or \
+           'job_offer_id' not in item or 'worker_id' not in item:
+            results.append({
+                "status": 400,
+                "error": "Required fields: new_status, job_offer_id, worker_id"
+            })
+            continue
+        result = {"job_offer_id": item['job_offer_id'], "worker_id": item['worker_id']}
+        results.append(result)
+        if item['new_status'] not in valid_statuses:
+            result.update(status=400, error=f"Invalid status. Must be one of: {', '.join(valid_statuses)}")
+            continue
+        try:
+            key = (int(item['job_offer_id']), int(item['worker_id']))
+        except (TypeError, ValueError):
+            result.update(status=400, error="job_offer_id and worker_id must be integers")
+            continue
+        decisions.append((key, item['new_status'], result))
+    
+    if not decisions:
+        return jsonify({"results": results})
+    
     conn = get_db_connection()
-    if not conn:
-        return jsonify({"error": "Database connection failed"}), 500
     if conn:
         try:
-            # Create cursor with dictionary=True to get results as dictionaries
             cursor = conn.cursor(dictionary=True)
+            conn.start_transaction()
             
-            # Execute SQL query to get all workers
-            cursor.execute("""
-                SELECT U.UserID, U.FirstName, U.Surname, U.Name, U.Email, U.PhoneNumber, W.Experiences, W.Description 
-                FROM User as U, Worker as W
-                WHERE U.UserID = W.UserID
-            """)
+            # Validate every pair with one query, locking the rows to update
+            pairs = list({key for key, _, _ in decisions})
+            cursor.execute(f"""
+                SELECT a.JobOfferID, a.WorkerID, a.Status, j.Status as JobStatus, j.CreatedBy
+                FROM Application a, JobOffer j
+                WHERE a.JobOfferID = j.JobOfferID
+                  AND (a.JobOfferID, a.WorkerID) IN ({', '.join(['(%s, %s)'] * len(pairs))})
+                FOR UPDATE
+            """, [value for pair in pairs for value in pair])
+            rows = cursor.fetchall()
+            
+            # Replay the single-item rules in order on the fetched state, so
+            # decisions later in the batch see the effect of earlier ones
+            app_status = {(row['JobOfferID'], row['WorkerID']): row['Status'] for row in rows}
+            job_status = {row['JobOfferID']: row['JobStatus'] for row in rows}
+            created_by = {row['JobOfferID']: row['CreatedBy'] for row in rows}
+            pairs_by_job = {}
+            for key in app_status:
+                pairs_by_job.setdefault(key[0], []).append(key)
+            accepted, refused = [], []
+            for key, new_status, result in decisions:
+                if key not in app_status:
+                    result.update(status=404, error="Application not found")
+                elif app_status[key] in ['Accepted', 'Refused']:
+                    result.update(status=400, error=f"Application is already {app_status[key].lower()}")
+                elif job_status[key[0]] != 'Running':
+                    result.update(status=400, error="Cannot update application status: Job status should be 'Running'")
+                else:
+                    result.update(status=200, message=f"Application status updated to {new_status}")
+                    app_status[key] = new_status
+                    if new_status == 'Accepted':
+                        accepted.append(key)
+                        # The offer completes and its other pending applications are refused
+                        job_status[key[0]] = 'Completed'
+                        for other in pairs_by_job[key[0]]:
+                            if app_status[other] == 'Pending':
+                                app_status[other] = 'Refused'
+                    else:
+                        refused.append(key)
+            
+            changes = [('application', job_id, worker_id, 'Refused') for job_id, worker_id in refused]
+            changes += [('application', job_id, worker_id, 'Accepted') for job_id, worker_id in accepted]
+            
+            # Set-based writes: one UPDATE per kind of change
+            if refused:
+                cursor.execute(f"""
+                    UPDATE Application 
+                    SET Status = 'Refused' 
+                    WHERE (JobOfferID, WorkerID) IN ({', '.join(['(%s, %s)'] * len(refused))})
+                """, [value for pair in refused for value in pair])
             
-            # Fetch all results
-            workers = cursor.fetchall()
+            if accepted:
+                cursor.execute(f"""
+                    UPDATE Application 
+                    SET Status = 'Accepted' 
+                    WHERE (JobOfferID, WorkerID) IN ({', '.join(['(%s, %s)'] * len(accepted))})
+                """, [value for pair in accepted for value in pair])
+                
+                job_ids = [job_id for job_id, _ in accepted]
+                placeholders = ', '.join(['%s'] * len(job_ids))
+                changes += [('job_offer', job_id, None, 'Completed') for job_id in job_ids]
+                changes += [('application', job_id, worker_id, 'Refused')
+                            for job_id, worker_id in repository.pending_applications(conn, job_ids)]
+                cursor.execute(f"""
+                    UPDATE JobOffer 
+                    SET Status = 'Completed' 
+                    WHERE JobOfferID IN ({placeholders})
+                """, job_ids)
+                
+                # Refuse all other pending applications for these job offers
+                cursor.execute(f"""
+                    UPDATE Application 
+                    SET Status = 'Refused' 
+                    WHERE JobOfferID IN ({placeholders}) 
+                    AND Status = 'Pending'
+                """, job_ids)
+            
+            repository.record_changes(conn, changes)
+            conn.commit()
+            if accepted:
+                invalidate('worker_applications', *{
+                    f"employer_joboffers:{created_by[job_id]}" for job_id, _ in accepted
+                })
+                read_model.sync_after_write(conn)
+            elif refused:
+                invalidate(*{f"worker_applications:{worker_id}" for _, worker_id in refused})
             
-            # Clean up
             cursor.close()
             conn.close()
             
-            # Return results as JSON
-            return jsonify({"workers": workers})
+            return jsonify({"results": results})
             
         except Error as e:
             return jsonify({"error": str(e)}), 500
             
     return jsonify({"error": "Database connection failed"}), 500
 
+@app.route('/api/workers', methods=['GET'])
+@conditional('workers')
+@cached()
+@read_only
+def get_all_workers():
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+    try:
+        # Create cursor with dictionary=True to get results as dictionaries
+        cursor = conn.cursor(dictionary=True)
+        
+        # Execute SQL query to get all workers
+        cursor.execute("""
+            SELECT U.UserID, U.FirstName, U.Surname, U.Name, U.Email, U.PhoneNumber, W.Experiences, W.Description 
+            FROM User as U, Worker as W
+            WHERE U.UserID = W.UserID
+        """)
+        
+        # Fetch all results
+        workers = cursor.fetchall()
+        
+        # Clean up
+        cursor.close()
+        conn.close()
+        
+        # Return results as JSON
+        return jsonify({"workers": workers})
+        
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+
 #  Worker Endpoints 
 
+STREAM_FETCH_SIZE = 500
+
+@app.route('/api/workers/search', methods=['GET'])
+@cached()
+@read_only
+def search_workers():
+    # Ranked full-text search over Experiences and Description: ?q=&limit=&offset=
+    try:
+        q, limit, offset = parse_search_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute(WORKER_SEARCH_QUERY, (q, q, limit + 1, offset))
+        workers = fetch_dicts(cursor)
+        cursor.close()
+        conn.close()
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+
+    next_offset = None
+    if len(workers) > limit:
+        workers = workers[:limit]
+        next_offset = offset + limit
+
+    return jsonify({
+        "workers": add_highlights(workers, q, ('Experiences', 'Description')),
+        "next_offset": next_offset
+    })
+
 @app.route('/api/joboffers/available', methods=['GET'])
+@conditional('available_jobs')
+@cached('available_jobs')
+@read_only
 def get_available_jobs():
+    # Filters, sort and fields= projection: see job_search.py
+    # Keyset pagination: ?limit=<n>&after=<next_cursor>
+    # Streaming mode: ?stream=1 returns every matching row as NDJSON
+    stream = request.args.get('stream') in ('1', 'true', 'ndjson')
+    limit = request.args.get('limit', type=int)
+
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({
+            "error": f"limit must be between 1 and {MAX_PAGE_SIZE}"
+        }), 400
+    if limit is None and not stream:
+        limit = DEFAULT_PAGE_SIZE
+
+    model = read_model.get_read_model()
+    if model is not None:
+        # Same filters, sort, fields and cursor, served from memory
+        try:
+            sort, fields, filters, after = parse_available_jobs_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        offers = model.available_jobs(sort, filters, after, None if stream else limit + 1)
+        if stream:
+            return Response(stream_offers(offers, fields), mimetype='application/x-ndjson')
+        return available_jobs_page(read_model.job_rows(offers, fields), limit)
+
+    try:
+        # Fetch one extra row to know whether another page exists
+        query, params = build_available_jobs_query(
+            request.args, limit + 1 if limit is not None and not stream else limit
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
-    if conn:
-        try:
-            cursor = conn.cursor(dictionary=True)
-            
-            cursor.execute("""
-                SELECT J.JobOfferID, J.LocationID, J.Date, J.StartTime, J.EndTime, J.MaxWage, J.WorkingDays, J.Hours, L.Street, L.Number, L.City, C.Name as CompanyName
-                FROM JobOffer as J, Location as L, Company as C
-                WHERE J.LocationID = L.LocationID
-                  AND L.CompanyID = C.CompanyID
-                  AND J.Status = 'Open'
-                ORDER BY J.Date ASC
-            """)
-            
-            jobs = cursor.fetchall()
-            
-            # Convert datetime/timedelta objects to strings
-            for job in jobs:
-                if job.get('Date'):
-                    job['Date'] = job['Date'].strftime('%Y-%m-%d')
-                if job.get('StartTime'):
-                    # Convert timedelta to string in HH:MM:SS format
-                    total_seconds = int(job['StartTime'].total_seconds())
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    seconds = total_seconds % 60
-                    job['StartTime'] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                if job.get('EndTime'):
-                    # Convert timedelta to string in HH:MM:SS format
-                    total_seconds = int(job['EndTime'].total_seconds())
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    seconds = total_seconds % 60
-                    job['EndTime'] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-            
+
+    if stream:
+        return Response(
+            stream_with_context(stream_rows(conn, query, params)),
+            mimetype='application/x-ndjson'
+        )
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        jobs = fetch_dicts(cursor)
+        cursor.close()
+        conn.close()
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+
+    return available_jobs_page(jobs, limit)
+
+def available_jobs_page(jobs, limit):
+    # jobs: up to limit + 1 rows, the extra one tells whether another page exists
+    next_cursor = None
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        next_cursor = make_cursor(jobs[-1], request.args.get('sort', 'date'))
+
+    return jsonify({
+        "message": "Available jobs retrieved successfully",
+        "jobs": jobs,
+        "next_cursor": next_cursor
+    })
+
+def stream_offers(offers, fields):
+    # NDJSON of read model offers, STREAM_FETCH_SIZE rows per chunk
+    for start in range(0, len(offers), STREAM_FETCH_SIZE):
+        rows = read_model.job_rows(offers[start:start + STREAM_FETCH_SIZE], fields)
+        yield b''.join(serialization.dumps_bytes(row) + b'\n' for row in rows)
+
+def stream_rows(conn, query, params):
+    # Unbuffered cursor: rows are read off the server as they are sent
+    cursor = conn.cursor()
+    finished = False
+    try:
+        cursor.execute(query, params)
+        columns = cursor.column_names
+        while True:
+            rows = cursor.fetchmany(STREAM_FETCH_SIZE)
+            if not rows:
+                break
+            yield b''.join(serialization.dumps_bytes(dict(zip(columns, row))) + b'\n' for row in rows)
+        finished = True
+    except Error as e:
+        yield serialization.dumps_bytes({"error": str(e)}) + b'\n'
+    finally:
+        if finished:
             cursor.close()
             conn.close()
-            
-            return jsonify({
-                "message": "Available jobs retrieved successfully",
-                "jobs": jobs
-            })
-            
-        except Error as e:
-            return jsonify({"error": str(e)}), 500
-            
-    return jsonify({"error": "Database connection failed"}), 500
+        else:
+            # Client gone (or error) mid-stream: the rest of the result set
+            # is still pending on the socket, drop the connection rather
+            # than pooling it
+            conn.discard()
+
+@app.route('/api/joboffers/nearby', methods=['GET'])
+@cached('available_jobs')
+@read_only
+def get_nearby_jobs():
+    # Open offers around ?lat=&lon=, closest first:
+    #   ?radius_km=10   every offer within 10 km (up to limit)
+    #   no radius_km    the nearest `limit` offers, up to MAX_RADIUS_KM away
+    try:
+        lat, lon = parse_coordinates(request.args.get('lat'), request.args.get('lon'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    limit = request.args.get('limit', DEFAULT_NEARBY_LIMIT, type=int)
+    if not 1 <= limit <= MAX_NEARBY_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_NEARBY_LIMIT}"}), 400
+    radius_km = request.args.get('radius_km', type=float)
+    if radius_km is not None and not 0 < radius_km <= MAX_RADIUS_KM:
+        return jsonify({"error": f"radius_km must be between 0 and {MAX_RADIUS_KM}"}), 400
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        cursor = conn.cursor()
+        jobs, searched_km = find_nearby(cursor, lat, lon, radius_km, limit)
+        cursor.close()
+        conn.close()
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({
+        "message": "Nearby jobs retrieved successfully",
+        "jobs": jobs,
+        "radius_km": searched_km
+    })
+
+@app.route('/api/joboffers/search', methods=['GET'])
+@cached('available_jobs')
+@read_only
+def search_job_offers():
+    # Ranked full-text search of open offers by company name and address: ?q=&limit=&offset=
+    try:
+        q, limit, offset = parse_search_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute(JOB_OFFER_SEARCH_QUERY, (q, q, q, q, limit + 1, offset))
+        jobs = fetch_dicts(cursor)
+        cursor.close()
+        conn.close()
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+
+    next_offset = None
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        next_offset = offset + limit
+
+    return jsonify({
+        "message": "Job offers retrieved successfully",
+        "jobs": add_highlights(jobs, q, ('CompanyName', 'Street', 'City')),
+        "next_offset": next_offset
+    })
 
 @app.route('/api/joboffers/<int:job_id>/apply', methods=['POST'])
 def apply_to_job(job_id):
@@ -709,66 +1153,60 @@ def apply_to_job(job_id):
         try:
             cursor = conn.cursor(dictionary=True)
             
-            # First verify if the job offer exists and is open
-            cursor.execute("""
-                SELECT JobOfferID, Status, MaxWage 
-                FROM JobOffer 
-                WHERE JobOfferID = %s
-            """, (job_id,))
-            job_offer = cursor.fetchone()
+            # Get current date in YYYY-MM-DD format
+            current_date = date.today().strftime('%Y-%m-%d')
             
-            if not job_offer:
-                return jsonify({
-                    "error": "Job offer not found"
-                }), 404
-                
-            if job_offer['Status'] != 'Open':
+            # Insert only if the job offer is open, the wage is within MaxWage
+            # and the worker exists. The (JobOfferID, WorkerID) primary key
+            # rejects duplicates, also between concurrent requests.
+            # Autocommit: this single statement is the whole transaction.
+            try:
+                cursor.execute("""
+                    INSERT INTO Application (JobOfferID, WorkerID, Status, WageOffer, Date) 
+                    SELECT j.JobOfferID, w.UserID, 'Pending', %s, %s
+                    FROM JobOffer j, Worker w
+                    WHERE j.JobOfferID = %s
+                      AND w.UserID = %s
+                      AND j.Status = 'Open'
+                      AND j.MaxWage >= %s
+                """, (data['wage_offer'], current_date, job_id, data['worker_id'], data['wage_offer']))
+            except IntegrityError as e:
+                if e.errno != errorcode.ER_DUP_ENTRY:
+                    raise
                 return jsonify({
-                    "error": "This job offer is no longer open for applications"
+                    "error": "You have already applied to this job offer"
                 }), 400
             
-            # Verify if the worker exists
-            cursor.execute("""
-                SELECT UserID 
-                FROM Worker 
-                WHERE UserID = %s
-            """, (data['worker_id'],))
-            worker = cursor.fetchone()
-            
-            if not worker:
-                return jsonify({
-                    "error": "Invalid worker ID"
-                }), 404
-            
-            # Check if wage offer is not higher than maximum wage
-            if float(data['wage_offer']) > float(job_offer['MaxWage']):
+            if cursor.rowcount == 0:
+                # Rejected by a guard: find out which one (failure path only)
+                cursor.execute("""
+                    SELECT j.Status, j.MaxWage,
+                           EXISTS(SELECT 1 FROM Worker WHERE UserID = %s) as WorkerExists
+                    FROM JobOffer j
+                    WHERE j.JobOfferID = %s
+                """, (data['worker_id'], job_id))
+                job_offer = cursor.fetchone()
+                
+                if not job_offer:
+                    return jsonify({
+                        "error": "Job offer not found"
+                    }), 404
+                
+                if job_offer['Status'] != 'Open':
+                    return jsonify({
+                        "error": "This job offer is no longer open for applications"
+                    }), 400
+                
+                if not job_offer['WorkerExists']:
+                    return jsonify({
+                        "error": "Invalid worker ID"
+                    }), 404
+                
                 return jsonify({
                     "error": f"Wage offer cannot be higher than maximum wage ({job_offer['MaxWage']})"
                 }), 400
             
-            # Check if worker has already applied to this job offer
-            cursor.execute("""
-                SELECT Status 
-                FROM Application 
-                WHERE JobOfferID = %s AND WorkerID = %s
-            """, (job_id, data['worker_id']))
-            existing_application = cursor.fetchone()
-            
-            if existing_application:
-                return jsonify({
-                    "error": "You have already applied to this job offer"
-                }), 400
-            
-            # Get current date in YYYY-MM-DD format
-            current_date = date.today().strftime('%Y-%m-%d')
-            
-            # Create the application with current date
-            cursor.execute("""
-                INSERT INTO Application (JobOfferID, WorkerID, Status, WageOffer, Date) 
-                VALUES (%s, %s, %s, %s, %s)
-            """, (job_id, data['worker_id'], 'PENDING', data['wage_offer'], current_date))
-            
-            conn.commit()
+            invalidate(f"worker_applications:{data['worker_id']}")
             
             cursor.close()
             conn.close()
@@ -784,6 +1222,9 @@ def apply_to_job(job_id):
     return jsonify({"error": "Database connection failed"}), 500
 
 @app.route('/api/workers/<int:worker_id>/applications', methods=['GET'])
+@conditional('worker_applications', 'worker_applications:{worker_id}')
+@cached('worker_applications', 'worker_applications:{worker_id}')
+@read_only
 def get_my_applications(worker_id):
     # Optional status filter from query parameters
     status = request.args.get('status')
@@ -791,80 +1232,17 @@ def get_my_applications(worker_id):
     conn = get_db_connection()
     if conn:
         try:
-            cursor = conn.cursor(dictionary=True)
+            # Worker check and applications (with job offer, location and
+            # company) in one statement
+            known, applications = repository.worker_applications(conn, worker_id, status)
             
-            # First verify if the worker exists
-            cursor.execute("""
-                SELECT UserID 
-                FROM Worker 
-                WHERE UserID = %s
-            """, (worker_id,))
-            worker = cursor.fetchone()
+            conn.close()
             
-            if not worker:
+            if not known:
                 return jsonify({
                     "error": "Invalid worker ID"
                 }), 404
             
-            # Base query with joins to get job offer, location and company info
-            base_query = """
-                SELECT 
-                    a.JobOfferID,
-                    a.WorkerID,
-                    a.Status as ApplicationStatus,
-                    a.WageOffer,
-                    a.Date as ApplicationDate,
-                    j.Status as JobStatus,
-                    j.Date as JobDate,
-                    j.StartTime,
-                    j.EndTime,
-                    j.MaxWage,
-                    j.WorkingDays,
-                    j.Hours,
-                    l.Street,
-                    l.Number,
-                    l.City,
-                    c.Name as CompanyName
-                FROM Application a, JobOffer j, Location l, Company c
-                WHERE a.JobOfferID = j.JobOfferID
-                  AND j.LocationID = l.LocationID
-                  AND l.CompanyID = c.CompanyID
-                  AND a.WorkerID = %s
-            """
-            
-            # Add status filter if provided
-            if status:
-                base_query += " AND a.Status = %s"
-                cursor.execute(base_query, (worker_id, status))
-            else:
-                cursor.execute(base_query, (worker_id,))
-            
-            applications = cursor.fetchall()
-            
-            # Convert datetime/timedelta objects to strings
-            for app in applications:
-                if app.get('ApplicationDate'):
-                    app['ApplicationDate'] = app['ApplicationDate'].strftime('%Y-%m-%d')
-                if app.get('JobDate'):
-                    app['JobDate'] = app['JobDate'].strftime('%Y-%m-%d')
-                if app.get('StartTime'):
-                    # Convert timedelta to string in HH:MM:SS format
-                    total_seconds = int(app['StartTime'].total_seconds())
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    seconds = total_seconds % 60
-                    app['StartTime'] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                if app.get('EndTime'):
-                    # Convert timedelta to string in HH:MM:SS format
-                    total_seconds = int(app['EndTime'].total_seconds())
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    seconds = total_seconds % 60
-                    app['EndTime'] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-            
-            cursor.close()
-            conn.close()
-            
             return jsonify({
                 "message": "Applications retrieved successfully",
                 "applications": applications
@@ -876,9 +1254,17 @@ def get_my_applications(worker_id):
     return jsonify({"error": "Database connection failed"}), 500
 
 @app.route('/api/joboffers/<int:job_id>/employer', methods=['GET'])
+@cached()
+@read_only
 def get_job_employer_info(job_id):
-    conn = get_db_connection()
-    if conn:
+    # From memory when the read model has the offer
+    model = read_model.get_read_model()
+    result = model.job_employer(job_id) if model is not None else None
+    
+    if result is None:
+        conn = get_db_connection()
+        if not conn:
+            return jsonify({"error": "Database connection failed"}), 500
         try:
             cursor = conn.cursor(dictionary=True)
             
@@ -905,40 +1291,36 @@ def get_job_employer_info(job_id):
             
             result = cursor.fetchone()
             
-            if not result:
-                return jsonify({
-                    "error": "Job offer not found"
-                }), 404
-            
-            # Structure the response
-            response = {
-                "employer": {
-                    "id": result['EmployerID'],
-                    "first_name": result['FirstName'],
-                    "surname": result['Surname'],
-                    "email": result['Email'],
-                    "phone_number": result['PhoneNumber']
-                },
-                "company": {
-                    "id": result['CompanyID'],
-                    "name": result['CompanyName'],
-                    "location": {
-                        "street": result['Street'],
-                        "number": result['Number'],
-                        "city": result['City']
-                    }
-                }
-            }
-            
             cursor.close()
             conn.close()
             
-            return jsonify(response)
-            
         except Error as e:
             return jsonify({"error": str(e)}), 500
-            
-    return jsonify({"error": "Database connection failed"}), 500
+    
+    if not result:
+        return jsonify({
+            "error": "Job offer not found"
+        }), 404
+    
+    # Structure the response
+    return jsonify({
+        "employer": {
+            "id": result['EmployerID'],
+            "first_name": result['FirstName'],
+            "surname": result['Surname'],
+            "email": result['Email'],
+            "phone_number": result['PhoneNumber']
+        },
+        "company": {
+            "id": result['CompanyID'],
+            "name": result['CompanyName'],
+            "location": {
+                "street": result['Street'],
+                "number": result['Number'],
+                "city": result['City']
+            }
+        }
+    })
 
 if __name__ == '__main__':
     app.run(debug=True, port=4000)
@@ -0,0 +1,394 @@
+import asyncio
+import logging
+import os
+from datetime import date
+
+import aiomysql
+from dotenv import load_dotenv
+from pymysql.constants import ER
+from quart import Quart, Response, request
+from quart_cors import cors
+
+import serialization
+from feed import (CHANGES_QUERY, FEED_GAP_LOOKBACK, FEED_KEEPALIVE, FEED_POLL_INTERVAL, FEED_RETENTION_DAYS,
+                  MISSING_CHANGES_QUERY, PRUNE_QUERY, RECENT_CHANGES_QUERY, FeedHub, parse_after, parse_filters,
+                  start_position)
+from job_search import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, build_available_jobs_query, make_cursor
+
+# asyncio variant of the I/O-bound endpoints of app.py (same routes, same
+# payloads), on Quart with an aiomysql pool. A request waiting on MySQL is a
+# suspended coroutine, not a blocked thread, so one process keeps thousands of
+# requests in flight while at most DB_POOL_SIZE queries run at once.
+#
+#   hypercorn async_app:app --bind 0.0.0.0:4000 --workers 4
+#
+# It also serves the change feed (GET /api/feed, see feed.py): long-lived
+# Server-Sent Events streams, which would each hold a thread in app.py.
+load_dotenv()
+
+FEED_PRUNE_INTERVAL = 3600
+
+app = cors(Quart(__name__))
+
+
+def jsonify(obj):
+    return Response(serialization.dumps_bytes(obj), mimetype='application/json')
+
+
+@app.before_serving
+async def create_pool():
+    # Runs in every worker process, after the server forked it
+    app.pool = await aiomysql.create_pool(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        # password=os.getenv('DB_PASSWORD'),
+        db=os.getenv('DB_NAME'),
+        minsize=1,
+        maxsize=int(os.getenv('DB_POOL_SIZE', 10)),
+        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 3600)),
+        # aiomysql closes connections released mid-transaction, so plain reads
+        # must not open one; single-statement writes commit on their own
+        autocommit=True
+    )
+    try:
+        recent = await fetch_all(RECENT_CHANGES_QUERY, (FEED_GAP_LOOKBACK,))
+    except aiomysql.ProgrammingError as e:
+        if e.args[0] != ER.NO_SUCH_TABLE:
+            raise
+        raise RuntimeError("The change feed reads the ChangeLog table, which is missing: "
+                           "apply the migrations first (python sql_queries/migrate.py)") from e
+    last_id, missing = start_position([row['ChangeID'] for row in recent])
+    app.feed = FeedHub(fetch_changes, fetch_missing, last_id, missing)
+    app.feed_task = asyncio.get_running_loop().create_task(run_feed(app.feed))
+
+
+@app.after_serving
+async def close_pool():
+    app.feed_task.cancel()
+    app.pool.close()
+    await app.pool.wait_closed()
+
+
+async def fetch_all(query, params=()):
+    async with app.pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchall()
+
+
+async def fetch_one(query, params=()):
+    async with app.pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchone()
+
+
+async def fetch_changes(after, upto, limit):
+    return await fetch_all(CHANGES_QUERY, (after, upto, limit))
+
+
+async def fetch_missing(change_ids):
+    return await fetch_all(MISSING_CHANGES_QUERY.format(ids=', '.join(['%s'] * len(change_ids))), change_ids)
+
+
+async def run_feed(hub):
+    # The process's single reader of the outbox, plus keepalives and retention
+    loop = asyncio.get_running_loop()
+    next_keepalive = loop.time() + FEED_KEEPALIVE
+    next_prune = loop.time()
+    while True:
+        try:
+            if not await hub.poll():
+                await asyncio.sleep(FEED_POLL_INTERVAL)
+            if loop.time() >= next_keepalive:
+                next_keepalive = loop.time() + FEED_KEEPALIVE
+                hub.wake()
+            if loop.time() >= next_prune:
+                next_prune = loop.time() + FEED_PRUNE_INTERVAL
+                async with app.pool.acquire() as conn:
+                    async with conn.cursor() as cursor:
+                        await cursor.execute(PRUNE_QUERY, (int(FEED_RETENTION_DAYS * 86400),))
+        except aiomysql.Error as e:
+            logging.getLogger('job2main').warning("feed poll failed: %s", e)
+            await asyncio.sleep(FEED_POLL_INTERVAL)
+
+
+@app.route('/')
+async def hello():
+    return "Hello, World!"
+
+
+@app.route('/api/joboffers/available', methods=['GET'])
+async def get_available_jobs():
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+
+    try:
+        query, params = build_available_jobs_query(request.args, limit + 1)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        jobs = await fetch_all(query, params)
+    except aiomysql.Error as e:
+        return jsonify({"error": str(e)}), 500
+
+    next_cursor = None
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        next_cursor = make_cursor(jobs[-1], request.args.get('sort', 'date'))
+
+    return jsonify({
+        "message": "Available jobs retrieved successfully",
+        "jobs": jobs,
+        "next_cursor": next_cursor
+    })
+
+
+@app.route('/api/workers', methods=['GET'])
+async def get_all_workers():
+    try:
+        workers = await fetch_all("""
+            SELECT U.UserID, U.FirstName, U.Surname, U.Name, U.Email, U.PhoneNumber, W.Experiences, W.Description
+            FROM User as U, Worker as W
+            WHERE U.UserID = W.UserID
+        """)
+    except aiomysql.Error as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify({"workers": workers})
+
+
+@app.route('/api/employers/<int:employer_id>/joboffers', methods=['GET'])
+async def get_my_job_offers(employer_id):
+    # Optional status filter from query parameters
+    status = request.args.get('status')
+
+    query = """
+        SELECT
+            j.JobOfferID,
+            j.LocationID,
+            j.Status,
+            j.Date,
+            j.StartTime,
+            j.EndTime,
+            j.MaxWage,
+            j.WorkingDays,
+            j.Hours,
+            l.Street,
+            l.Number,
+            l.City,
+            c.Name as CompanyName
+        FROM JobOffer j, Location l, Company c
+        WHERE j.LocationID = l.LocationID
+          AND l.CompanyID = c.CompanyID
+          AND j.CreatedBy = %s
+    """
+    params = (employer_id,)
+    if status:
+        query += " AND j.Status = %s"
+        params = (employer_id, status)
+
+    try:
+        # The employer check and the listing are independent: run both at once
+        employer, job_offers = await asyncio.gather(
+            fetch_one("SELECT UserID FROM Employer WHERE UserID = %s LIMIT 1", (employer_id,)),
+            fetch_all(query, params)
+        )
+    except aiomysql.Error as e:
+        return jsonify({"error": str(e)}), 500
+
+    if not employer:
+        return jsonify({"error": "Invalid employer ID"}), 404
+
+    return jsonify({
+        "message": "Job offers retrieved successfully",
+        "job_offers": job_offers
+    })
+
+
+@app.route('/api/workers/<int:worker_id>/applications', methods=['GET'])
+async def get_my_applications(worker_id):
+    # Optional status filter from query parameters
+    status = request.args.get('status')
+
+    query = """
+        SELECT
+            a.JobOfferID,
+            a.WorkerID,
+            a.Status as ApplicationStatus,
+            a.WageOffer,
+            a.Date as ApplicationDate,
+            j.Status as JobStatus,
+            j.Date as JobDate,
+            j.StartTime,
+            j.EndTime,
+            j.MaxWage,
+            j.WorkingDays,
+            j.Hours,
+            l.Street,
+            l.Number,
+            l.City,
+            c.Name as CompanyName
+        FROM Application a, JobOffer j, Location l, Company c
+        WHERE a.JobOfferID = j.JobOfferID
+          AND j.LocationID = l.LocationID
+          AND l.CompanyID = c.CompanyID
+          AND a.WorkerID = %s
+    """
+    params = (worker_id,)
+    if status:
+        query += " AND a.Status = %s"
+        params = (worker_id, status)
+
+    try:
+        worker, applications = await asyncio.gather(
+            fetch_one("SELECT UserID FROM Worker WHERE UserID = %s", (worker_id,)),
+            fetch_all(query, params)
+        )
+    except aiomysql.Error as e:
+        return jsonify({"error": str(e)}), 500
+
+    if not worker:
+        return jsonify({"error": "Invalid worker ID"}), 404
+
+    return jsonify({
+        "message": "Applications retrieved successfully",
+        "applications": applications
+    })
+
+
+@app.route('/api/joboffers/<int:job_id>/employer', methods=['GET'])
+async def get_job_employer_info(job_id):
+    try:
+        result = await fetch_one("""
+            SELECT
+                j.JobOfferID,
+                j.CreatedBy as EmployerID,
+                u.FirstName,
+                u.Surname,
+                u.Email,
+                u.PhoneNumber,
+                c.CompanyID,
+                c.Name as CompanyName,
+                l.Street,
+                l.Number,
+                l.City
+            FROM JobOffer j, User u, Location l, Company c
+            WHERE j.CreatedBy = u.UserID
+              AND j.LocationID = l.LocationID
+              AND l.CompanyID = c.CompanyID
+              AND j.JobOfferID = %s
+        """, (job_id,))
+    except aiomysql.Error as e:
+        return jsonify({"error": str(e)}), 500
+
+    if not result:
+        return jsonify({"error": "Job offer not found"}), 404
+
+    return jsonify({
+        "employer": {
+            "id": result['EmployerID'],
+            "first_name": result['FirstName'],
+            "surname": result['Surname'],
+            "email": result['Email'],
+            "phone_number": result['PhoneNumber']
+        },
+        "company": {
+            "id": result['CompanyID'],
+            "name": result['CompanyName'],
+            "location": {
+                "street": result['Street'],
+                "number": result['Number'],
+                "city": result['City']
+            }
+        }
+    })
+
+
+@app.route('/api/joboffers/<int:job_id>/apply', methods=['POST'])
+async def apply_to_job(job_id):
+    data = await request.get_json(silent=True)
+    if not data or 'worker_id' not in data or 'wage_offer' not in data:
+        return jsonify({"error": "Required fields: worker_id, wage_offer"}), 400
+
+    current_date = date.today().strftime('%Y-%m-%d')
+    try:
+        async with app.pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                # Same guarded single-statement insert as app.py
+                try:
+                    inserted = await cursor.execute("""
+                        INSERT INTO Application (JobOfferID, WorkerID, Status, WageOffer, Date)
+                        SELECT j.JobOfferID, w.UserID, 'Pending', %s, %s
+                        FROM JobOffer j, Worker w
+                        WHERE j.JobOfferID = %s
+                          AND w.UserID = %s
+                          AND j.Status = 'Open'
+                          AND j.MaxWage >= %s
+                    """, (data['wage_offer'], current_date, job_id, data['worker_id'], data['wage_offer']))
+                except aiomysql.IntegrityError as e:
+                    # Only the (JobOfferID, WorkerID) key, other constraint
+                    # errors are reported as such
+                    if e.args[0] != ER.DUP_ENTRY:
+                        raise
+                    return jsonify({"error": "You have already applied to this job offer"}), 400
+
+                if not inserted:
+                    # Rejected by a guard: find out which one (failure path only)
+                    await cursor.execute("""
+                        SELECT j.Status, j.MaxWage,
+                               EXISTS(SELECT 1 FROM Worker WHERE UserID = %s) as WorkerExists
+                        FROM JobOffer j
+                        WHERE j.JobOfferID = %s
+                    """, (data['worker_id'], job_id))
+                    job_offer = await cursor.fetchone()
+    except aiomysql.Error as e:
+        return jsonify({"error": str(e)}), 500
+
+    if not inserted:
+        if not job_offer:
+            return jsonify({"error": "Job offer not found"}), 404
+        if job_offer['Status'] != 'Open':
+            return jsonify({"error": "This job offer is no longer open for applications"}), 400
+        if not job_offer['WorkerExists']:
+            return jsonify({"error": "Invalid worker ID"}), 404
+        return jsonify({
+            "error": f"Wage offer cannot be higher than maximum wage ({job_offer['MaxWage']})"
+        }), 400
+
+    return jsonify({
+        "message": "Application submitted successfully",
+        "application_date": current_date
+    }), 201
+
+
+@app.route('/api/feed', methods=['GET'])
+async def change_feed():
+    # Server-Sent Events: "job_offer" events (new Open offers with their
+    # details, Completed offers) and "application" events (status changes).
+    # Resume with the Last-Event-ID header (sent by EventSource on reconnect)
+    # or ?after=<id>; filters: ?kinds=&worker_id=&city=
+    try:
+        after = parse_after(request.headers.get('Last-Event-ID') or request.args.get('after'))
+        accept = parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = Response(app.feed.subscribe(after, accept), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Proxies (nginx) must pass events through as they come
+    response.headers['X-Accel-Buffering'] = 'no'
+    # The stream stays open for as long as the client listens
+    response.timeout = None
+    return response
+
+
+@app.route('/api/admin/feed', methods=['GET'])
+async def feed_stats():
+    return jsonify(app.feed.stats())
+
+
+if __name__ == '__main__':
+    app.run(debug=True, port=4000)
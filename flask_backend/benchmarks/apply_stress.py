@@ -0,0 +1,74 @@
+import argparse
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+# Concurrency stress test of POST /api/joboffers/<id>/apply against a running
+# server: every worker sends --copies identical applications at the same
+# instant. Exactly one per worker must succeed, the others must get
+# "You have already applied to this job offer".
+#
+#   python benchmarks/apply_stress.py --job-id 12 --workers 2,3,5,7 --copies 16
+#
+# Use an Open job offer whose MaxWage is >= --wage and workers that have not
+# applied to it yet.
+
+
+def apply(base_url, job_id, worker_id, wage, barrier, results):
+    body = json.dumps({"worker_id": worker_id, "wage_offer": wage}).encode()
+    req = urllib.request.Request(
+        f"{base_url}/api/joboffers/{job_id}/apply", data=body,
+        headers={"Content-Type": "application/json"}, method='POST'
+    )
+    barrier.wait()
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            status, payload = response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        status, payload = e.code, json.loads(e.read() or b'{}')
+    results.append((worker_id, status, payload.get("error"), time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:4000')
+    parser.add_argument('--job-id', type=int, required=True)
+    parser.add_argument('--workers', required=True, help="comma separated worker IDs")
+    parser.add_argument('--copies', type=int, default=16, help="parallel applies per worker")
+    parser.add_argument('--wage', type=float, default=1.0)
+    args = parser.parse_args()
+
+    worker_ids = [int(w) for w in args.workers.split(',')]
+    total = len(worker_ids) * args.copies
+    barrier = threading.Barrier(total)
+    results = []
+    threads = [
+        threading.Thread(target=apply, args=(args.url, args.job_id, worker_id, args.wage, barrier, results))
+        for worker_id in worker_ids for _ in range(args.copies)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    failed = False
+    for worker_id in worker_ids:
+        outcomes = Counter((status, error) for w, status, error, _ in results if w == worker_id)
+        created = outcomes.pop((201, None), 0)
+        duplicates = outcomes.pop((400, "You have already applied to this job offer"), 0)
+        ok = created == 1 and duplicates == args.copies - 1 and not outcomes
+        failed |= not ok
+        print(f"worker {worker_id}: {created} created, {duplicates} duplicates, "
+              f"other {dict(outcomes)} -> {'OK' if ok else 'FAIL'}")
+
+    latencies = sorted(latency for *_, latency in results)
+    print(f"{total} requests in {elapsed:.2f}s, p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+          f"max {latencies[-1] * 1000:.1f} ms")
+    sys.exit(1 if failed else 0)
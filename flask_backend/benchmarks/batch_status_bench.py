@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import time
+import urllib.request
+
+import mysql.connector
+from dotenv import load_dotenv
+
+# Throughput of PUT /api/applications/status (one decision per request) vs
+# PUT /api/applications/status/batch, against a running server.
+#
+# Picks 2 * --count Pending applications of Running job offers and refuses
+# half through each route. This CHANGES DATA: run it on a seeded copy.
+#
+#   python benchmarks/batch_status_bench.py --count 500 --batch-size 100
+
+load_dotenv()
+
+
+def put(base_url, path, body):
+    req = urllib.request.Request(
+        base_url + path, data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json"}, method='PUT'
+    )
+    with urllib.request.urlopen(req, timeout=60) as response:
+        return json.loads(response.read())
+
+
+def pending_applications(limit):
+    conn = mysql.connector.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        # password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME', 'Job2main')
+    )
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT a.JobOfferID, a.WorkerID
+        FROM Application a, JobOffer j
+        WHERE a.JobOfferID = j.JobOfferID
+          AND a.Status = 'Pending' AND j.Status = 'Running'
+        LIMIT %s
+    """, (limit,))
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return rows
+
+
+def report(label, count, elapsed):
+    print(f"{label:<10} {count} decisions in {elapsed:6.2f}s  {count / elapsed:10,.0f} decisions/s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:4000')
+    parser.add_argument('--count', type=int, default=500, help="decisions per route")
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    rows = pending_applications(2 * args.count)
+    if len(rows) < 2:
+        raise SystemExit("No Pending applications on Running job offers to work with")
+    half = len(rows) // 2
+    single, batch = rows[:half], rows[half:2 * half]
+
+    start = time.perf_counter()
+    for job_offer_id, worker_id in single:
+        put(args.url, '/api/applications/status',
+            {"job_offer_id": job_offer_id, "worker_id": worker_id, "new_status": "Refused"})
+    single_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, len(batch), args.batch_size):
+        put(args.url, '/api/applications/status/batch', {"decisions": [
+            {"job_offer_id": job_offer_id, "worker_id": worker_id, "new_status": "Refused"}
+            for job_offer_id, worker_id in batch[i:i + args.batch_size]
+        ]})
+    batch_elapsed = time.perf_counter() - start
+
+    report("per-item", len(single), single_elapsed)
+    report("batch", len(batch), batch_elapsed)
+    print(f"speedup    {single_elapsed / batch_elapsed:.1f}x")
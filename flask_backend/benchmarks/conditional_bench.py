@@ -0,0 +1,105 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..'))
+sys.path.insert(0, BENCHMARKS_DIR)
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..', '..', 'data_generation'))
+
+# Bandwidth and CPU of polling clients, with and without conditional GETs.
+#
+# The app runs in process (Flask test client) on a seeded SQLite stand-in,
+# with the response cache off so every full response runs its query.
+# --pollers simulated clients poll the three polled listings in turn; every
+# --write-every polls a worker applies to an offer, which changes that
+# worker's applications. "plain" clients never send validators, "conditional"
+# ones send back the last ETag of each URL (If-None-Match).
+#
+#   python benchmarks/conditional_bench.py --polls 3000 --write-every 50
+#
+# Bytes are response bodies plus headers; CPU is process time of the whole
+# run (client side included, it is the same for both modes).
+
+os.environ.setdefault('CACHE_BACKEND', 'none')
+os.environ.setdefault('METRICS_ENABLED', '0')
+os.environ['DB_BACKEND'] = 'sqlite'
+os.environ.setdefault('DB_SQLITE_PATH', os.path.join(tempfile.mkdtemp(prefix='job2main-bench-'), 'job2main.sqlite3'))
+
+import sqlite_backend
+from harness import SCALES, fixtures, seed
+
+
+def urls_for(workers, pollers):
+    # Each poller follows the open offers, the workers and its own applications
+    return [['/api/joboffers/available?limit=50', '/api/workers', f'/api/workers/{worker_id}/applications']
+            for worker_id in workers[:pollers]]
+
+
+def run(app, mode, polls, write_every, poller_urls, open_jobs, workers, rng):
+    client = app.test_client()
+    etags = {}
+    statuses = {}
+    writes = {}
+    sent = 0
+    start_cpu, start = time.process_time(), time.perf_counter()
+    for i in range(polls):
+        if write_every and i % write_every == write_every - 1:
+            job_id, max_wage = rng.choice(open_jobs)
+            response = client.post(f'/api/joboffers/{job_id}/apply', json={
+                "worker_id": rng.choice(workers[:len(poller_urls)]), "wage_offer": round(min(10, max_wage), 2)})
+            writes[response.status_code] = writes.get(response.status_code, 0) + 1
+        url = poller_urls[i % len(poller_urls)][i // len(poller_urls) % 3]
+        headers = {}
+        if mode == 'conditional' and (i % len(poller_urls), url) in etags:
+            headers['If-None-Match'] = etags[i % len(poller_urls), url]
+        response = client.get(url, headers=headers)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        sent += len(response.get_data()) + sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+        if response.headers.get('ETag'):
+            etags[i % len(poller_urls), url] = response.headers['ETag']
+    return {
+        "seconds": time.perf_counter() - start,
+        "cpu": time.process_time() - start_cpu,
+        "bytes": sent,
+        "statuses": statuses,
+        "writes": writes,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Polling cost with and without If-None-Match")
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--pollers', type=int, default=20, help="simulated polling clients")
+    parser.add_argument('--polls', type=int, default=3000, help="GET requests per mode")
+    parser.add_argument('--write-every', type=int, default=50, help="one apply per this many polls, 0 = none")
+    args = parser.parse_args()
+
+    path = os.environ['DB_SQLITE_PATH']
+    sqlite_backend.create_schema(path)
+    conn = sqlite_backend.connect(path)
+    seed(conn, SCALES[args.scale], args.seed)
+    open_jobs, workers, _ = fixtures(conn)
+    conn.close()
+
+    from app import app
+    poller_urls = urls_for(workers, args.pollers)
+
+    results = {}
+    for mode in ('plain', 'conditional'):
+        # Another draw per mode: applying twice to the same offer changes nothing
+        results[mode] = run(app, mode, args.polls, args.write_every, poller_urls, open_jobs, workers,
+                            random.Random(f"{args.seed}-{mode}"))
+
+    for mode, result in results.items():
+        print(f"{mode:<12} {result['bytes'] / args.polls:10.0f} bytes/poll  "
+              f"{result['cpu'] / args.polls * 1e6:8.0f} us CPU/poll  "
+              f"{result['seconds'] / args.polls * 1e6:8.0f} us/poll  "
+              f"polls {result['statuses']} applies {result['writes']}")
+    plain, cond = results['plain'], results['conditional']
+    print(f"saved        {(1 - cond['bytes'] / plain['bytes']) * 100:9.1f}% bytes  "
+          f"{(1 - cond['cpu'] / plain['cpu']) * 100:9.1f}% CPU")
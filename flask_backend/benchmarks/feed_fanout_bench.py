@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from feed import FeedHub
+
+# Fan-out cost of the change feed (feed.py), in process: --subscribers idle
+# SSE streams wait on one FeedHub fed from an in-memory outbox, then --events
+# changes are published in batches of --batch. Reports the memory each idle
+# subscriber holds and the time from publish() until every subscriber has
+# the batch. Sockets and HTTP framing are not included (hypercorn adds its
+# own per-connection buffers).
+#
+#   python benchmarks/feed_fanout_bench.py --subscribers 5000 --events 200 --batch 10
+
+
+def change(change_id):
+    return {
+        'ChangeID': change_id, 'Kind': 'job_offer', 'JobOfferID': change_id, 'WorkerID': None,
+        'Status': 'Open', 'CreatedAt': datetime(2025, 1, 1), 'LocationID': 1, 'Date': None,
+        'StartTime': None, 'EndTime': None, 'MaxWage': None, 'WorkingDays': 5, 'Hours': 8,
+        'Street': 'Street1', 'Number': '1', 'City': 'Istanbul', 'CompanyName': 'Company1',
+    }
+
+
+class Progress:
+    # How many subscribers got everything up to the current target
+    def __init__(self, subscribers):
+        self.subscribers = subscribers
+        self.target = 0
+        self.reached = 0
+        self.done = asyncio.Event()
+
+    def start(self, target):
+        self.target, self.reached = target, 0
+        self.done = asyncio.Event()
+
+
+async def listen(hub, progress):
+    received = 0
+    async for chunk in hub.subscribe():
+        received += chunk.count(b'\nevent: ')
+        if received == progress.target:
+            progress.reached += 1
+            if progress.reached == progress.subscribers:
+                progress.done.set()
+
+
+async def main(args):
+    async def fetch(after, upto, limit):
+        return []
+
+    async def fetch_missing(change_ids):
+        return []
+
+    hub = FeedHub(fetch, fetch_missing, 0)
+    progress = Progress(args.subscribers)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tasks = []
+    for _ in range(args.subscribers):
+        tasks.append(asyncio.create_task(listen(hub, progress)))
+    await asyncio.sleep(0.1)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    idle_bytes = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    print(f"{args.subscribers} idle subscribers: {idle_bytes / args.subscribers:.0f} bytes each")
+
+    latencies = []
+    next_id = 1
+    for _ in range(args.events // args.batch):
+        rows = [change(next_id + i) for i in range(args.batch)]
+        next_id += args.batch
+        target = next_id - 1
+        progress.start(target)
+        start = time.perf_counter()
+        hub.publish(rows, time.monotonic())
+        await asyncio.wait_for(progress.done.wait(), 30)
+        latencies.append(time.perf_counter() - start)
+
+    for task in tasks:
+        task.cancel()
+    latencies.sort()
+    print(f"batch of {args.batch} to every subscriber: "
+          f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms, "
+          f"{args.subscribers * args.batch / latencies[len(latencies) // 2]:.0f} deliveries/s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subscribers', type=int, default=5000)
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=10, help="events per publish (one outbox poll)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,296 @@
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import mysql.connector
+from dotenv import load_dotenv
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(BENCHMARKS_DIR, '..')
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, '..', 'data_generation'))
+import sqlite_backend
+from dataGeneration import DataGenerator, HEADERS
+from load_test import percentile, wait_until_ready
+
+# Reproducible API benchmark: seeds a database with DataGenerator, starts
+# serve.py on it, drives a weighted mix of routes from --concurrency
+# keep-alive clients for --duration seconds, and prints (and --out writes) a
+# JSON report with throughput and p50/p95/p99 per route, to compare commits.
+#
+#   python benchmarks/harness.py --scale small --concurrency 16 --duration 30 --out before.json
+#
+# --backend mysql uses the DB_* database from .env. It is seeded only when
+# its User table is empty (create.sql + migrate.py first); otherwise the
+# data already there is used. --backend sqlite builds a fresh SQLite file
+# (see sqlite_backend.py), auto picks MySQL when it answers.
+#
+# The mix CHANGES DATA (applications and their decisions): on MySQL, run it
+# on a scratch database.
+
+load_dotenv()
+
+SCALES = {
+    # users, employers, companies, job offers, applications
+    'small': (2_000, 200, 200, 5_000, 20_000),
+    'medium': (20_000, 2_000, 2_000, 50_000, 200_000),
+    'large': (200_000, 20_000, 20_000, 500_000, 2_000_000),
+}
+
+DEFAULT_MIX = 'browse=60,my_applications=20,apply=15,decide=5'
+SEED_BATCH_SIZE = 5000
+
+
+def mysql_connect():
+    return mysql.connector.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        # password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME', 'Job2main')
+    )
+
+
+def open_backend(backend, sqlite_path):
+    # Returns (backend, connection)
+    if backend in ('mysql', 'auto'):
+        try:
+            return 'mysql', mysql_connect()
+        except mysql.connector.Error as e:
+            if backend == 'mysql':
+                raise
+            print(f"MySQL unavailable ({e.msg}), using SQLite", file=sys.stderr)
+    sqlite_backend.create_schema(sqlite_path)
+    return 'sqlite', sqlite_backend.connect(sqlite_path)
+
+
+def generate(scale, seed):
+    random.seed(seed)
+    data_gen = DataGenerator(*scale)
+    users = data_gen.generate_users_and_split()
+    employers = data_gen.generate_employers()
+    companies = data_gen.generate_companies()
+    employers = data_gen.update_employers_with_companies(employers, companies)
+    locations = data_gen.generate_locations(companies)
+    workers = data_gen.generate_workers()
+    job_offers = data_gen.generate_job_offers(locations)
+    # The generator may draw the same (job offer, worker) pair twice
+    applications = list({(a["JobOfferID"], a["WorkerID"]): a
+                         for a in data_gen.generate_applications(job_offers)}.values())
+    return [("User", users), ("Company", companies), ("Employer", employers), ("Worker", workers),
+            ("Location", locations), ("JobOffer", job_offers), ("Application", applications)]
+
+
+def seed(conn, scale, seed_value):
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM User")
+    if cursor.fetchone()[0]:
+        print("Database already has data, benchmarking it as is", file=sys.stderr)
+        cursor.close()
+        return
+    start = time.perf_counter()
+    for table, rows in generate(scale, seed_value):
+        columns = HEADERS[table]
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        for i in range(0, len(rows), SEED_BATCH_SIZE):
+            conn.start_transaction()
+            cursor.executemany(query, [[row[col] for col in columns] for row in rows[i:i + SEED_BATCH_SIZE]])
+            conn.commit()
+    cursor.close()
+    print(f"Seeded in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+def fixtures(conn):
+    # IDs the clients draw their requests from
+    cursor = conn.cursor()
+    cursor.execute("SELECT JobOfferID, MaxWage FROM JobOffer WHERE Status = 'Open'")
+    open_jobs = [(job_id, float(max_wage)) for job_id, max_wage in cursor.fetchall()]
+    cursor.execute("SELECT UserID FROM Worker")
+    workers = [row[0] for row in cursor.fetchall()]
+    cursor.execute("""
+        SELECT a.JobOfferID, a.WorkerID
+        FROM Application a, JobOffer j
+        WHERE a.JobOfferID = j.JobOfferID
+          AND a.Status = 'Pending' AND j.Status = 'Running'
+        ORDER BY a.JobOfferID, a.WorkerID
+    """)
+    pending = cursor.fetchall()
+    cursor.close()
+    if not open_jobs or not workers:
+        raise SystemExit("No open job offers or workers to benchmark with")
+    return open_jobs, workers, pending
+
+
+def request(conn, method, path, body=None):
+    payload = json.dumps(body).encode() if body is not None else None
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    conn.request(method, path, body=payload, headers=headers)
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def client(index, url, duration, mix, open_jobs, workers, pending, results):
+    rng = random.Random(index)
+    host, port = url.split('//', 1)[1].split(':')
+    conn = http.client.HTTPConnection(host, int(port), timeout=30)
+    routes, weights = zip(*mix.items())
+    samples = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    next_cursor = None
+
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        route = rng.choices(routes, weights)[0]
+        if route == 'decide' and not pending:
+            route = 'browse'
+
+        if route == 'browse':
+            # Half of the time, read the next page of the previous listing
+            after = f"&after={next_cursor}" if next_cursor and rng.random() < 0.5 else ''
+            args = ('GET', f"/api/joboffers/available?limit=20{after}")
+        elif route == 'my_applications':
+            args = ('GET', f"/api/workers/{rng.choice(workers)}/applications")
+        elif route == 'apply':
+            job_id, max_wage = rng.choice(open_jobs)
+            args = ('POST', f"/api/joboffers/{job_id}/apply",
+                    {"worker_id": rng.choice(workers), "wage_offer": round(rng.uniform(10, max_wage), 2)})
+        else:
+            job_id, worker_id = pending.pop()
+            args = ('PUT', '/api/applications/status', {
+                "job_offer_id": job_id, "worker_id": worker_id,
+                "new_status": 'Accepted' if rng.random() < 0.2 else 'Refused'
+            })
+
+        start = time.perf_counter()
+        try:
+            status, body = request(conn, *args)
+        except (OSError, http.client.HTTPException):
+            status, body = 'error', b''
+            conn.close()
+            conn = http.client.HTTPConnection(host, int(port), timeout=30)
+        samples[route].append(time.perf_counter() - start)
+        statuses[route][status] += 1
+
+        if route == 'browse' and status == 200:
+            next_cursor = json.loads(body).get('next_cursor')
+
+    conn.close()
+    results.put((dict(samples), {route: dict(counts) for route, counts in statuses.items()}))
+
+
+def summarize(latencies, statuses, duration):
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if status == 'error' or status >= 500)
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "errors": errors,
+        # 4xx are expected outcomes, e.g. applying twice to the same offer
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+    }
+
+
+def run_mix(url, concurrency, duration, mix, open_jobs, workers, pending):
+    results = multiprocessing.Queue()
+    # Each client decides its own share of the pending applications
+    procs = [
+        multiprocessing.Process(target=client, args=(
+            i, url, duration, mix, open_jobs, workers, pending[i::concurrency], results))
+        for i in range(concurrency)
+    ]
+    for proc in procs:
+        proc.start()
+    samples, statuses = defaultdict(list), defaultdict(lambda: defaultdict(int))
+    for _ in procs:
+        client_samples, client_statuses = results.get()
+        for route, latencies in client_samples.items():
+            samples[route] += latencies
+        for route, counts in client_statuses.items():
+            for status, count in counts.items():
+                statuses[route][status] += count
+    for proc in procs:
+        proc.join()
+
+    routes = {route: summarize(samples[route], statuses[route], duration) for route in sorted(samples)}
+    all_statuses = defaultdict(int)
+    for counts in statuses.values():
+        for status, count in counts.items():
+            all_statuses[status] += count
+    total = summarize([latency for latencies in samples.values() for latency in latencies], all_statuses, duration)
+    return routes, total
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Seed, serve and benchmark a mix of API routes")
+    parser.add_argument('--backend', choices=['auto', 'mysql', 'sqlite'], default='auto')
+    parser.add_argument('--sqlite-path', help="SQLite file (default: a fresh temporary one)")
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--seed', type=int, default=42, help="data generation seed")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="route=weight pairs")
+    parser.add_argument('--concurrency', type=int, default=16, help="client processes")
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--workers', type=int, default=2, help="serve.py worker processes")
+    parser.add_argument('--threads', type=int, default=8, help="serve.py threads per worker")
+    parser.add_argument('--port', type=int, default=4100)
+    parser.add_argument('--cache', default=os.getenv('CACHE_BACKEND', 'memory'), help="CACHE_BACKEND of the server")
+    parser.add_argument('--out', help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    mix = {route: float(weight) for route, weight in (pair.split('=') for pair in args.mix.split(','))}
+    sqlite_path = args.sqlite_path or os.path.join(tempfile.mkdtemp(prefix='job2main-bench-'), 'job2main.sqlite3')
+
+    backend, conn = open_backend(args.backend, sqlite_path)
+    seed(conn, SCALES[args.scale], args.seed)
+    open_jobs, workers, pending = fixtures(conn)
+    conn.close()
+
+    url = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ, CACHE_BACKEND=args.cache, DB_POOL_SIZE=str(max(args.threads, 1)))
+    if backend == 'sqlite':
+        env.update(DB_BACKEND='sqlite', DB_SQLITE_PATH=sqlite_path)
+    server = subprocess.Popen(
+        [sys.executable, 'serve.py', '--bind', f"127.0.0.1:{args.port}",
+         '--workers', str(args.workers), '--threads', str(args.threads)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(url)
+        routes, total = run_mix(url, args.concurrency, args.duration, mix, open_jobs, workers, pending)
+    finally:
+        server.terminate()
+        server.wait()
+
+    report = {
+        "commit": git_commit(),
+        "backend": backend,
+        "scale": args.scale,
+        "seed": args.seed,
+        "mix": mix,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "server": {"workers": args.workers, "threads": args.threads, "cache": args.cache},
+        "routes": routes,
+        "total": total,
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
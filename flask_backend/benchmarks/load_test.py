@@ -0,0 +1,123 @@
+import argparse
+import http.client
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+# Closed-loop HTTP load test: --clients processes each keep one keep-alive
+# connection busy for --duration seconds.
+#
+# Against a running server:
+#   python benchmarks/load_test.py --url http://localhost:4000/api/joboffers/available
+#
+# Throughput scaling with cores: starts serve.py once per worker count and
+# measures each one in turn:
+#   python benchmarks/load_test.py --spawn-workers 1,2,4,8 --threads 8 --clients 64
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def client(url, duration, results):
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    results.put((latencies, errors))
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def run_load(url, clients, duration):
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=client, args=(url, duration, results)) for _ in range(clients)]
+    for proc in procs:
+        proc.start()
+    latencies, errors = [], 0
+    for _ in procs:
+        lat, err = results.get()
+        latencies += lat
+        errors += err
+    for proc in procs:
+        proc.join()
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / duration,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def wait_until_ready(url, timeout=30):
+    parts = urlsplit(url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=1)
+            conn.request('GET', '/')
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start within {timeout}s")
+
+
+def print_result(label, result):
+    print(f"{label:<12} {result['rps']:10,.0f} req/s  p50 {result['p50_ms']:7.1f} ms  "
+          f"p95 {result['p95_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  "
+          f"({result['requests']} requests, {result['errors']} errors)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:4000/api/joboffers/available')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--spawn-workers', help="comma separated worker counts to start serve.py with")
+    parser.add_argument('--threads', type=int, default=8, help="threads per worker for --spawn-workers")
+    args = parser.parse_args()
+
+    if not args.spawn_workers:
+        print_result("server", run_load(args.url, args.clients, args.duration))
+        sys.exit(0)
+
+    bind = urlsplit(args.url).netloc
+    print(f"{os.cpu_count()} cores, {args.clients} clients, {args.duration}s per run")
+    for workers in [int(w) for w in args.spawn_workers.split(',')]:
+        server = subprocess.Popen(
+            [sys.executable, 'serve.py', '--bind', bind,
+             '--workers', str(workers), '--threads', str(args.threads)],
+            cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_until_ready(args.url)
+            print_result(f"{workers} workers", run_load(args.url, args.clients, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
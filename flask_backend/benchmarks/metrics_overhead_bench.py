@@ -0,0 +1,131 @@
+import argparse
+import gc
+import os
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from flask import Flask, jsonify
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import metrics
+import serialization
+
+# Cost of metrics.py on a request, in process (Flask test client, no server,
+# no MySQL): the same route runs on an app without instrumentation and on one
+# with the request hooks and InstrumentedCursor. The route runs --queries
+# statements on a stand-in cursor returning --rows job rows, like
+# GET /api/joboffers/available does; --db-ms adds a simulated round trip to
+# each statement (0 measures the bare framework path, the worst case).
+#
+# A few microseconds are within the noise of a whole request, so the work
+# metrics.py adds is also timed on its own: the request hooks (through
+# Flask's before / after request dispatch) and the statements, with and
+# without InstrumentedCursor, in one request context.
+#
+#   python benchmarks/metrics_overhead_bench.py --requests 5000 --db-ms 0.5
+
+COLUMNS = ('JobOfferID', 'LocationID', 'Date', 'StartTime', 'EndTime', 'MaxWage',
+           'WorkingDays', 'Hours', 'Street', 'Number', 'City', 'CompanyName')
+
+
+class StubCursor:
+    # Answers every statement with the same rows
+    def __init__(self, rows, db_seconds):
+        self.rows = rows
+        self.db_seconds = db_seconds
+        self.column_names = COLUMNS
+
+    def execute(self, operation, params=None):
+        if self.db_seconds:
+            time.sleep(self.db_seconds)
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+def make_app(rows, queries, db_seconds, instrumented):
+    app = Flask(__name__)
+    serialization.init_app(app)
+    if instrumented:
+        metrics.init_app(app)
+
+    @app.route('/api/joboffers/available')
+    def available():
+        return jsonify({"jobs": run_queries(rows, queries, db_seconds, instrumented)})
+
+    return app
+
+
+def run_queries(rows, queries, db_seconds, instrumented):
+    jobs = []
+    for _ in range(queries):
+        cursor = StubCursor(rows, db_seconds)
+        if instrumented:
+            cursor = metrics.InstrumentedCursor(cursor)
+        cursor.execute("SELECT * FROM JobOffer WHERE Status = %s LIMIT %s", ('Open', len(rows)))
+        jobs = serialization.fetch_dicts(cursor)
+        cursor.close()
+    return jobs
+
+
+def measure(client, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get('/api/joboffers/available')
+    return (time.perf_counter() - start) / requests
+
+
+def measure_hooks(app, rows, queries, instrumented, requests):
+    # Hooks and statements of one request, without routing, view and JSON
+    response = app.response_class('')
+    with app.test_request_context('/api/joboffers/available'):
+        start = time.perf_counter()
+        for _ in range(requests):
+            app.preprocess_request()
+            run_queries(rows, queries, 0, instrumented)
+            app.process_response(response)
+        return (time.perf_counter() - start) / requests
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--rows', type=int, default=20)
+    parser.add_argument('--queries', type=int, default=2)
+    parser.add_argument('--rounds', type=int, default=40)
+    parser.add_argument('--db-ms', type=float, default=0.0, help="simulated time per statement")
+    args = parser.parse_args()
+
+    rows = [
+        (i, i % 500, date(2025, 1, 1) + timedelta(days=i % 365), timedelta(hours=9),
+         timedelta(hours=17), Decimal('42.85'), 3, 8, f"Street{i % 50}", str(i), "Istanbul", f"Company{i}")
+        for i in range(args.rows)
+    ]
+    plain_app = make_app(rows, args.queries, args.db_ms / 1000, instrumented=False)
+    instrumented_app = make_app(rows, args.queries, args.db_ms / 1000, instrumented=True)
+    plain = plain_app.test_client()
+    instrumented = instrumented_app.test_client()
+    for client in (plain, instrumented):
+        measure(client, 500)
+    gc.collect()
+    gc.freeze()
+
+    # Many short interleaved rounds, best of each, to keep machine noise
+    # (and GC pauses of the setup) out of the ratio
+    per_round = max(1, args.requests // args.rounds)
+    base = with_metrics = hooks_base = hooks = float('inf')
+    for _ in range(args.rounds):
+        base = min(base, measure(plain, per_round))
+        with_metrics = min(with_metrics, measure(instrumented, per_round))
+        hooks_base = min(hooks_base, measure_hooks(plain_app, rows, args.queries, False, per_round))
+        hooks = min(hooks, measure_hooks(instrumented_app, rows, args.queries, True, per_round))
+    print(f"plain         {base * 1e6:8.1f} us/request")
+    print(f"instrumented  {with_metrics * 1e6:8.1f} us/request")
+    print(f"overhead      {(with_metrics - base) * 1e6:8.1f} us/request ({(with_metrics / base - 1) * 100:.1f}%)")
+    added = hooks - hooks_base
+    print(f"metrics work  {added * 1e6:8.1f} us/request ({added / base * 100:.1f}% of plain)")
@@ -0,0 +1,92 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+from dotenv import load_dotenv
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..'))
+sys.path.insert(0, BENCHMARKS_DIR)
+from geo import NEARBY_QUERY, find_nearby, nearby_params
+from harness import SCALES, mysql_connect, seed
+
+# Latency of the GET /api/joboffers/nearby query straight against MySQL (no
+# HTTP, no cache), from points scattered around random existing locations.
+# Needs migrations 006 and 009 (create.sql + migrate.py first).
+#
+# An empty database is seeded by harness.py's DataGenerator, which scatters
+# one location per company around the city centres: --scale budget is the
+# size of the budget (100k locations, 1M offers); a database with data is
+# benchmarked as is. Use a scratch database.
+#
+#   python benchmarks/nearby_bench.py --scale budget --queries 500 --radius-km 10 --limit 20
+#
+# Budget (README, 1M offers / 100k locations): p95 <= 50 ms.
+
+load_dotenv()
+
+BUDGET_P95_MS = 50.0
+
+# users, employers, companies (= locations), job offers, applications
+NEARBY_SCALES = {**SCALES, 'budget': (200_000, 100_000, 100_000, 1_000_000, 0)}
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def run(cursor, points, radius_km, limit):
+    latencies, found = [], 0
+    for lat, lon in points:
+        start = time.perf_counter()
+        jobs, _ = find_nearby(cursor, lat, lon, radius_km, limit)
+        latencies.append(time.perf_counter() - start)
+        found += len(jobs)
+    latencies.sort()
+    return latencies, found / len(points)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--radius-km', type=float, default=10)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scale', choices=list(NEARBY_SCALES), default='budget',
+                        help="data generated into an empty database")
+    args = parser.parse_args()
+
+    conn = mysql_connect()
+    seed(conn, NEARBY_SCALES[args.scale], args.seed)
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM JobOffer")
+    offers = cursor.fetchone()[0]
+    cursor.execute("SELECT Latitude, Longitude FROM Location WHERE Latitude IS NOT NULL")
+    locations = cursor.fetchall()
+    if not locations:
+        raise SystemExit("No location has coordinates: apply migration 006 and load generated data")
+
+    # The plan of the box lookup: the R-tree of migration 009 is expected
+    explain = conn.cursor(dictionary=True)
+    lat, lon = float(locations[0][0]), float(locations[0][1])
+    explain.execute("EXPLAIN " + NEARBY_QUERY, nearby_params(lat, lon, args.radius_km, args.limit))
+    plan = {row['table']: row['key'] for row in explain.fetchall()}
+    explain.close()
+    print("plan: " + ', '.join(f"{table} via {key}" for table, key in plan.items()))
+
+    rng = random.Random(args.seed)
+    points = [(float(lat) + rng.uniform(-0.02, 0.02), float(lon) + rng.uniform(-0.02, 0.02))
+              for lat, lon in rng.choices(locations, k=args.queries)]
+    print(f"{offers} job offers, {len(locations)} located, {args.queries} queries")
+
+    for label, radius_km in ((f"within {args.radius_km:g} km", args.radius_km), (f"nearest {args.limit}", None)):
+        latencies, avg = run(cursor, points, radius_km, args.limit)
+        p95 = percentile(latencies, 95) * 1000
+        print(f"{label:<16} p50 {percentile(latencies, 50) * 1000:7.1f} ms  p95 {p95:7.1f} ms  "
+              f"p99 {percentile(latencies, 99) * 1000:7.1f} ms  {avg:.1f} jobs/query  "
+              f"{'OK' if p95 <= BUDGET_P95_MS else 'OVER BUDGET'}")
+
+    cursor.close()
+    conn.close()
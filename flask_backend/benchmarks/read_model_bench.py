@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..'))
+sys.path.insert(0, BENCHMARKS_DIR)
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..', '..', 'data_generation'))
+
+# The job offer read model (read_model.py) against the SQL of the same routes.
+#
+# Seeds a SQLite stand-in, loads the model (time and memory per offer), then
+# times --requests requests per route through the Flask test client, with
+# the response cache off, once from the database and once from the model,
+# plus the model lookups alone (no HTTP, no JSON).
+#
+#   python benchmarks/read_model_bench.py --scale medium --requests 2000
+#
+# SQLite and MySQL times differ, the model times do not depend on the
+# database; compare the lookup column with the per-request overhead.
+#
+# Before the timings, every sort is paged through next_cursor from both
+# sources, with some open offers given a NULL date or wage: each page must
+# match the full listing, and some pages must end on a NULL value.
+
+os.environ.setdefault('CACHE_BACKEND', 'none')
+os.environ.setdefault('METRICS_ENABLED', '0')
+os.environ['DB_BACKEND'] = 'sqlite'
+os.environ.setdefault('DB_SQLITE_PATH', os.path.join(tempfile.mkdtemp(prefix='job2main-bench-'), 'job2main.sqlite3'))
+os.environ['READ_MODEL'] = '1'
+
+import sqlite_backend
+from harness import SCALES, seed
+from job_search import SORTS
+
+
+def route_urls(conn, rng, count):
+    # route -> [(url, model lookup)] drawn from the seeded data
+    cursor = conn.cursor()
+    cursor.execute("SELECT DISTINCT City FROM Location")
+    cities = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT DISTINCT CreatedBy FROM JobOffer")
+    employers = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT JobOfferID FROM JobOffer")
+    jobs = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+
+    available = []
+    for _ in range(count):
+        city = rng.choice(cities)
+        sort = rng.choice(['date', '-date', 'max_wage'])
+        available.append((f'/api/joboffers/available?limit=50&sort={sort}',
+                          lambda model, sort=sort: model.available_jobs(sort, {}, None, 51)))
+        available.append((f'/api/joboffers/available?limit=50&city={city}',
+                          lambda model, city=city: model.available_jobs('date', {'city': city}, None, 51)))
+    return {
+        'available': available,
+        'employer_joboffers': [
+            (f'/api/employers/{employer_id}/joboffers',
+             lambda model, employer_id=employer_id: model.employer_job_offers(employer_id))
+            for employer_id in (rng.choice(employers) for _ in range(count))],
+        'job_employer': [
+            (f'/api/joboffers/{job_id}/employer', lambda model, job_id=job_id: model.job_employer(job_id))
+            for job_id in (rng.choice(jobs) for _ in range(count))],
+    }
+
+
+def null_sort_values(conn):
+    # Some open offers without a date or a wage, the sort columns
+    cursor = conn.cursor()
+    cursor.execute("UPDATE JobOffer SET Date = NULL WHERE Status = 'Open' AND JobOfferID % 40 = 0")
+    cursor.execute("UPDATE JobOffer SET MaxWage = NULL WHERE Status = 'Open' AND JobOfferID % 40 = 1")
+    cursor.close()
+    conn.commit()
+
+
+def check_paging(client, page_size=7):
+    null_ends = 0
+    for sort in SORTS:
+        response = client.get(f'/api/joboffers/available?sort={sort}&stream=1&fields=JobOfferID')
+        expected = [json.loads(line)['JobOfferID'] for line in response.data.splitlines()]
+        seen, after = [], ''
+        while True:
+            response = client.get(f'/api/joboffers/available?sort={sort}&limit={page_size}&fields=JobOfferID{after}')
+            assert response.status_code == 200, (sort, after, response.json)
+            seen += [job['JobOfferID'] for job in response.json['jobs']]
+            cursor = response.json['next_cursor']
+            if not cursor:
+                break
+            null_ends += cursor.startswith('null,')
+            after = f'&after={cursor}'
+        assert seen == expected, (sort, len(seen), len(expected))
+    assert null_ends, "no page ended on a NULL sort value"
+    return null_ends
+
+
+def time_requests(client, urls):
+    start = time.perf_counter()
+    for url, _ in urls:
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+    return (time.perf_counter() - start) / len(urls)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Read model vs SQL for the job offer routes")
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=1000, help="requests per route and mode")
+    args = parser.parse_args()
+
+    path = os.environ['DB_SQLITE_PATH']
+    sqlite_backend.create_schema(path)
+    conn = sqlite_backend.connect(path)
+    seed(conn, SCALES[args.scale], args.seed)
+    null_sort_values(conn)
+
+    import read_model
+    tracemalloc.start()
+    start = time.perf_counter()
+    model = read_model.ReadModel.load(conn)
+    seconds = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"load: {len(model.offers)} offers ({len(model.open_by_date)} open) in {seconds:.2f}s, "
+          f"{size / 2 ** 20:.1f} MiB, {size / len(model.offers):.0f} bytes per offer")
+
+    routes = route_urls(conn, random.Random(args.seed), args.requests)
+    conn.close()
+    # Serve this one, no background rebuild during the timings
+    read_model._model = model
+    read_model._build_started = time.monotonic()
+
+    from app import app
+    client = app.test_client()
+    for source in (False, True):
+        read_model.READ_MODEL = source
+        null_ends = check_paging(client)
+        print(f"paging ({'model' if source else 'sql'}): every sort complete, {null_ends} pages ended on a NULL")
+    print(f"{'route':<20} {'sql us/req':>12} {'model us/req':>14} {'lookup us':>11}")
+    for name, urls in routes.items():
+        read_model.READ_MODEL = False
+        sql = time_requests(client, urls)
+        read_model.READ_MODEL = True
+        from_model = time_requests(client, urls)
+        start = time.perf_counter()
+        for _, lookup in urls:
+            lookup(model)
+        lookup_time = (time.perf_counter() - start) / len(urls)
+        print(f"{name:<20} {sql * 1e6:12.0f} {from_model * 1e6:14.0f} {lookup_time * 1e6:11.1f}")
@@ -0,0 +1,87 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import mysql.connector
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from search import WORKER_SEARCH_QUERY, add_highlights
+
+# Worker search, three ways, straight against MySQL (no HTTP, no cache):
+#   dump:     GET /api/workers query, filtered client-side (what employers do today)
+#   like:     the same filter pushed into SQL with LIKE '%term%' (full scan)
+#   fulltext: GET /api/workers/search query (FULLTEXT index, ranked, one page)
+#
+# Needs migration 005_fulltext_search.sql.
+#
+#   python benchmarks/search_bench.py --query Worker42 --query experience
+
+load_dotenv()
+
+ALL_WORKERS_QUERY = """
+    SELECT U.UserID, U.FirstName, U.Surname, U.Name, U.Email, U.PhoneNumber, W.Experiences, W.Description
+    FROM User as U, Worker as W
+    WHERE U.UserID = W.UserID
+"""
+
+LIKE_QUERY = ALL_WORKERS_QUERY + """
+      AND (W.Experiences LIKE %s OR W.Description LIKE %s)
+    LIMIT %s
+"""
+
+
+def dump(cursor, q, limit):
+    cursor.execute(ALL_WORKERS_QUERY)
+    term = q.lower()
+    return [row for row in cursor.fetchall()
+            if term in (row['Experiences'] or '').lower() or term in (row['Description'] or '').lower()][:limit]
+
+
+def like(cursor, q, limit):
+    cursor.execute(LIKE_QUERY, (f"%{q}%", f"%{q}%", limit))
+    return cursor.fetchall()
+
+
+def fulltext(cursor, q, limit):
+    cursor.execute(WORKER_SEARCH_QUERY, (q, q, limit, 0))
+    return add_highlights(cursor.fetchall(), q, ('Experiences', 'Description'))
+
+
+def measure(fn, cursor, q, limit, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fn(cursor, q, limit)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), len(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--query', action='append', help="search terms, repeatable")
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        # password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME', 'Job2main')
+    )
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT COUNT(*) as count FROM Worker")
+    print(f"{cursor.fetchone()['count']} workers, median of {args.repeat} runs")
+
+    for q in args.query or ['Worker42', 'experience']:
+        results = {name: measure(fn, cursor, q, args.limit, args.repeat)
+                   for name, fn in (('dump', dump), ('like', like), ('fulltext', fulltext))}
+        for name, (elapsed, count) in results.items():
+            print(f"{q!r:<16} {name:<9} {elapsed * 1000:9.1f} ms  {count} rows")
+        print(f"{q!r:<16} speedup   {results['dump'][0] / results['fulltext'][0]:9.1f}x vs dump\n")
+
+    cursor.close()
+    conn.close()
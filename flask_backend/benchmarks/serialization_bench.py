@@ -0,0 +1,78 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from flask import Flask, jsonify
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import serialization
+
+# Micro-benchmark of the row -> JSON path of the job listing routes:
+#   legacy: dictionary cursor rows, per-row strftime/divmod rewrite, jsonify
+#   fast:   tuple cursor rows zipped with column names, FastJSONProvider
+#
+#   python benchmarks/serialization_bench.py --rows 100000
+
+COLUMNS = ('JobOfferID', 'LocationID', 'Date', 'StartTime', 'EndTime', 'MaxWage',
+           'WorkingDays', 'Hours', 'Street', 'Number', 'City', 'CompanyName')
+
+
+def make_rows(n):
+    return [
+        (i, i % 500, date(2025, 1, 1) + timedelta(days=i % 365), timedelta(hours=9),
+         timedelta(hours=17, minutes=30), Decimal('42.85'), 3, 8, f"Street{i % 50}",
+         str(i % 999), "Istanbul", f"Company{i % 500}")
+        for i in range(n)
+    ]
+
+
+def legacy(app, rows):
+    jobs = [dict(zip(COLUMNS, row)) for row in rows]  # what cursor(dictionary=True) returns
+    for job in jobs:
+        if job.get('Date'):
+            job['Date'] = job['Date'].strftime('%Y-%m-%d')
+        for col in ('StartTime', 'EndTime'):
+            if job.get(col):
+                total_seconds = int(job[col].total_seconds())
+                hours = total_seconds // 3600
+                minutes = (total_seconds % 3600) // 60
+                seconds = total_seconds % 60
+                job[col] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    with app.app_context():
+        return jsonify({"message": "ok", "jobs": jobs}).get_data()
+
+
+def fast(app, rows):
+    jobs = [dict(zip(COLUMNS, row)) for row in rows]
+    with app.app_context():
+        return jsonify({"message": "ok", "jobs": jobs}).get_data()
+
+
+def bench(name, fn, app, rows, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(app, rows)
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<8} {best * 1000:8.1f} ms  {len(rows) / best:12,.0f} rows/s")
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    legacy_app = Flask('legacy')
+    fast_app = Flask('fast')
+    serialization.init_app(fast_app)
+
+    print(f"{args.rows} rows, best of {args.repeat} (orjson: {'yes' if serialization.orjson else 'no'})")
+    before = bench("legacy", legacy, legacy_app, rows, args.repeat)
+    after = bench("fast", fast, fast_app, rows, args.repeat)
+    print(f"speedup  {before / after:8.2f}x")
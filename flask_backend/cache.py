@@ -0,0 +1,226 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import Response, make_response, request
+
+from db import sticky_primary
+
+# Read-through cache for the hot GET routes.
+#
+# Entries are keyed by route path + query string + the current generation of
+# every tag the view declares. Write handlers call invalidate(tag), which bumps
+# the tag's generation: older entries are never read again and age out
+# through LRU / TTL. Tags may use view arguments, e.g.
+# 'employer_joboffers:{employer_id}', for targeted invalidation.
+#
+# The generations double as version stamps for conditional GETs (see
+# conditional.py): each bump also records when the tag last changed.
+#
+# Clients inside their sticky-primary window (db.py, after their own writes)
+# bypass the cache: an entry stored under the new generation may have been
+# read from a replica that did not have their write yet.
+
+
+class LRUCache:
+    # In-process backend, one per worker process
+    shared = False
+
+    def __init__(self, max_entries=1024, ttl=30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._modified = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+        self.started = time.time()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def generations(self, tags):
+        with self._lock:
+            return [self._generations.get(tag, 0) for tag in tags]
+
+    def versions(self, tags):
+        # (generation, time of the last bump or None) per tag
+        with self._lock:
+            return [(self._generations.get(tag, 0), self._modified.get(tag)) for tag in tags]
+
+    def bump(self, tag):
+        with self._lock:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            self._modified[tag] = time.time()
+
+    def size(self):
+        return len(self._entries)
+
+
+class RedisCache:
+    # Shared backend for several worker processes. Any client exposing
+    # get/set(ex=)/mget/incr works, e.g. redis.Redis or fakeredis.FakeRedis.
+    # Generations are shared by every worker process.
+    shared = True
+
+    def __init__(self, client, ttl=30.0, prefix='job2main:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        # Redis evicts and expires on its own, these stay at 0
+        self.evictions = 0
+        self.expirations = 0
+        self.started = time.time()
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, value, ex=max(1, int(self.ttl)))
+
+    def generations(self, tags):
+        if not tags:
+            return []
+        values = self.client.mget([f"{self.prefix}gen:{tag}" for tag in tags])
+        return [int(value or 0) for value in values]
+
+    def versions(self, tags):
+        if not tags:
+            return []
+        values = self.client.mget([f"{self.prefix}{name}:{tag}" for tag in tags for name in ('gen', 'mod')])
+        return [(int(values[i] or 0), float(values[i + 1]) if values[i + 1] else None)
+                for i in range(0, len(values), 2)]
+
+    def bump(self, tag):
+        self.client.incr(f"{self.prefix}gen:{tag}")
+        self.client.set(f"{self.prefix}mod:{tag}", repr(time.time()))
+
+    def size(self):
+        return None
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+stats = CacheStats()
+# Keeps the generations when responses are not cached (CACHE_BACKEND=none)
+_generations_only = LRUCache(max_entries=0)
+
+
+def create_cache():
+    backend = os.getenv('CACHE_BACKEND', 'memory')
+    ttl = float(os.getenv('CACHE_TTL', 30))
+    if backend == 'none':
+        return None
+    if backend == 'redis':
+        import redis  # optional dependency, only needed for CACHE_BACKEND=redis
+        return RedisCache(redis.Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0')), ttl=ttl)
+    return LRUCache(max_entries=int(os.getenv('CACHE_MAX_ENTRIES', 1024)), ttl=ttl)
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_cache() or False
+    return _cache or None
+
+
+def reset_cache():
+    # Called in forked workers: rebuilt from the environment on next use
+    global _cache
+    _cache = None
+
+
+def get_versions():
+    # Backend holding the tag generations, whether or not responses are cached
+    return get_cache() or _generations_only
+
+
+def set_cache(cache):
+    # Swap the backend, e.g. RedisCache(fakeredis.FakeRedis()) in local runs
+    global _cache
+    _cache = cache if cache is not None else False
+
+
+def cached(*tags):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            if cache is None or sticky_primary():
+                return view(*args, **kwargs)
+
+            resolved = [tag.format(**kwargs) for tag in tags]
+            generations = cache.generations(resolved)
+            key = (f"{request.path}?{urlencode(sorted(request.args.items(multi=True)))}"
+                   f"#{','.join(map(str, generations))}")
+
+            data = cache.get(key)
+            if data is not None:
+                stats.count('hits')
+                return Response(data, mimetype='application/json')
+
+            stats.count('misses')
+            response = make_response(view(*args, **kwargs))
+            # Only complete JSON success payloads are cached (no errors, no streams)
+            if response.status_code == 200 and response.mimetype == 'application/json' \
+                    and not response.is_streamed:
+                cache.set(key, response.get_data())
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidate(*tags):
+    versions = get_versions()
+    for tag in tags:
+        versions.bump(tag)
+        stats.count('invalidations')
+
+
+def cache_stats():
+    cache = get_cache()
+    return {
+        "backend": type(cache).__name__ if cache else None,
+        "hits": stats.hits,
+        "misses": stats.misses,
+        "invalidations": stats.invalidations,
+        "evictions": cache.evictions if cache else 0,
+        "expirations": cache.expirations if cache else 0,
+        "entries": cache.size() if cache else 0,
+    }
@@ -0,0 +1,87 @@
+import os
+import secrets
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import make_response, request
+
+from cache import get_versions
+from db import sticky_primary
+
+# Conditional GET (ETag / Last-Modified / 304) for the polled listings.
+#
+# The version stamp of a view is the generation of each of its tags, the
+# ones write handlers bump through cache.invalidate(). It is read before the
+# view runs: when the client's If-None-Match (or, without it,
+# If-Modified-Since) still matches, the answer is an empty 304 and neither
+# the query nor the JSON serialization happen.
+#
+# Stamps also carry the current ETAG_TTL window (default CACHE_TTL), so a
+# validator expires after at most ETAG_TTL seconds. That bounds what the
+# stamps cannot see, like the response cache TTL does: changes made outside
+# the API, replicas behind the primary, and with the in-process backend
+# writes handled by another worker (its ETags never match another worker's;
+# CACHE_BACKEND=redis shares the generations). ETAG_TTL=0 disables windows.
+#
+# Like the response cache, clients in their sticky-primary window skip
+# validation: a stamp is not tied to the server that built the response, so
+# a replica page may carry the generation of their own write.
+
+ETAG_TTL = float(os.getenv('ETAG_TTL', os.getenv('CACHE_TTL', 30)))
+
+# ETags of one process's in-process generations are only valid in that process
+_process_scope = secrets.token_hex(4)
+
+
+def stamp(tags):
+    # (etag, last_modified as a unix time) of the current versions of tags
+    versions = get_versions()
+    now = time.time()
+    window = int(now // ETAG_TTL) if ETAG_TTL > 0 else 0
+    generations = versions.versions(tags)
+    scope = 'shared' if versions.shared else _process_scope
+    etag = f"{scope}-{window}-{'.'.join(str(generation) for generation, _ in generations)}"
+    last_modified = max([modified for _, modified in generations if modified is not None]
+                        + [window * ETAG_TTL if ETAG_TTL > 0 else versions.started])
+    return etag, last_modified
+
+
+def not_modified(etag, last_modified):
+    if request.if_none_match:
+        # Weak comparison: the same stamp may have been served by a replica
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return int(last_modified) <= request.if_modified_since.timestamp()
+    return False
+
+
+def add_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    # Within a second of a change, a later change in the same second could
+    # not be told apart by its Last-Modified: send the ETag only
+    if time.time() - last_modified >= 1:
+        response.last_modified = datetime.fromtimestamp(int(last_modified), timezone.utc)
+    # Clients may keep the response but must revalidate it before reuse
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def conditional(*tags):
+    # Tags as in @cached, e.g. 'worker_applications:{worker_id}'
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if sticky_primary():
+                return view(*args, **kwargs)
+            etag, last_modified = stamp([tag.format(**kwargs) for tag in tags])
+            if not_modified(etag, last_modified):
+                return add_validators(make_response('', 304), etag, last_modified)
+
+            response = make_response(view(*args, **kwargs))
+            # Errors and streams are not validated
+            if response.status_code == 200 and not response.is_streamed:
+                add_validators(response, etag, last_modified)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,449 @@
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from functools import wraps
+
+import mysql.connector
+from mysql.connector import Error
+from flask import g, request
+
+import metrics
+
+
+class PoolTimeout(Error):
+    pass
+
+
+class PooledConnection:
+    # Thin proxy around a MySQL connection: close() hands the connection
+    # back to the pool instead of tearing down the socket.
+    def __init__(self, pool, connection):
+        self._pool = pool
+        self._connection = connection
+        self.released = False
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._connection.cursor(*args, **kwargs)
+        return metrics.InstrumentedCursor(cursor) if self._pool.instrument else cursor
+
+    def prepared(self, statement):
+        # Server-side prepared cursor for statement, kept with the
+        # connection: do not close it, fetch all its rows before reusing it
+        return self._pool.prepared_cursor(self._connection, statement)
+
+    def close(self):
+        if not self.released:
+            self.released = True
+            self._pool.release(self._connection)
+
+    def discard(self):
+        # Close the socket instead of pooling it, e.g. when a result set was
+        # left unread: reading the rest would cost more than reconnecting
+        if not self.released:
+            self.released = True
+            self._pool.release(self._connection, discard=True)
+
+
+class ConnectionPool:
+    def __init__(self, size=10, timeout=5.0, ping_interval=30.0, connector=mysql.connector.connect, **connect_args):
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.connector = connector
+        self.connect_args = connect_args
+        # Time every statement for /metrics
+        self.instrument = metrics.enabled()
+
+        # LIFO keeps the most recently used (warm) connections in rotation
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+
+        # Counters exposed to operators
+        self._acquired = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_seconds = 0.0
+
+        # id(connection) -> {statement: prepared cursor}, see prepared_cursor()
+        self._statements = {}
+
+    def _connect(self):
+        return self.connector(**self.connect_args)
+
+    def _discard(self, connection):
+        self._statements.pop(id(connection), None)
+        try:
+            connection.close()
+        except Error:
+            pass
+        with self._lock:
+            self._created -= 1
+            self._discarded += 1
+
+    def _healthy(self, connection, last_used):
+        # Only ping connections that sat idle long enough to have been dropped
+        if self.ping_interval and time.monotonic() - last_used < self.ping_interval:
+            return True
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    def acquire(self):
+        start = time.monotonic()
+        waited = False
+
+        while True:
+            try:
+                connection, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+
+                if can_create:
+                    try:
+                        connection = self._connect()
+                    except Error:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                    break
+
+                # Pool exhausted: block until a connection is released
+                if not waited:
+                    waited = True
+                    with self._lock:
+                        self._waits += 1
+
+                remaining = self.timeout - (time.monotonic() - start)
+                try:
+                    if remaining <= 0:
+                        raise queue.Empty
+                    connection, last_used = self._idle.get(timeout=remaining)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise PoolTimeout(
+                        msg=f"Timed out after {self.timeout}s waiting for a database connection"
+                    )
+
+            if self._healthy(connection, last_used):
+                break
+            self._discard(connection)
+
+        with self._lock:
+            self._in_use += 1
+            self._acquired += 1
+            self._wait_seconds += time.monotonic() - start
+
+        return PooledConnection(self, connection)
+
+    def release(self, connection, discard=False):
+        with self._lock:
+            self._in_use -= 1
+
+        if discard:
+            self._discard(connection)
+            return
+
+        # Never hand out a connection with a half-finished transaction
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except Error:
+            self._discard(connection)
+            return
+
+        self._idle.put((connection, time.monotonic()))
+
+    def prepared_cursor(self, connection, statement):
+        # One cursor(prepared=True) per statement text and connection: the
+        # statement is parsed by the server once, then only executed. A
+        # connection is used by one thread at a time, so no lock is needed.
+        statements = self._statements.setdefault(id(connection), {})
+        cursor = statements.get(statement)
+        if cursor is None:
+            cursor = connection.cursor(prepared=True)
+            if self.instrument:
+                cursor = metrics.InstrumentedCursor(cursor)
+            statements[statement] = cursor
+        return cursor
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "acquired": self._acquired,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "wait_seconds": round(self._wait_seconds, 6),
+                "prepared_statements": sum(len(statements) for statements in list(self._statements.values())),
+            }
+
+
+_pool = None
+_replicas = None
+_pool_lock = threading.Lock()
+
+# Read/write splitting. Views decorated with @read_only run on a replica from
+# DB_REPLICAS; everything else, and the reads of a client that wrote less
+# than DB_STICKY_PRIMARY_SECONDS ago (cookie set on its write responses), run
+# on the primary. Replicas more than DB_REPLICA_MAX_LAG seconds behind, or
+# unreachable, are evicted until their next check.
+STICKY_COOKIE = 'db_primary_until'
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+def create_pool(host=None):
+    # host: "host[:port]" of a replica (a file path with DB_BACKEND=sqlite)
+    settings = dict(
+        size=int(os.getenv('DB_POOL_SIZE', 10)),
+        timeout=float(os.getenv('DB_POOL_TIMEOUT', 5)),
+        ping_interval=float(os.getenv('DB_POOL_PING_INTERVAL', 30)),
+        # Single statements commit on their own; handlers that
+        # write several rows call conn.start_transaction()
+        autocommit=True
+    )
+    if os.getenv('DB_BACKEND', 'mysql') == 'sqlite':
+        # Stand-in for benchmarks without a MySQL server, see sqlite_backend.py
+        import sqlite_backend
+        return ConnectionPool(connector=sqlite_backend.connect,
+                              database=host or os.getenv('DB_SQLITE_PATH', 'job2main.sqlite3'), **settings)
+    if host and ':' in host:
+        host, port = host.rsplit(':', 1)
+        settings['port'] = int(port)
+    return ConnectionPool(
+        host=host or os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        # password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME'),
+        **settings
+    )
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = create_pool()
+    return _pool
+
+
+def reset_pool():
+    # Called in forked workers: drop the parent's pools without closing their
+    # sockets, the parent may still be using them
+    global _pool, _replicas
+    _pool = None
+    _replicas = None
+
+
+def replica_lag(connection):
+    # Seconds the server is behind its replication source: None on a primary
+    # (or without the REPLICATION CLIENT privilege), inf when replication is
+    # stopped; constant cost
+    cursor = connection.cursor(dictionary=True)
+    try:
+        for statement, column in (("SHOW REPLICA STATUS", 'Seconds_Behind_Source'),
+                                  ("SHOW SLAVE STATUS", 'Seconds_Behind_Master')):  # before MySQL 8.0.22
+            try:
+                cursor.execute(statement)
+            except Error:
+                continue
+            rows = cursor.fetchall()
+            if not rows:
+                return None
+            lag = rows[0][column]
+            return float('inf') if lag is None else lag
+        return None
+    finally:
+        cursor.close()
+
+
+class ReplicaSet:
+    def __init__(self, pools, max_lag=5.0, check_interval=2.0, lag_probe=None):
+        # pools: {name: ConnectionPool}; lag_probe(pool) -> seconds, for tests
+        self.pools = pools
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag_probe = lag_probe or self._probe
+        self._state = {name: {"lag": None, "healthy": True, "checked": 0.0, "evictions": 0, "error": None}
+                       for name in pools}
+        self._names = list(pools)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _probe(self, pool):
+        connection = pool.acquire()
+        try:
+            return replica_lag(connection)
+        finally:
+            connection.close()
+
+    def _refresh(self, name, force=False):
+        # At most one lag check per replica and interval, by the first
+        # request that finds it due (or now, when forced)
+        now = time.monotonic()
+        with self._lock:
+            state = self._state[name]
+            if not force and now - state["checked"] < self.check_interval:
+                return
+            state["checked"] = now
+        try:
+            lag = self.lag_probe(self.pools[name])
+            healthy, error = lag is None or lag <= self.max_lag, None
+        except Error as e:
+            lag, healthy, error = None, False, str(e)
+        self._set_health(name, healthy, lag, error)
+
+    def _set_health(self, name, healthy, lag=None, error=None):
+        with self._lock:
+            state = self._state[name]
+            if state["healthy"] and not healthy:
+                state["evictions"] += 1
+                metrics.log_event(logging.WARNING, 'replica_evicted', replica=name, lag=lag)
+            state["healthy"] = healthy
+            state["lag"] = lag
+            state["error"] = error
+
+    def mark_failed(self, name):
+        self._set_health(name, False, error="query failed")
+
+    def check(self):
+        # Probes every replica now, evicting or readmitting it (readiness
+        # checks); returns the number of healthy ones
+        for name in self._names:
+            self._refresh(name, force=True)
+        with self._lock:
+            return sum(state["healthy"] for state in self._state.values())
+
+    def choose(self):
+        # Round robin over healthy replicas: (name, pool), or None when all
+        # of them are evicted
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self._names)
+        for i in range(len(self._names)):
+            name = self._names[(start + i) % len(self._names)]
+            self._refresh(name)
+            if self._state[name]["healthy"]:
+                return name, self.pools[name]
+        return None
+
+    def stats(self):
+        with self._lock:
+            states = {name: dict(state) for name, state in self._state.items()}
+        return {
+            name: {"healthy": state["healthy"], "lag": state["lag"], "evictions": state["evictions"],
+                   "error": state["error"], **self.pools[name].stats()}
+            for name, state in states.items()
+        }
+
+
+def create_replicas():
+    names = [name.strip() for name in os.getenv('DB_REPLICAS', '').split(',') if name.strip()]
+    if not names:
+        return None
+    lag_probe = None
+    if os.getenv('DB_REPLICA_SIMULATED_LAG'):
+        # Local testing without real replication: every replica reports this lag
+        simulated = float(os.getenv('DB_REPLICA_SIMULATED_LAG'))
+        lag_probe = lambda pool: simulated
+    return ReplicaSet(
+        {name: create_pool(name) for name in names},
+        max_lag=float(os.getenv('DB_REPLICA_MAX_LAG', 5)),
+        check_interval=float(os.getenv('DB_REPLICA_CHECK_INTERVAL', 2)),
+        lag_probe=lag_probe
+    )
+
+
+def get_replicas():
+    global _replicas
+    if _replicas is None:
+        with _pool_lock:
+            if _replicas is None:
+                _replicas = create_replicas() or False
+    return _replicas or None
+
+
+def read_only(view):
+    # Marks a view that only reads: it may run on a replica
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def sticky_primary():
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def acquire_connection():
+    replicas = get_replicas()
+    if replicas and g.get('db_read_only') and not sticky_primary():
+        choice = replicas.choose()
+        if choice:
+            name, pool = choice
+            try:
+                return pool.acquire()
+            except Error as e:
+                # Unreachable or saturated replica: evict it, use the primary
+                metrics.log_event(logging.WARNING, 'replica_unavailable', replica=name, error=str(e))
+                replicas.mark_failed(name)
+    return get_pool().acquire()
+
+
+def get_db_connection():
+    # One pooled connection per request, returned in teardown even when a
+    # handler exits early without closing it
+    conn = g.get('db_conn')
+    if conn is None or conn.released:
+        start = time.perf_counter()
+        try:
+            conn = acquire_connection()
+        except Error as e:
+            metrics.log_event(logging.ERROR, 'db_connection_failed', error=str(e))
+            return None
+        metrics.record_acquire(time.perf_counter() - start)
+        g.db_conn = conn
+    return conn
+
+
+def release_db_connection(exception=None):
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        conn.close()
+
+
+def mark_write(response):
+    # Keep this client on the primary until its writes reached the replicas
+    if request.method in WRITE_METHODS and response.status_code < 400 and get_replicas():
+        window = float(os.getenv('DB_STICKY_PRIMARY_SECONDS', 5))
+        response.set_cookie(STICKY_COOKIE, str(time.time() + window), max_age=math.ceil(window),
+                            httponly=True, samesite='Lax')
+    return response
+
+
+def init_app(app):
+    app.teardown_appcontext(release_db_connection)
+    app.after_request(mark_write)
@@ -0,0 +1,317 @@
+import asyncio
+import bisect
+import os
+import time
+
+import serialization
+
+# Change feed behind GET /api/feed (async_app.py, Server-Sent Events).
+#
+# The write routes of app.py insert ChangeLog rows in the transaction of the
+# change (repository.record_changes, migrations/008_change_log.sql). One
+# FeedHub per process polls that outbox with a primary key range scan every
+# FEED_POLL_INTERVAL, whatever the number of subscribers, turns each new row
+# into an SSE frame once, and keeps the last FEED_BUFFER_SIZE frames in
+# memory. Subscribers only hold a cursor (the last event ID they got) and
+# all await one shared future, resolved when events are published and every
+# FEED_KEEPALIVE seconds (keepalive comments): an idle connection is a
+# suspended coroutine with no timer of its own, so a process keeps thousands.
+#
+# Resuming: a client sends the last ID it got (Last-Event-ID, or ?after=).
+# IDs still in the buffer are served from memory, older ones page through
+# ChangeLog, then the client continues live. ChangeLog keeps
+# FEED_RETENTION_DAYS of history.
+#
+# Ordering: AUTO_INCREMENT IDs are assigned at insert time but become visible
+# at commit, so a lower ID may show up after a higher one. A hole in the IDs
+# holds delivery back for up to FEED_GAP_WAIT seconds before it is skipped
+# (rolled back transactions leave holes for good). Skipped IDs are read again
+# on every poll for FEED_GAP_LOOKBACK seconds, and published late if their
+# transaction commits meanwhile. At startup, the holes among the IDs of the
+# last FEED_GAP_LOOKBACK seconds are watched the same way, so a transaction
+# still open then is not missed.
+#
+# Events are buffered, and sent, in the order they were published: a late
+# event comes after events with higher IDs. A client resuming from an ID
+# still in the buffer gets exactly what followed it; one resuming from the
+# database gets the IDs above its own (late events published since it left
+# may be missed, or sent twice).
+
+FEED_POLL_INTERVAL = float(os.getenv('FEED_POLL_INTERVAL', 0.5))
+FEED_BUFFER_SIZE = int(os.getenv('FEED_BUFFER_SIZE', 10000))
+FEED_GAP_WAIT = float(os.getenv('FEED_GAP_WAIT', 5))
+FEED_GAP_LOOKBACK = float(os.getenv('FEED_GAP_LOOKBACK', 60))
+FEED_KEEPALIVE = float(os.getenv('FEED_KEEPALIVE', 15))
+FEED_RETENTION_DAYS = float(os.getenv('FEED_RETENTION_DAYS', 7))
+FEED_PAGE_SIZE = 1000
+MAX_CHANGE_ID = 2 ** 63 - 1
+
+KINDS = ('job_offer', 'application')
+
+CHANGES_SELECT = """
+    SELECT c.ChangeID, c.Kind, c.JobOfferID, c.WorkerID, c.Status, c.CreatedAt,
+           j.LocationID, j.Date, j.StartTime, j.EndTime, j.MaxWage, j.WorkingDays, j.Hours,
+           l.Street, l.Number, l.City, co.Name as CompanyName
+    FROM ChangeLog c
+    LEFT JOIN JobOffer j ON c.Kind = 'job_offer' AND j.JobOfferID = c.JobOfferID
+    LEFT JOIN Location l ON l.LocationID = j.LocationID
+    LEFT JOIN Company co ON co.CompanyID = l.CompanyID
+"""
+
+CHANGES_QUERY = CHANGES_SELECT + """
+    WHERE c.ChangeID > %s AND c.ChangeID <= %s
+    ORDER BY c.ChangeID
+    LIMIT %s
+"""
+
+# Skipped IDs, read again while they may still commit
+MISSING_CHANGES_QUERY = CHANGES_SELECT + """
+    WHERE c.ChangeID IN ({ids})
+    ORDER BY c.ChangeID
+"""
+
+LAST_CHANGE_QUERY = "SELECT IFNULL(MAX(ChangeID), 0) as ChangeID FROM ChangeLog"
+
+# IDs from the last row older than FEED_GAP_LOOKBACK seconds on (start_position)
+RECENT_CHANGES_QUERY = """
+    SELECT ChangeID FROM ChangeLog
+    WHERE ChangeID >= IFNULL((SELECT ChangeID FROM ChangeLog
+                              WHERE CreatedAt < NOW(3) - INTERVAL %s SECOND
+                              ORDER BY ChangeID DESC LIMIT 1), 0)
+    ORDER BY ChangeID
+"""
+
+PRUNE_QUERY = "DELETE FROM ChangeLog WHERE CreatedAt < NOW() - INTERVAL %s SECOND LIMIT 10000"
+
+OFFER_COLUMNS = ('LocationID', 'Date', 'StartTime', 'EndTime', 'MaxWage', 'WorkingDays', 'Hours',
+                 'Street', 'Number', 'City', 'CompanyName')
+
+
+class Event:
+    # One ChangeLog row, serialized once for every subscriber
+    __slots__ = ('id', 'kind', 'worker_id', 'city', 'frame')
+
+    def __init__(self, row):
+        self.id = row['ChangeID']
+        self.kind = row['Kind']
+        self.worker_id = row['WorkerID']
+        self.city = row['City']
+        data = {
+            "id": self.id,
+            "job_offer_id": row['JobOfferID'],
+            "status": row['Status'],
+            "at": row['CreatedAt'],
+        }
+        if self.kind == 'application':
+            data["worker_id"] = self.worker_id
+        elif row['LocationID'] is not None:
+            data["job_offer"] = {column: row[column] for column in OFFER_COLUMNS}
+        self.frame = (f"id: {self.id}\nevent: {self.kind}\ndata: ".encode()
+                      + serialization.dumps_bytes(data) + b"\n\n")
+
+
+def parse_filters(args):
+    # Subscriber filters: ?kinds=job_offer,application&worker_id=&city=
+    # Returns a predicate on Event; raises ValueError with a client-facing message
+    kinds = set(args.get('kinds', ','.join(KINDS)).split(','))
+    if not kinds <= set(KINDS):
+        raise ValueError(f"kinds must be among: {', '.join(KINDS)}")
+    worker_id = args.get('worker_id')
+    if worker_id is not None:
+        try:
+            worker_id = int(worker_id)
+        except ValueError:
+            raise ValueError("worker_id must be an integer")
+    city = args.get('city')
+
+    def accept(event):
+        if event.kind not in kinds:
+            return False
+        if event.kind == 'application':
+            # Status changes are only sent to the worker they concern, when given
+            return worker_id is None or event.worker_id == worker_id
+        return city is None or event.city == city
+    return accept
+
+
+def start_position(change_ids):
+    # change_ids: RECENT_CHANGES_QUERY rows, ascending. Returns the last ID
+    # and the IDs missing below it, which an open transaction may still hold
+    if not change_ids:
+        return 0, []
+    present = set(change_ids)
+    missing = [change_id for change_id in range(change_ids[0], change_ids[-1]) if change_id not in present]
+    return change_ids[-1], missing[-FEED_PAGE_SIZE:]
+
+
+def parse_after(value):
+    try:
+        return int(value) if value not in (None, '') else None
+    except ValueError:
+        raise ValueError("Last-Event-ID / after must be an integer")
+
+
+class FeedHub:
+    def __init__(self, fetch_changes, fetch_missing, last_change_id, missing=(), buffer_size=FEED_BUFFER_SIZE,
+                 gap_wait=FEED_GAP_WAIT, gap_lookback=FEED_GAP_LOOKBACK):
+        # fetch_changes(after, upto, limit): coroutine returning CHANGES_QUERY rows
+        # fetch_missing(change_ids): coroutine returning MISSING_CHANGES_QUERY rows
+        self._fetch = fetch_changes
+        self._fetch_missing = fetch_missing
+        self.buffer_size = buffer_size
+        self.gap_wait = gap_wait
+        self.gap_lookback = gap_lookback
+        # IDs up to last_id are published, except the holes (ID -> when it
+        # was skipped); buffered events up to floor are only in the database
+        self.last_id = last_change_id
+        self.floor = last_change_id
+        now = time.monotonic()
+        self.holes = {change_id: now for change_id in missing}
+        # Buffer in publish order: event, last_id once it was published (not
+        # decreasing), and sequence number (of the next one: _seq)
+        self._events = []
+        self._marks = []
+        self._seqs = {}
+        self._seq = 0
+        self._gap_since = None
+        self._wakeup = None
+        self.subscribers = 0
+        self.published = 0
+        self.skipped_gaps = 0
+        self.late = 0
+
+    async def poll(self):
+        # One outbox read, plus one of the holes still watched; True when a
+        # full page was published (more may be waiting)
+        if self.holes:
+            now = time.monotonic()
+            self.holes = {change_id: since for change_id, since in self.holes.items()
+                          if now - since < self.gap_lookback}
+            if self.holes:
+                self.publish_late(await self._fetch_missing(sorted(self.holes)))
+        rows = await self._fetch(self.last_id, MAX_CHANGE_ID, FEED_PAGE_SIZE)
+        return self.publish(rows, time.monotonic()) == FEED_PAGE_SIZE
+
+    def publish(self, rows, now):
+        # rows: ordered by ChangeID, all above last_id
+        count = 0
+        for row in rows:
+            change_id = row['ChangeID']
+            if change_id != self.last_id + 1:
+                # A transaction holding the missing IDs may not have committed yet
+                if self._gap_since is None:
+                    self._gap_since = now
+                if now - self._gap_since < self.gap_wait:
+                    break
+                self.skipped_gaps += 1
+                room = FEED_PAGE_SIZE - len(self.holes)
+                if room > 0:
+                    self.holes.update(dict.fromkeys(range(self.last_id + 1, change_id)[-room:], now))
+            self._gap_since = None
+            self.last_id = change_id
+            self._append(Event(row))
+            count += 1
+        return self._published(count)
+
+    def publish_late(self, rows):
+        # rows: skipped IDs whose transaction committed after all
+        count = 0
+        for row in rows:
+            if self.holes.pop(row['ChangeID'], None) is not None:
+                self._append(Event(row))
+                count += 1
+        self.late += count
+        return self._published(count)
+
+    def _append(self, event):
+        self._events.append(event)
+        self._marks.append(self.last_id)
+        self._seqs[event.id] = self._seq
+        self._seq += 1
+
+    def _published(self, count):
+        excess = len(self._events) - self.buffer_size
+        if excess > 0:
+            for event in self._events[:excess]:
+                del self._seqs[event.id]
+            self.floor = self._marks[excess - 1]
+            del self._events[:excess]
+            del self._marks[:excess]
+
+        if count:
+            self.published += count
+            self.wake()
+        return count
+
+    def _position(self, change_id):
+        # Sequence number of the first buffered event not sent to a client
+        # that got change_id: right after it when buffered, else the first
+        # one published once last_id was above it
+        seq = self._seqs.get(change_id)
+        if seq is not None:
+            return seq + 1
+        return self._seq - len(self._events) + bisect.bisect_right(self._marks, change_id)
+
+    def wake(self):
+        # Resume every waiting subscriber; called on publish and on keepalive ticks
+        if self._wakeup is not None:
+            self._wakeup.set_result(None)
+            self._wakeup = None
+
+    def _wait(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.get_running_loop().create_future()
+        return self._wakeup
+
+    async def subscribe(self, after=None, accept=lambda event: True):
+        # Async generator of SSE chunks for events after `after` (None: from now on)
+        # cursor: the last ID sent, position: the next buffered event to send
+        cursor = self.last_id if after is None else after
+        position = self._seq if after is None else None
+        self.subscribers += 1
+        try:
+            yield f"retry: {int(FEED_POLL_INTERVAL * 2000)}\n\n".encode()
+            while True:
+                first = self._seq - len(self._events)
+                if position is None or position < first:
+                    # Resuming, or left behind by the buffer
+                    if cursor < self.floor and cursor not in self._seqs:
+                        # Older than the buffer: page through the outbox
+                        rows = await self._fetch(cursor, self.floor, FEED_PAGE_SIZE)
+                        if rows:
+                            frames = [event.frame for event in map(Event, rows) if accept(event)]
+                            cursor = rows[-1]['ChangeID']
+                            if frames:
+                                yield b''.join(frames)
+                            continue
+                        cursor = self.floor
+                    position = self._position(cursor)
+                    continue
+
+                if position < self._seq:
+                    frames = [event.frame for event in self._events[position - first:] if accept(event)]
+                    position = self._seq
+                    cursor = self._marks[-1]
+                    if frames:
+                        yield b''.join(frames)
+                    continue
+
+                # Shielded: a client going away must not cancel the shared future
+                await asyncio.shield(self._wait())
+                if self._seq == position:
+                    # Keepalive tick. Comment line: keeps proxies from closing an idle stream
+                    yield b": keepalive\n\n"
+        finally:
+            self.subscribers -= 1
+
+    def stats(self):
+        return {
+            "subscribers": self.subscribers,
+            "last_id": self.last_id,
+            "buffered": len(self._events),
+            "oldest_buffered": self._events[0].id if self._events else None,
+            "published": self.published,
+            "skipped_gaps": self.skipped_gaps,
+            "watched_gaps": len(self.holes),
+            "late": self.late,
+        }
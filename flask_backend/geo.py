@@ -0,0 +1,82 @@
+import math
+
+from serialization import fetch_dicts
+
+# "Open jobs near me" for GET /api/joboffers/nearby.
+#
+# Location.Latitude / Longitude (sql_queries/migrations/006_location_coordinates.sql)
+# are mirrored in Location.Position, a POINT(lon, lat) with an R-tree index
+# (009_location_position.sql), so the bounding box around the point is one
+# sidx_location_position lookup narrowed on both axes; only the locations
+# inside the box get their exact great-circle distance computed
+# (ST_Distance_Sphere), and their open offers are reached through
+# idx_joboffer_location_status_date.
+#
+# Without a radius, the nearest `limit` offers are found by doubling the radius
+# from NEAREST_START_RADIUS_KM until enough rows come back.
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_RADIUS_KM = 500.0
+NEAREST_START_RADIUS_KM = 5.0
+DEFAULT_NEARBY_LIMIT = 20
+MAX_NEARBY_LIMIT = 200
+
+NEARBY_QUERY = """
+    SELECT J.JobOfferID, J.LocationID, J.Date, J.StartTime, J.EndTime, J.MaxWage, J.WorkingDays, J.Hours,
+           L.Street, L.Number, L.City, L.Latitude, L.Longitude, C.Name as CompanyName,
+           ST_Distance_Sphere(L.Position, POINT(%s, %s)) / 1000 as DistanceKm
+    FROM Location as L
+    JOIN JobOffer as J ON J.LocationID = L.LocationID
+    JOIN Company as C ON L.CompanyID = C.CompanyID
+    WHERE MBRCovers(ST_MakeEnvelope(POINT(%s, %s), POINT(%s, %s)), L.Position)
+      AND J.Status = 'Open'
+    HAVING DistanceKm <= %s
+    ORDER BY DistanceKm ASC, J.JobOfferID ASC
+    LIMIT %s
+"""
+
+
+def parse_coordinates(lat, lon):
+    # Returns (lat, lon) as floats; raises ValueError with a client-facing message
+    try:
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        raise ValueError("latitude and longitude must be numbers")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("latitude must be in [-90, 90] and longitude in [-180, 180]")
+    return lat, lon
+
+
+def bounding_box(lat, lon, radius_km):
+    # (min_lat, max_lat, min_lon, max_lon) containing every point within radius_km
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        # The circle contains a pole: every longitude qualifies
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+    delta_lon = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat)))))
+    min_lon, max_lon = lon - delta_lon, lon + delta_lon
+    if min_lon < -180 or max_lon > 180:
+        # Crosses the antimeridian: a wider box is still correct
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def nearby_params(lat, lon, radius_km, limit):
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    return (lon, lat, min_lon, min_lat, max_lon, max_lat, radius_km, limit)
+
+
+def find_nearby(cursor, lat, lon, radius_km=None, limit=DEFAULT_NEARBY_LIMIT):
+    # Returns (jobs, radius_km actually searched); jobs are sorted by distance
+    if radius_km is not None:
+        cursor.execute(NEARBY_QUERY, nearby_params(lat, lon, radius_km, limit))
+        return fetch_dicts(cursor), radius_km
+
+    radius_km = NEAREST_START_RADIUS_KM
+    while True:
+        cursor.execute(NEARBY_QUERY, nearby_params(lat, lon, radius_km, limit))
+        jobs = fetch_dicts(cursor)
+        if len(jobs) >= limit or radius_km >= MAX_RADIUS_KM:
+            return jobs, radius_km
+        radius_km = min(radius_km * 2, MAX_RADIUS_KM)
@@ -0,0 +1,163 @@
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+# Query compiler of GET /api/joboffers/available: whitelisted filters, sort
+# keys and projected fields become one parameterized SELECT. Nothing from the
+# request is ever pasted into the SQL text, only into the parameters.
+#
+# Results are keyset-paginated on (sort column, JobOfferID); the cursor is
+# "<sort value>,<JobOfferID>" of the last row of the previous page, with
+# "null" for a NULL sort value. MySQL sorts NULLs first ascending and last
+# descending, the keyset predicate follows that order.
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# name -> (SQL condition, parser of the query string value)
+FILTERS = {
+    'city': ("L.City = %s", str),
+    'company_id': ("L.CompanyID = %s", int),
+    'min_wage': ("J.MaxWage >= %s", Decimal),
+    'max_wage': ("J.MaxWage <= %s", Decimal),
+    'date_from': ("J.Date >= %s", date.fromisoformat),
+    'date_to': ("J.Date <= %s", date.fromisoformat),
+    'min_hours': ("J.Hours >= %s", int),
+    'max_hours': ("J.Hours <= %s", int),
+    'working_days': ("J.WorkingDays = %s", int),
+}
+
+# field -> (SQL expression, tables it needs besides JobOffer)
+FIELDS = {
+    'JobOfferID': ("J.JobOfferID", ()),
+    'LocationID': ("J.LocationID", ()),
+    'Date': ("J.Date", ()),
+    'StartTime': ("J.StartTime", ()),
+    'EndTime': ("J.EndTime", ()),
+    'MaxWage': ("J.MaxWage", ()),
+    'WorkingDays': ("J.WorkingDays", ()),
+    'Hours': ("J.Hours", ()),
+    'Street': ("L.Street", ('L',)),
+    'Number': ("L.Number", ('L',)),
+    'City': ("L.City", ('L',)),
+    'CompanyName': ("C.Name as CompanyName", ('L', 'C')),
+}
+
+# sort -> (field, SQL column, descending, parser of the cursor value)
+SORTS = {
+    'date': ('Date', "J.Date", False, date.fromisoformat),
+    '-date': ('Date', "J.Date", True, date.fromisoformat),
+    'max_wage': ('MaxWage', "J.MaxWage", False, Decimal),
+    '-max_wage': ('MaxWage', "J.MaxWage", True, Decimal),
+}
+
+
+NULL_CURSOR_VALUE = 'null'
+
+
+def parse_cursor(after, parse_value=date.fromisoformat):
+    try:
+        value, job_id = after.rsplit(',', 1)
+        return None if value == NULL_CURSOR_VALUE else parse_value(value), int(job_id)
+    except (ValueError, InvalidOperation):
+        return None
+
+
+def make_cursor(job, sort='date'):
+    field = SORTS[sort][0]
+    value = job[field]
+    if value is None:
+        value = NULL_CURSOR_VALUE
+    elif isinstance(value, date):
+        value = value.isoformat()
+    return f"{value},{job['JobOfferID']}"
+
+
+def keyset_condition(sort_column, descending, after_key):
+    # Rows after the cursor in ORDER BY sort_column, JobOfferID (both ASC or
+    # both DESC): returns (condition, params)
+    value, job_id = after_key
+    if descending:
+        if value is None:
+            return f"({sort_column} IS NULL AND J.JobOfferID < %s)", [job_id]
+        return (f"({sort_column} < %s OR ({sort_column} = %s AND J.JobOfferID < %s) OR {sort_column} IS NULL)",
+                [value, value, job_id])
+    if value is None:
+        return f"(({sort_column} IS NULL AND J.JobOfferID > %s) OR {sort_column} IS NOT NULL)", [job_id]
+    return f"({sort_column} > %s OR ({sort_column} = %s AND J.JobOfferID > %s))", [value, value, job_id]
+
+
+def parse_available_jobs_args(args):
+    # Returns (sort, fields, filters {name: parsed value}, after key or None);
+    # raises ValueError with a client-facing message
+    sort = args.get('sort', 'date')
+    if sort not in SORTS:
+        raise ValueError(f"Invalid sort. Must be one of: {', '.join(SORTS)}")
+    sort_field, _, _, parse_value = SORTS[sort]
+
+    fields = list(FIELDS)
+    if args.get('fields'):
+        fields = [field.strip() for field in args['fields'].split(',') if field.strip()]
+        unknown = [field for field in fields if field not in FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(FIELDS)}")
+    # The cursor needs these two
+    for field in ('JobOfferID', sort_field):
+        if field not in fields:
+            fields.append(field)
+
+    filters = {}
+    for name, (_, parse) in FILTERS.items():
+        if name in args:
+            try:
+                filters[name] = parse(args[name])
+            except (ValueError, InvalidOperation):
+                raise ValueError(f"Invalid value for {name}")
+
+    after_key = None
+    if args.get('after'):
+        after_key = parse_cursor(args['after'], parse_value)
+        if not after_key:
+            raise ValueError("Invalid cursor")
+    return sort, fields, filters, after_key
+
+
+def build_available_jobs_query(args, limit=None):
+    # Returns (query, params); raises ValueError with a client-facing message
+    sort, fields, filters, after_key = parse_available_jobs_args(args)
+    _, sort_column, descending, _ = SORTS[sort]
+
+    conditions = ["J.Status = 'Open'"]
+    params = []
+    tables = set()
+    for name, value in filters.items():
+        condition = FILTERS[name][0]
+        params.append(value)
+        conditions.append(condition)
+        if condition.startswith('L.'):
+            tables.add('L')
+    for field in fields:
+        tables.update(FIELDS[field][1])
+
+    if after_key:
+        condition, condition_params = keyset_condition(sort_column, descending, after_key)
+        conditions.append(condition)
+        params += condition_params
+
+    # Location / Company are only joined when a field or filter needs them
+    from_clause = "JobOffer as J"
+    if 'L' in tables:
+        from_clause += " JOIN Location as L ON J.LocationID = L.LocationID"
+    if 'C' in tables:
+        from_clause += " JOIN Company as C ON L.CompanyID = C.CompanyID"
+
+    direction = 'DESC' if descending else 'ASC'
+    query = (
+        f"SELECT {', '.join(FIELDS[field][0] for field in fields)}"
+        f" FROM {from_clause}"
+        f" WHERE {' AND '.join(conditions)}"
+        f" ORDER BY {sort_column} {direction}, J.JobOfferID {direction}"
+    )
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    return query, params
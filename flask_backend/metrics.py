@@ -0,0 +1,295 @@
+import bisect
+import logging
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import Response, has_request_context, request
+
+import serialization
+
+# Request and SQL instrumentation, exposed in the Prometheus text format on
+# GET /metrics and as one JSON log line per event on the 'job2main' logger:
+#   - http_request_duration_seconds{method, route, status}   histogram
+#   - db_queries_per_request / db_query_seconds_per_request  histograms
+#   - db_query_duration_seconds                              histogram
+#   - db_pool_acquire_seconds                                histogram
+#   - db_slow_queries_total                                  counter
+#   - db_pool_* / cache_* gauges from the pool and cache stats
+#
+# Metrics live in the process: with several gunicorn workers each /metrics
+# response only covers the worker process that served it.
+#
+# Slow statements (>= SLOW_QUERY_MS) are logged at WARNING with their SQL
+# text only: parameters are never logged, just how many there were.
+# Access lines (one per request) are logged at INFO, so LOG_LEVEL=INFO
+# turns them on.
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+logger = logging.getLogger('job2main')
+
+
+class Series:
+    # One label combination of a histogram: per bucket counts (+Inf last),
+    # sum, count
+    __slots__ = ('buckets', 'counts', 'total', 'count', '_lock')
+
+    def __init__(self, buckets, lock):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = lock
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def series(self, *label_values):
+        # Hot paths look the series up once and keep it
+        series = self._series.get(label_values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(label_values, Series(self.buckets, self._lock))
+        return series
+
+    def observe(self, value, *label_values):
+        self.series(*label_values).observe(value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(series.counts), series.total, series.count)
+                      for labels, series in self._series.items()]
+        for label_values, counts, total, count in sorted(series):
+            labels = format_labels(self.labels, label_values)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{format_labels(self.labels + ("le",), label_values + (str(bound),))} {cumulative}')
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self):
+        with self._lock:
+            self.value += 1
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter", f"{self.name} {self.value}"]
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values)) + '}'
+
+
+request_duration = Histogram('http_request_duration_seconds', "Time spent handling a request",
+                             labels=('method', 'route', 'status'))
+queries_per_request = Histogram('db_queries_per_request', "SQL statements executed by one request",
+                                buckets=COUNT_BUCKETS)
+query_seconds_per_request = Histogram('db_query_seconds_per_request', "Time one request spent in SQL statements")
+query_duration = Histogram('db_query_duration_seconds', "Duration of one SQL statement")
+acquire_duration = Histogram('db_pool_acquire_seconds', "Time spent getting a connection from the pool")
+slow_queries = Counter('db_slow_queries_total', "SQL statements slower than SLOW_QUERY_MS")
+
+slow_query_seconds = float(os.getenv('SLOW_QUERY_MS', 200)) / 1000
+
+# Series of the unlabeled histograms, and of request_duration per
+# (method, route, status), looked up once rather than on every observation
+_query_duration = query_duration.series()
+_acquire_duration = acquire_duration.series()
+_queries_per_request = queries_per_request.series()
+_query_seconds_per_request = query_seconds_per_request.series()
+_request_series = {}
+
+
+def log_event(level, event, **fields):
+    if logger.isEnabledFor(level):
+        logger.log(level, serialization.dumps({"event": event, **fields}))
+
+
+def statement_text(statement):
+    return re.sub(r'\s+', ' ', statement).strip()
+
+
+class RequestMetrics:
+    # Totals of the request being handled, see _current
+    __slots__ = ('start', 'sql_count', 'sql_seconds', 'pool_wait_seconds')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+
+
+# A context variable rather than flask.g: these run on every statement and
+# a contextvar lookup is much cheaper than going through the g proxy
+_current = ContextVar('request_metrics', default=None)
+
+
+def record_query(statement, params, seconds):
+    _query_duration.observe(seconds)
+    current = _current.get()
+    if current is not None:
+        current.sql_count += 1
+        current.sql_seconds += seconds
+    if seconds >= slow_query_seconds:
+        slow_queries.inc()
+        log_event(logging.WARNING, 'slow_query', duration_ms=round(seconds * 1000, 3),
+                  statement=statement_text(statement), params=len(params or ()),
+                  route=request.url_rule.rule if has_request_context() and request.url_rule else None)
+
+
+def record_acquire(seconds):
+    _acquire_duration.observe(seconds)
+    current = _current.get()
+    if current is not None:
+        current.pool_wait_seconds += seconds
+
+
+class InstrumentedCursor:
+    # Cursor proxy timing execute() / executemany()
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    # The calls every route makes, defined here rather than falling back
+    # to __getattr__ (a failed lookup first)
+    @property
+    def column_names(self):
+        return self._cursor.column_names
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, *args, **kwargs):
+        return self._cursor.fetchmany(*args, **kwargs)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        return self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            record_query(operation, params, time.perf_counter() - start)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            record_query(operation, seq_params, time.perf_counter() - start)
+
+
+def start_timer():
+    _current.set(RequestMetrics())
+
+
+def observe_request(response):
+    current = _current.get()
+    if current is None:
+        return response
+    # Statements run while streaming the body are only in the global histograms
+    _current.set(None)
+    seconds = time.perf_counter() - current.start
+    req = request._get_current_object()
+    rule = req.url_rule
+    route = rule.rule if rule else 'unmatched'
+    method = req.method
+    status = response.status_code
+    key = (method, route, status)
+    series = _request_series.get(key)
+    if series is None:
+        series = _request_series[key] = request_duration.series(method, route, str(status))
+    series.observe(seconds)
+    _queries_per_request.observe(current.sql_count)
+    _query_seconds_per_request.observe(current.sql_seconds)
+    # The access line is only built when it will be written
+    if logger.isEnabledFor(logging.INFO):
+        log_event(logging.INFO, 'request', method=method, route=route, status=status,
+                  duration_ms=round(seconds * 1000, 3), sql_count=current.sql_count,
+                  sql_ms=round(current.sql_seconds * 1000, 3),
+                  pool_wait_ms=round(current.pool_wait_seconds * 1000, 3))
+    return response
+
+
+def render(gauges=()):
+    # gauges: (prefix, {name: value}) pairs, e.g. ('db_pool', pool.stats())
+    lines = []
+    for metric in (request_duration, queries_per_request, query_seconds_per_request,
+                   query_duration, acquire_duration, slow_queries):
+        lines += metric.render()
+    for prefix, values in gauges:
+        for name, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f"# TYPE {prefix}_{name} gauge")
+                lines.append(f"{prefix}_{name} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_response(gauges=()):
+    return Response(render(gauges), mimetype='text/plain; version=0.0.4')
+
+
+def enabled():
+    return os.getenv('METRICS_ENABLED', '1') not in ('0', 'false', 'no')
+
+
+def init_app(app):
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(os.getenv('LOG_LEVEL', 'WARNING').upper())
+        logger.propagate = False
+    if enabled():
+        app.before_request(start_timer)
+        app.after_request(observe_request)
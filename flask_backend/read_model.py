@@ -0,0 +1,562 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from datetime import date
+from operator import attrgetter
+
+from mysql.connector import Error
+
+import metrics
+from cache import invalidate
+from db import get_pool, sticky_primary
+from feed import FEED_GAP_WAIT, LAST_CHANGE_QUERY
+from job_search import SORTS
+
+# In-process read model of the job offers (READ_MODEL=1), serving
+# GET /api/joboffers/available, an employer's job offers and a job's
+# employer from memory instead of joining JobOffer, Location, Company and
+# User for every request.
+#
+# Offers are __slots__ records pointing at shared Place (location + company)
+# records; repeated dates, times and wages are interned. Open offers are
+# indexed by date, wage, city and company in sorted lists of packed integer
+# keys (sort value << 32 | JobOfferID), so a page is a bisect to the cursor
+# plus a walk; every offer is indexed by status and by employer.
+#
+# Freshness:
+#   - built on first use by a background thread, requests use the database
+#     until it is ready;
+#   - ChangeLog (the outbox of feed.py) names the offers each write changed:
+#     every READ_MODEL_SYNC_INTERVAL the first request finding the sync due
+#     reads them again from the primary, and the write routes of this
+#     process sync right after their commit (they read their own writes);
+#   - changes made outside the API (status moved to Confirmed / Running,
+#     users, locations) are not in ChangeLog: every READ_MODEL_REBUILD_INTERVAL
+#     a fresh model is loaded, compared with the live one (drift is logged
+#     and shown by GET /api/admin/read-model) and swapped in.
+#
+# Anything the model does not know (an employer or offer created outside
+# the API since the last build) is answered from the database.
+
+READ_MODEL = os.getenv('READ_MODEL', '0') == '1'
+READ_MODEL_SYNC_INTERVAL = float(os.getenv('READ_MODEL_SYNC_INTERVAL', 1))
+READ_MODEL_REBUILD_INTERVAL = float(os.getenv('READ_MODEL_REBUILD_INTERVAL', 300))
+CHANGES_PAGE_SIZE = 1000
+ID_MASK = 0xFFFFFFFF
+
+OFFERS_QUERY = """
+    SELECT JobOfferID, LocationID, CreatedBy, Status, Date, StartTime, EndTime, MaxWage, WorkingDays, Hours
+    FROM JobOffer {where}
+"""
+
+PLACES_QUERY = """
+    SELECT l.LocationID, l.Street, l.Number, l.City, l.CompanyID, c.Name
+    FROM Location l
+    JOIN Company c ON c.CompanyID = l.CompanyID {where}
+"""
+
+CONTACTS_QUERY = "SELECT UserID, FirstName, Surname, Email, PhoneNumber FROM User {where}"
+
+# Only the users that created offers are needed
+CREATORS = "WHERE UserID IN (SELECT CreatedBy FROM JobOffer)"
+
+EMPLOYERS_QUERY = "SELECT DISTINCT UserID FROM Employer {where}"
+
+CHANGES_QUERY = "SELECT ChangeID, Kind, JobOfferID FROM ChangeLog WHERE ChangeID > %s ORDER BY ChangeID LIMIT %s"
+
+
+class Place:
+    # A Location with its company, shared by the offers at that location
+    __slots__ = ('id', 'street', 'number', 'city', 'city_key', 'company_id', 'company_name')
+
+    def __init__(self, row, intern):
+        self.id, street, number, city, self.company_id, company_name = row
+        self.street, self.number, self.city = intern(street), intern(number), intern(city)
+        # MySQL compares cities case-insensitively
+        self.city_key = intern(city.casefold()) if city is not None else None
+        self.company_name = intern(company_name)
+
+
+class Contact:
+    # The User row of an employer
+    __slots__ = ('id', 'first_name', 'surname', 'email', 'phone_number')
+
+    def __init__(self, row):
+        self.id, self.first_name, self.surname, self.email, self.phone_number = row
+
+    def values(self):
+        return (self.first_name, self.surname, self.email, self.phone_number)
+
+
+class Offer:
+    # A JobOffer row; replaced, never modified, when the offer changes
+    __slots__ = ('id', 'place', 'created_by', 'status', 'date', 'start_time', 'end_time',
+                 'max_wage', 'working_days', 'hours', 'day', 'cents')
+
+    def __init__(self, row, place, intern):
+        self.id, _, self.created_by, status, day, start_time, end_time, max_wage, working_days, hours = row
+        self.place = place
+        self.status = intern(status)
+        self.date, self.start_time, self.end_time = intern(day), intern(start_time), intern(end_time)
+        self.max_wage, self.working_days, self.hours = intern(max_wage), intern(working_days), intern(hours)
+        # Normalized sort values (the SQLite stand-in returns dates as text)
+        if day is None:
+            self.day = None
+        else:
+            self.day = intern((date.fromisoformat(day) if isinstance(day, str) else day).toordinal())
+        self.cents = intern(round(max_wage * 100)) if max_wage is not None else None
+
+    def values(self):
+        return (self.place.id, self.place.street, self.place.number, self.place.city, self.place.company_id,
+                self.place.company_name, self.created_by, self.status, self.date, self.start_time,
+                self.end_time, self.max_wage, self.working_days, self.hours)
+
+
+def date_key(offer):
+    # NULL sorts first, like in MySQL
+    return (offer.day or 0) << 32 | offer.id
+
+
+def wage_key(offer):
+    return (offer.cents + 1 if offer.cents is not None else 0) << 32 | offer.id
+
+
+# filter of job_search.FILTERS -> (prepare the parsed value, test an offer)
+FILTER_TESTS = {
+    'city': (str.casefold, lambda offer, city: offer.place.city_key == city),
+    'company_id': (int, lambda offer, company_id: offer.place.company_id == company_id),
+    'min_wage': (lambda wage: wage * 100, lambda offer, cents: offer.cents is not None and offer.cents >= cents),
+    'max_wage': (lambda wage: wage * 100, lambda offer, cents: offer.cents is not None and offer.cents <= cents),
+    'date_from': (date.toordinal, lambda offer, day: offer.day is not None and offer.day >= day),
+    'date_to': (date.toordinal, lambda offer, day: offer.day is not None and offer.day <= day),
+    'min_hours': (int, lambda offer, hours: offer.hours is not None and offer.hours >= hours),
+    'max_hours': (int, lambda offer, hours: offer.hours is not None and offer.hours <= hours),
+    'working_days': (int, lambda offer, days: offer.working_days == days),
+}
+
+# field of job_search.FIELDS (and Status) -> Offer attribute
+FIELD_VALUES = {
+    'JobOfferID': attrgetter('id'),
+    'LocationID': attrgetter('place.id'),
+    'Status': attrgetter('status'),
+    'Date': attrgetter('date'),
+    'StartTime': attrgetter('start_time'),
+    'EndTime': attrgetter('end_time'),
+    'MaxWage': attrgetter('max_wage'),
+    'WorkingDays': attrgetter('working_days'),
+    'Hours': attrgetter('hours'),
+    'Street': attrgetter('place.street'),
+    'Number': attrgetter('place.number'),
+    'City': attrgetter('place.city'),
+    'CompanyName': attrgetter('place.company_name'),
+}
+
+# Columns of repository.EMPLOYER_JOB_OFFERS_QUERY
+EMPLOYER_JOB_OFFER_FIELDS = ('JobOfferID', 'LocationID', 'Status', 'Date', 'StartTime', 'EndTime', 'MaxWage',
+                             'WorkingDays', 'Hours', 'Street', 'Number', 'City', 'CompanyName')
+
+
+def job_rows(offers, fields):
+    # Rows as the database returns them for the selected fields
+    getters = [(field, FIELD_VALUES[field]) for field in fields]
+    return [{field: get(offer) for field, get in getters} for offer in offers]
+
+
+def where_in(column, ids):
+    return f"WHERE {column} IN ({', '.join(['%s'] * len(ids))})"
+
+
+def select(conn, query, where="", params=()):
+    # Rows as tuples
+    cursor = conn.cursor()
+    cursor.execute(query.format(where=where), params)
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+class ReadModel:
+    def __init__(self, change_id):
+        # Changes up to change_id (ChangeLog) are applied
+        self.change_id = change_id
+        self.offers = {}
+        self.places = {}
+        self.contacts = {}
+        self.employers = set()
+        self.by_status = {}
+        self.by_employer = {}
+        self.open_by_date = []
+        self.open_by_wage = []
+        self.open_by_city = {}
+        self.open_by_company = {}
+        self._values = {}
+        # _lock guards reads against a sync applying changes; _sync_lock
+        # makes the sync single-threaded
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._gap_since = None
+        self.built = time.time()
+        self.synced = time.monotonic()
+        self.syncs = 0
+        self.applied = 0
+        self.drift = None
+
+    def intern(self, value):
+        # Repeated dates, times, wages and strings share one object
+        if value is None:
+            return None
+        return self._values.setdefault((type(value), value), value)
+
+    @classmethod
+    def load(cls, conn):
+        # Full snapshot; the ChangeLog position is read first, so sync()
+        # replays whatever changed while loading
+        cursor = conn.cursor()
+        cursor.execute(LAST_CHANGE_QUERY)
+        model = cls(cursor.fetchone()[0])
+        cursor.close()
+
+        for row in select(conn, PLACES_QUERY):
+            model.places[row[0]] = Place(row, model.intern)
+        for row in select(conn, CONTACTS_QUERY, CREATORS):
+            model.contacts[row[0]] = Contact(row)
+        model.employers = {row[0] for row in select(conn, EMPLOYERS_QUERY)}
+        for row in select(conn, OFFERS_QUERY):
+            place = model.places.get(row[1])
+            if place is not None:
+                model._index(Offer(row, place, model.intern), list.append)
+        for keys in (model.open_by_date, model.open_by_wage, *model.open_by_city.values(),
+                     *model.open_by_company.values()):
+            keys.sort()
+        return model
+
+    def _open_indexes(self, offer):
+        # (sorted key list, key of the offer) of each index of open offers
+        key = date_key(offer)
+        return ((self.open_by_date, key),
+                (self.open_by_wage, wage_key(offer)),
+                (self.open_by_city.setdefault(offer.place.city_key, []), key),
+                (self.open_by_company.setdefault(offer.place.company_id, []), key))
+
+    def _index(self, offer, insert=bisect.insort):
+        self.offers[offer.id] = offer
+        self.by_status.setdefault(offer.status, set()).add(offer.id)
+        self.by_employer.setdefault(offer.created_by, set()).add(offer.id)
+        if offer.status == 'Open':
+            for keys, key in self._open_indexes(offer):
+                insert(keys, key)
+
+    def _unindex(self, offer):
+        del self.offers[offer.id]
+        self.by_status[offer.status].discard(offer.id)
+        self.by_employer[offer.created_by].discard(offer.id)
+        if offer.status == 'Open':
+            for keys, key in self._open_indexes(offer):
+                del keys[bisect.bisect_left(keys, key)]
+
+    def sync(self, conn):
+        # Reads the offers named by ChangeLog rows after change_id again
+        # (their current state: replaying a change is harmless). Caller
+        # holds _sync_lock.
+        self.synced = time.monotonic()
+        changed = set()
+        while True:
+            rows = select(conn, CHANGES_QUERY, params=(self.change_id, CHANGES_PAGE_SIZE))
+            changed.update(job_offer_id for _, kind, job_offer_id in rows if kind == 'job_offer')
+            before = self.change_id
+            self._advance([change_id for change_id, _, _ in rows], time.monotonic())
+            if len(rows) < CHANGES_PAGE_SIZE or self.change_id == before:
+                break
+        self.syncs += 1
+        if changed:
+            self.refresh(conn, changed)
+
+    def _advance(self, change_ids, now):
+        # IDs become visible at commit, not in order: a hole holds the
+        # position back for up to FEED_GAP_WAIT (see feed.py), the offers
+        # after it are applied meanwhile and read again on the next sync
+        for change_id in change_ids:
+            if change_id != self.change_id + 1:
+                if self._gap_since is None:
+                    self._gap_since = now
+                if now - self._gap_since < FEED_GAP_WAIT:
+                    return
+            self._gap_since = None
+            self.change_id = change_id
+
+    def refresh(self, conn, offer_ids):
+        # Reloads these offers (a missing one was deleted), plus the places
+        # and contacts they need that are not known yet
+        offer_ids = sorted(offer_ids)
+        rows = select(conn, OFFERS_QUERY, where_in('JobOfferID', offer_ids), offer_ids)
+        location_ids = list({row[1] for row in rows} - self.places.keys())
+        places = select(conn, PLACES_QUERY, where_in('l.LocationID', location_ids), location_ids) \
+            if location_ids else []
+        creators = {row[2] for row in rows}
+        user_ids = list(creators - self.contacts.keys())
+        contacts = select(conn, CONTACTS_QUERY, where_in('UserID', user_ids), user_ids) if user_ids else []
+        employer_ids = list(creators - self.employers)
+        employers = select(conn, EMPLOYERS_QUERY, where_in('UserID', employer_ids), employer_ids) \
+            if employer_ids else []
+
+        tags = set()
+        with self._lock:
+            for row in places:
+                self.places[row[0]] = Place(row, self.intern)
+            for row in contacts:
+                self.contacts[row[0]] = Contact(row)
+            self.employers.update(row[0] for row in employers)
+            for offer_id in offer_ids:
+                offer = self.offers.get(offer_id)
+                if offer is not None:
+                    self._unindex(offer)
+                    tags.add(offer.created_by)
+            for row in rows:
+                place = self.places.get(row[1])
+                if place is not None:
+                    self._index(Offer(row, place, self.intern))
+                    tags.add(row[2])
+            self.applied += len(offer_ids)
+        # Responses cached (and ETags handed out) before this sync are stale,
+        # also when the write came from another process
+        invalidate('available_jobs', *(f'employer_joboffers:{employer_id}' for employer_id in tags))
+
+    def sync_if_due(self):
+        # By the first request that finds the sync due; the others go on
+        # with the current state instead of waiting
+        if time.monotonic() - self.synced < READ_MODEL_SYNC_INTERVAL or not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            conn = get_pool().acquire()
+            try:
+                self.sync(conn)
+            finally:
+                conn.close()
+        except Error as e:
+            metrics.log_event(logging.WARNING, 'read_model_sync_failed', error=str(e))
+        finally:
+            self._sync_lock.release()
+
+    def available_jobs(self, sort, filters, after=None, limit=None):
+        # Open offers matching the filters, in the order of the sort, after
+        # the cursor: arguments as returned by job_search.parse_available_jobs_args
+        field, _, descending, _ = SORTS[sort]
+        tests = [(FILTER_TESTS[name][1], FILTER_TESTS[name][0](value)) for name, value in filters.items()]
+        by_wage = field == 'MaxWage'
+        with self._lock:
+            # The narrowest index, sorted by date
+            if 'company_id' in filters:
+                keys = self.open_by_company.get(filters['company_id'], [])
+            elif 'city' in filters:
+                keys = self.open_by_city.get(filters['city'].casefold(), [])
+            else:
+                keys = self.open_by_date
+            if by_wage:
+                keys = self.open_by_wage if keys is self.open_by_date else \
+                    sorted(wage_key(self.offers[key & ID_MASK]) for key in keys)
+
+            # Range of the sort column allowed by the filters and the cursor
+            # (the filters are still tested on each offer)
+            low, high = 0, len(keys)
+            if by_wage:
+                if 'min_wage' in filters:
+                    low = bisect.bisect_left(keys, (int(filters['min_wage'] * 100) + 1) << 32)
+                if 'max_wage' in filters:
+                    high = bisect.bisect_left(keys, (int(filters['max_wage'] * 100) + 2) << 32)
+            else:
+                if 'date_from' in filters:
+                    low = bisect.bisect_left(keys, filters['date_from'].toordinal() << 32)
+                if 'date_to' in filters:
+                    high = bisect.bisect_left(keys, (filters['date_to'].toordinal() + 1) << 32)
+            if after:
+                value, job_offer_id = after
+                # NULL sort values are keyed 0: first ascending, last
+                # descending, as in MySQL and job_search.keyset_condition
+                if value is None:
+                    value = 0
+                else:
+                    value = round(value * 100) + 1 if by_wage else value.toordinal()
+                if descending:
+                    high = min(high, bisect.bisect_left(keys, value << 32 | job_offer_id))
+                else:
+                    low = max(low, bisect.bisect_right(keys, value << 32 | job_offer_id))
+
+            offers = []
+            for i in (range(high - 1, low - 1, -1) if descending else range(low, high)):
+                offer = self.offers[keys[i] & ID_MASK]
+                if all(test(offer, value) for test, value in tests):
+                    offers.append(offer)
+                    if len(offers) == limit:
+                        break
+        return offers
+
+    def employer_job_offers(self, employer_id, status=None):
+        # Rows of repository.employer_job_offers for a known employer, None
+        # when the employer is not in the model (ask the database)
+        with self._lock:
+            if employer_id not in self.employers:
+                return None
+            offers = [self.offers[offer_id] for offer_id in sorted(self.by_employer.get(employer_id, ()))]
+        if status:
+            offers = [offer for offer in offers if offer.status.casefold() == status.casefold()]
+        return job_rows(offers, EMPLOYER_JOB_OFFER_FIELDS)
+
+    def job_employer(self, job_offer_id):
+        # Row of the get_job_employer_info query, None when the offer or its
+        # employer is not in the model (ask the database)
+        with self._lock:
+            offer = self.offers.get(job_offer_id)
+            contact = self.contacts.get(offer.created_by) if offer is not None else None
+        if contact is None:
+            return None
+        place = offer.place
+        return {
+            "JobOfferID": offer.id, "EmployerID": offer.created_by, "FirstName": contact.first_name,
+            "Surname": contact.surname, "Email": contact.email, "PhoneNumber": contact.phone_number,
+            "CompanyID": place.company_id, "CompanyName": place.company_name,
+            "Street": place.street, "Number": place.number, "City": place.city,
+        }
+
+    def compare(self, other):
+        # Differences with another model (a fresh load): offers missing,
+        # extra or different here, contacts and employers that differ
+        with self._lock:
+            mine, theirs = self.offers, other.offers
+            different = [offer_id for offer_id in mine.keys() & theirs.keys()
+                         if mine[offer_id].values() != theirs[offer_id].values()]
+            missing = theirs.keys() - mine.keys()
+            extra = mine.keys() - theirs.keys()
+            contacts = [user_id for user_id in self.contacts.keys() & other.contacts.keys()
+                        if self.contacts[user_id].values() != other.contacts[user_id].values()]
+            employers = len(other.employers - self.employers)
+        return {
+            "offers_missing": len(missing),
+            "offers_extra": len(extra),
+            "offers_different": len(different),
+            "contacts_different": len(contacts),
+            "employers_missing": employers,
+            "sample": sorted([*missing, *extra, *different])[:10],
+        }
+
+    def stats(self):
+        with self._lock:
+            return {
+                "offers": len(self.offers),
+                "open": len(self.open_by_date),
+                "places": len(self.places),
+                "contacts": len(self.contacts),
+                "employers": len(self.employers),
+                "change_id": self.change_id,
+                "built": self.built,
+                "syncs": self.syncs,
+                "applied": self.applied,
+                "interned_values": len(self._values),
+                "drift": self.drift,
+            }
+
+
+_model = None
+_building = False
+_build_started = float('-inf')
+_state_lock = threading.Lock()
+_rebuild_lock = threading.Lock()
+
+
+def rebuild():
+    # Loads a fresh model, compares it with the live one and swaps it in.
+    # Returns the drift found (None on the first build).
+    global _model
+    with _rebuild_lock:
+        conn = get_pool().acquire()
+        try:
+            fresh = ReadModel.load(conn)
+            live = _model
+            if live is None:
+                fresh.sync(conn)
+                _model = fresh
+                return None
+            # Both at the same ChangeLog position; writers wait for the
+            # swap, then sync the new model
+            with live._sync_lock:
+                live.sync(conn)
+                fresh.sync(conn)
+                fresh.drift = dict(live.compare(fresh), checked=time.time())
+                _model = fresh
+        finally:
+            conn.close()
+    if any(value for key, value in fresh.drift.items() if key.startswith(('offers_', 'contacts_', 'employers_'))):
+        metrics.log_event(logging.WARNING, 'read_model_drift', **fresh.drift)
+    return fresh.drift
+
+
+def _start_rebuild():
+    global _building, _build_started
+    with _state_lock:
+        if _building:
+            return
+        _building = True
+        _build_started = time.monotonic()
+
+    def run():
+        global _building
+        try:
+            rebuild()
+        except Error as e:
+            metrics.log_event(logging.ERROR, 'read_model_build_failed', error=str(e))
+        finally:
+            _building = False
+
+    threading.Thread(target=run, name='read-model-build', daemon=True).start()
+
+
+def get_read_model():
+    # The process' model, or None when READ_MODEL is off, the model is
+    # still being built or the client is sticky to the primary after its own
+    # write, which another process' model may not have synced yet (callers
+    # query the database)
+    if not READ_MODEL or sticky_primary():
+        return None
+    model = _model
+    # Without a model (first build failed), retry at the sync pace
+    due = READ_MODEL_REBUILD_INTERVAL if model is not None else READ_MODEL_SYNC_INTERVAL
+    if time.monotonic() - _build_started >= due:
+        _start_rebuild()
+    if model is not None:
+        model.sync_if_due()
+    return model
+
+
+def sync_after_write(conn):
+    # Called by the write routes after their commit, on their connection:
+    # the next read in this process sees the write
+    while True:
+        model = _model
+        if model is None:
+            return
+        with model._sync_lock:
+            if model is not _model:
+                continue  # swapped by a rebuild meanwhile
+            try:
+                model.sync(conn)
+            except Error as e:
+                metrics.log_event(logging.WARNING, 'read_model_sync_failed', error=str(e))
+            return
+
+
+def read_model_stats():
+    model = _model
+    return {
+        "enabled": READ_MODEL,
+        "building": _building,
+        **(model.stats() if model is not None else {}),
+    }
+
+
+def reset_read_model():
+    # Called in forked workers: the build thread did not survive the fork
+    global _model, _building, _build_started
+    _model = None
+    _building = False
+    _build_started = float('-inf')
@@ -0,0 +1,222 @@
+from serialization import fetch_dict, fetch_dicts
+
+# Data access for the employer, company, location and listing routes.
+#
+# Statements run as server-side prepared statements cached with the pooled
+# connection (PooledConnection.prepared): MySQL parses each one once per
+# connection, later calls only send the parameters.
+#
+# The existence checks the routes used to run first are folded into the
+# statement itself, so the common case costs one round trip:
+#   - listings select from a one-row "Known" probe LEFT JOINed with the
+#     rows, which tells an unknown ID (Known = 0) from one without rows (a
+#     single row of NULLs);
+#   - inserts are INSERT ... SELECT guarded by the parent rows, a rowcount of
+#     0 means a parent is missing (the reason is looked up on that failure
+#     path only, like apply_to_job).
+#
+# record_changes() writes the transactional outbox read by feed.py, in the
+# caller's transaction.
+#
+# Functions return plain values and let mysql.connector errors through.
+
+EMPLOYER_JOB_OFFERS_QUERY = """
+    SELECT k.Known, j.JobOfferID, j.LocationID, j.Status, j.Date, j.StartTime, j.EndTime,
+           j.MaxWage, j.WorkingDays, j.Hours, l.Street, l.Number, l.City, c.Name as CompanyName
+    FROM (SELECT EXISTS(SELECT 1 FROM Employer WHERE UserID = %s) as Known) as k
+    LEFT JOIN (JobOffer j
+               JOIN Location l ON j.LocationID = l.LocationID
+               JOIN Company c ON l.CompanyID = c.CompanyID)
+      ON j.CreatedBy = %s {status}
+"""
+
+WORKER_APPLICATIONS_QUERY = """
+    SELECT k.Known, a.JobOfferID, a.WorkerID, a.Status as ApplicationStatus, a.WageOffer,
+           a.Date as ApplicationDate, j.Status as JobStatus, j.Date as JobDate, j.StartTime, j.EndTime,
+           j.MaxWage, j.WorkingDays, j.Hours, l.Street, l.Number, l.City, c.Name as CompanyName
+    FROM (SELECT EXISTS(SELECT 1 FROM Worker WHERE UserID = %s) as Known) as k
+    LEFT JOIN (Application a
+               JOIN JobOffer j ON a.JobOfferID = j.JobOfferID
+               JOIN Location l ON j.LocationID = l.LocationID
+               JOIN Company c ON l.CompanyID = c.CompanyID)
+      ON a.WorkerID = %s {status}
+"""
+
+EMPLOYER_DASHBOARD_QUERY = """
+    SELECT k.Known, j.JobOfferID, j.Status, j.Date, j.MaxWage,
+           IFNULL(s.Applicants, 0) as Applicants,
+           IFNULL(s.Pending, 0) as Pending,
+           IFNULL(s.Accepted, 0) as Accepted,
+           IFNULL(s.Refused, 0) as Refused,
+           ROUND(s.WageOfferSum / s.Applicants, 2) as AvgWageOffer,
+           s.MinWageOffer
+    FROM (SELECT EXISTS(SELECT 1 FROM Employer WHERE UserID = %s) as Known) as k
+    LEFT JOIN (JobOffer j
+               LEFT JOIN ApplicationStats s ON s.JobOfferID = j.JobOfferID)
+      ON j.CreatedBy = %s {status}
+    ORDER BY j.Date DESC, j.JobOfferID DESC
+"""
+
+# Statement texts are the prepared statement cache keys: build each variant once
+STATUS_VARIANTS = {
+    name: {False: query.format(status=''), True: query.format(status=f"AND {column} = %s")}
+    for name, query, column in (
+        ('job_offers', EMPLOYER_JOB_OFFERS_QUERY, 'j.Status'),
+        ('applications', WORKER_APPLICATIONS_QUERY, 'a.Status'),
+        ('dashboard', EMPLOYER_DASHBOARD_QUERY, 'j.Status'),
+    )
+}
+
+EMPLOYER_EXISTS_QUERY = "SELECT EXISTS(SELECT 1 FROM Employer WHERE UserID = %s) as EmployerExists"
+
+CREATE_COMPANY_QUERY = """
+    INSERT INTO Company (CreatedBy, Name)
+    SELECT e.UserID, %s FROM Employer e WHERE e.UserID = %s LIMIT 1
+"""
+
+ADD_EMPLOYER_QUERY = "INSERT INTO Employer (CompanyID, UserID) VALUES (%s, %s)"
+
+JOIN_COMPANY_CHECK_QUERY = """
+    SELECT EXISTS(SELECT 1 FROM Employer WHERE UserID = %s) as EmployerExists,
+           EXISTS(SELECT 1 FROM Company WHERE CompanyID = %s) as CompanyExists,
+           (SELECT Name FROM Company WHERE CompanyID = %s) as CompanyName,
+           EXISTS(SELECT 1 FROM Employer WHERE UserID = %s AND CompanyID = %s) as AlreadyMember
+"""
+
+ADD_LOCATION_QUERY = """
+    INSERT INTO Location (CompanyID, Street, Number, City, Latitude, Longitude)
+    SELECT c.CompanyID, %s, %s, %s, %s, %s FROM Company c WHERE c.CompanyID = %s
+"""
+
+DELETE_LOCATION_CHECK_QUERY = """
+    SELECT EXISTS(SELECT 1 FROM Location WHERE LocationID = %s AND CompanyID = %s) as BelongsToCompany,
+           (SELECT COUNT(*) FROM Location WHERE CompanyID = %s) as CompanyLocations,
+           EXISTS(SELECT 1 FROM JobOffer WHERE LocationID = %s) as HasJobOffers
+"""
+
+DELETE_LOCATION_QUERY = "DELETE FROM Location WHERE LocationID = %s"
+
+# Any location of any company the employer belongs to
+CREATE_JOB_OFFER_QUERY = """
+    INSERT INTO JobOffer (LocationID, CreatedBy, Status, Date, StartTime, EndTime, MaxWage, WorkingDays, Hours)
+    SELECT l.LocationID, e.UserID, 'Open', %s, %s, %s, %s, %s, %s
+    FROM Employer e
+    JOIN Location l ON l.CompanyID = e.CompanyID
+    WHERE e.UserID = %s AND l.LocationID = %s
+    LIMIT 1
+"""
+
+RECORD_CHANGE_QUERY = "INSERT INTO ChangeLog (Kind, JobOfferID, WorkerID, Status) VALUES (%s, %s, %s, %s)"
+
+# Applications an acceptance refuses along with it, locked until the commit
+PENDING_APPLICATIONS_QUERY = """
+    SELECT JobOfferID, WorkerID FROM Application
+    WHERE JobOfferID IN ({job_offers}) AND Status = 'Pending'
+    FOR UPDATE
+"""
+
+
+def execute(conn, statement, params):
+    cursor = conn.prepared(statement)
+    cursor.execute(statement, params)
+    return cursor
+
+
+def fetch_known(cursor, key):
+    # (known, rows) from a statement selecting k.Known LEFT JOIN rows: the
+    # NULL row standing for "no rows" is dropped
+    rows = fetch_dicts(cursor)
+    known = bool(rows and rows[0]['Known'])
+    for row in rows:
+        del row['Known']
+    return known, [row for row in rows if row[key] is not None]
+
+
+def employer_job_offers(conn, employer_id, status=None):
+    # (employer exists, job offers created by the employer)
+    statement = STATUS_VARIANTS['job_offers'][bool(status)]
+    params = (employer_id, employer_id, status) if status else (employer_id, employer_id)
+    return fetch_known(execute(conn, statement, params), 'JobOfferID')
+
+
+def worker_applications(conn, worker_id, status=None):
+    # (worker exists, applications of the worker with their offer)
+    statement = STATUS_VARIANTS['applications'][bool(status)]
+    params = (worker_id, worker_id, status) if status else (worker_id, worker_id)
+    return fetch_known(execute(conn, statement, params), 'JobOfferID')
+
+
+def employer_dashboard(conn, employer_id, status=None):
+    # (employer exists, ApplicationStats of each of the employer's offers)
+    statement = STATUS_VARIANTS['dashboard'][bool(status)]
+    params = (employer_id, employer_id, status) if status else (employer_id, employer_id)
+    return fetch_known(execute(conn, statement, params), 'JobOfferID')
+
+
+def employer_exists(conn, employer_id):
+    return bool(fetch_dict(execute(conn, EMPLOYER_EXISTS_QUERY, (employer_id,)))['EmployerExists'])
+
+
+def create_company(conn, employer_id, name):
+    # New CompanyID, None when employer_id is not an employer. The caller
+    # owns the transaction covering both rows.
+    cursor = execute(conn, CREATE_COMPANY_QUERY, (name, employer_id))
+    if cursor.rowcount == 0:
+        return None
+    company_id = cursor.lastrowid
+    execute(conn, ADD_EMPLOYER_QUERY, (company_id, employer_id))
+    return company_id
+
+
+def join_company_check(conn, employer_id, company_id):
+    # EmployerExists, CompanyExists, CompanyName and AlreadyMember in one row
+    params = (employer_id, company_id, company_id, employer_id, company_id)
+    return fetch_dict(execute(conn, JOIN_COMPANY_CHECK_QUERY, params))
+
+
+def add_employer(conn, company_id, employer_id):
+    execute(conn, ADD_EMPLOYER_QUERY, (company_id, employer_id))
+
+
+def add_location(conn, company_id, street, number, city, latitude=None, longitude=None):
+    # New LocationID, None when the company does not exist
+    cursor = execute(conn, ADD_LOCATION_QUERY, (street, number, city, latitude, longitude, company_id))
+    return cursor.lastrowid if cursor.rowcount else None
+
+
+def delete_location_check(conn, location_id, company_id):
+    # BelongsToCompany, CompanyLocations and HasJobOffers in one row
+    params = (location_id, company_id, company_id, location_id)
+    return fetch_dict(execute(conn, DELETE_LOCATION_CHECK_QUERY, params))
+
+
+def delete_location(conn, location_id):
+    execute(conn, DELETE_LOCATION_QUERY, (location_id,))
+
+
+def create_job_offer(conn, employer_id, location_id, date, start_time, end_time, max_wage, working_days, hours):
+    # New JobOfferID, None when the location is not one of the employer's
+    # companies (employer_exists() tells why, on that failure path only)
+    params = (date, start_time, end_time, max_wage, working_days, hours, employer_id, location_id)
+    cursor = execute(conn, CREATE_JOB_OFFER_QUERY, params)
+    return cursor.lastrowid if cursor.rowcount else None
+
+
+def pending_applications(conn, job_offer_ids):
+    # [(JobOfferID, WorkerID)] still pending for these offers
+    cursor = conn.cursor()
+    cursor.execute(PENDING_APPLICATIONS_QUERY.format(job_offers=', '.join(['%s'] * len(job_offer_ids))),
+                   list(job_offer_ids))
+    rows = cursor.fetchall()
+    cursor.close()
+    return [tuple(row) for row in rows]
+
+
+def record_changes(conn, changes):
+    # changes: (kind, job_offer_id, worker_id or None, status), kind being
+    # 'job_offer' or 'application'; one multi-row INSERT, call it inside the
+    # transaction of the change so both commit or roll back together
+    if changes:
+        cursor = conn.cursor()
+        cursor.executemany(RECORD_CHANGE_QUERY, changes)
+        cursor.close()
@@ -0,0 +1,110 @@
+import re
+from html import escape
+
+# Full-text search over worker profiles and open job offers, backed by the
+# FULLTEXT indexes of sql_queries/migrations/005_fulltext_search.sql.
+#
+# Ranking is MySQL's natural language relevance (MATCH ... AGAINST), so the
+# usual InnoDB rules apply: words shorter than innodb_ft_min_token_size (3)
+# and stopwords are ignored. Highlights are computed here on the returned page
+# only, never on the whole table.
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+SNIPPET_WIDTH = 80
+
+WORKER_SEARCH_QUERY = """
+    SELECT U.UserID, U.FirstName, U.Surname, U.Name, U.Email, U.PhoneNumber, W.Experiences, W.Description,
+           MATCH(W.Experiences, W.Description) AGAINST (%s IN NATURAL LANGUAGE MODE) as Score
+    FROM Worker as W, User as U
+    WHERE U.UserID = W.UserID
+      AND MATCH(W.Experiences, W.Description) AGAINST (%s IN NATURAL LANGUAGE MODE)
+    ORDER BY Score DESC, U.UserID ASC
+    LIMIT %s OFFSET %s
+"""
+
+# JobOffer has no text column: offers are found through the name of their
+# company and the address of their location. MATCH() ORed across two tables
+# cannot use either FULLTEXT index, so each index is searched on its own and
+# the matching locations are merged (UNION ALL); a location matching both
+# scores the sum, then its open offers are joined.
+JOB_OFFER_SEARCH_QUERY = """
+    SELECT J.JobOfferID, J.LocationID, J.Date, J.StartTime, J.EndTime, J.MaxWage, J.WorkingDays, J.Hours,
+           L.Street, L.Number, L.City, C.Name as CompanyName, M.Score
+    FROM (
+        SELECT Hits.LocationID, SUM(Hits.Score) as Score
+        FROM (
+            SELECT L.LocationID, MATCH(C.Name) AGAINST (%s IN NATURAL LANGUAGE MODE) as Score
+            FROM Company as C, Location as L
+            WHERE L.CompanyID = C.CompanyID
+              AND MATCH(C.Name) AGAINST (%s IN NATURAL LANGUAGE MODE)
+            UNION ALL
+            SELECT L.LocationID, MATCH(L.Street, L.City) AGAINST (%s IN NATURAL LANGUAGE MODE) as Score
+            FROM Location as L
+            WHERE MATCH(L.Street, L.City) AGAINST (%s IN NATURAL LANGUAGE MODE)
+        ) as Hits
+        GROUP BY Hits.LocationID
+    ) as M, JobOffer as J, Location as L, Company as C
+    WHERE J.LocationID = M.LocationID
+      AND L.LocationID = M.LocationID
+      AND L.CompanyID = C.CompanyID
+      AND J.Status = 'Open'
+    ORDER BY M.Score DESC, J.JobOfferID ASC
+    LIMIT %s OFFSET %s
+"""
+
+
+def parse_search_args(args):
+    # Returns (q, limit, offset); raises ValueError with a client-facing message
+    q = (args.get('q') or '').strip()
+    if not q:
+        raise ValueError("Missing search query: ?q=")
+    try:
+        limit = int(args.get('limit', DEFAULT_SEARCH_LIMIT))
+        offset = int(args.get('offset', 0))
+    except ValueError:
+        raise ValueError("limit and offset must be integers")
+    if not 1 <= limit <= MAX_SEARCH_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+    if offset < 0:
+        raise ValueError("offset must be positive")
+    return q, limit, offset
+
+
+def terms_pattern(q):
+    terms = sorted({t for t in re.findall(r'\w+', q.lower()) if len(t) >= 3}, key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile(r'\b(' + '|'.join(map(re.escape, terms)) + r')', re.IGNORECASE)
+
+
+def highlight(text, pattern, width=SNIPPET_WIDTH):
+    # Snippet of text around the first match, matches wrapped in <mark>
+    if not text or pattern is None:
+        return None
+    first = pattern.search(text)
+    if not first:
+        return None
+    start = max(0, first.start() - width // 2)
+    end = min(len(text), start + width)
+    # Escaped, so the snippet can be rendered as HTML as is
+    snippet, last = [], start
+    for match in pattern.finditer(text, start, end):
+        snippet.append(escape(text[last:match.start()]))
+        snippet.append(f"<mark>{escape(match.group())}</mark>")
+        last = match.end()
+    snippet.append(escape(text[last:end]))
+    snippet = ''.join(snippet)
+    return ('...' if start > 0 else '') + snippet + ('...' if end < len(text) else '')
+
+
+def add_highlights(rows, q, columns):
+    pattern = terms_pattern(q)
+    for row in rows:
+        highlights = {}
+        for column in columns:
+            snippet = highlight(row[column], pattern)
+            if snippet is not None:
+                highlights[column] = snippet
+        row['Highlights'] = highlights
+    return rows
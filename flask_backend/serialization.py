@@ -0,0 +1,88 @@
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency, falls back to the json module
+    orjson = None
+
+# Single JSON layer for every route: MySQL DATE, TIME (timedelta) and DECIMAL
+# values are encoded while the payload is serialized, no per-row rewriting.
+
+
+@lru_cache(maxsize=4096)
+def format_timedelta(value):
+    # MySQL TIME columns come back as timedelta, encoded as HH:MM:SS
+    total_seconds = int(value.total_seconds())
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    seconds = total_seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+# Exact-type dispatch first: one dict lookup per value on the hot path
+_ENCODERS = {
+    timedelta: format_timedelta,
+    Decimal: str,  # same as Flask's default provider: keeps the exact value
+    date: date.isoformat,
+    datetime: datetime.isoformat,
+}
+
+
+def default(obj):
+    encoder = _ENCODERS.get(type(obj))
+    if encoder is not None:
+        return encoder(obj)
+    if isinstance(obj, timedelta):
+        return format_timedelta(obj)
+    if isinstance(obj, (date, datetime)):
+        # orjson encodes these natively with the same ISO format
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj):
+        return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+else:
+    def dumps_bytes(obj):
+        return json.dumps(obj, default=default, sort_keys=True, separators=(',', ':')).encode()
+
+
+def dumps(obj):
+    return dumps_bytes(obj).decode()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        return dumps(obj)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def fetch_dicts(cursor):
+    # Rows from a plain (tuple) cursor, keyed by column name
+    columns = cursor.column_names
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def fetch_dict(cursor):
+    # The row of a single-row statement, None when there is none. Reads the
+    # whole result: a prepared cursor left after fetchone() would fail the
+    # next statement of the connection (unread result)
+    rows = fetch_dicts(cursor)
+    return rows[0] if rows else None
+
+
+def init_app(app):
+    app.json = FastJSONProvider(app)
@@ -0,0 +1,83 @@
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Production entry point: runs app.py under gunicorn with several worker
+# processes, each serving requests on a thread pool (`python app.py` is the
+# single-process debug server, for development only).
+#
+#   python serve.py --workers 4 --threads 8 --bind 0.0.0.0:4000
+#
+# Every option falls back to an environment variable (see .env.example).
+# On Windows, where gunicorn does not run, waitress serves the app with
+# --threads threads in a single process.
+
+load_dotenv()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Job2main API")
+    parser.add_argument('--bind', default=os.getenv('SERVE_BIND', '0.0.0.0:4000'))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('SERVE_WORKERS', os.cpu_count() or 1)),
+                        help="worker processes (default: one per core)")
+    parser.add_argument('--threads', type=int, default=int(os.getenv('SERVE_THREADS', 8)),
+                        help="request threads per worker, keep DB_POOL_SIZE >= threads")
+    parser.add_argument('--keepalive', type=int, default=int(os.getenv('SERVE_KEEPALIVE', 5)),
+                        help="seconds to keep idle client connections open")
+    parser.add_argument('--timeout', type=int, default=int(os.getenv('SERVE_TIMEOUT', 30)),
+                        help="seconds before a stuck worker is restarted")
+    parser.add_argument('--graceful-timeout', type=int, default=int(os.getenv('SERVE_GRACEFUL_TIMEOUT', 30)),
+                        help="seconds in-flight requests get to finish on shutdown (SIGTERM)")
+    return parser.parse_args(argv)
+
+
+def post_fork(server, worker):
+    # Connections, pool locks, cache state and the read model must not be shared with the
+    # parent process: every worker builds its own lazily on first use
+    import db
+    import cache
+    import read_model
+    db.reset_pool()
+    cache.reset_cache()
+    read_model.reset_read_model()
+
+
+def serve_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+    from app import app
+
+    class Job2mainApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', args.bind)
+            self.cfg.set('workers', args.workers)
+            self.cfg.set('threads', args.threads)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('keepalive', args.keepalive)
+            self.cfg.set('timeout', args.timeout)
+            self.cfg.set('graceful_timeout', args.graceful_timeout)
+            self.cfg.set('post_fork', post_fork)
+            self.cfg.set('accesslog', os.getenv('SERVE_ACCESS_LOG'))
+
+        def load(self):
+            return app
+
+    Job2mainApplication().run()
+
+
+def serve_waitress(args):
+    from waitress import serve
+    from app import app
+
+    host, port = args.bind.rsplit(':', 1)
+    serve(app, host=host, port=int(port), threads=args.threads,
+          channel_timeout=args.keepalive)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if sys.platform == 'win32':
+        serve_waitress(args)
+    else:
+        serve_gunicorn(args)
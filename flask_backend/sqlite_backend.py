@@ -0,0 +1,191 @@
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+
+from mysql.connector import Error, IntegrityError, errorcode
+
+# SQLite stand-in for MySQL, selected with DB_BACKEND=sqlite and
+# DB_SQLITE_PATH. It exists so benchmarks/harness.py can run where no MySQL
+# server is available: connections mimic the parts of mysql-connector the
+# core routes use (%s parameters, dictionary cursors, column_names,
+# start_transaction, MySQL error classes).
+#
+# It covers browsing, applying, listing applications and application
+# decisions. MySQL-only features (FULLTEXT search, ST_Distance_Sphere, the
+# ApplicationStats triggers) are not emulated, and numbers are not
+# comparable with MySQL ones: compare SQLite runs with SQLite runs.
+
+# create.sql plus the keys and indexes of sql_queries/migrations/
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS User (
+    UserID INTEGER PRIMARY KEY, FirstName TEXT, Surname TEXT, Name TEXT, Email TEXT, PhoneNumber TEXT
+);
+CREATE TABLE IF NOT EXISTS Company (
+    CompanyID INTEGER PRIMARY KEY AUTOINCREMENT, CreatedBy INTEGER, Name TEXT
+);
+CREATE TABLE IF NOT EXISTS Employer (
+    CompanyID INTEGER REFERENCES Company(CompanyID), UserID INTEGER REFERENCES User(UserID),
+    UNIQUE (UserID, CompanyID)
+);
+CREATE TABLE IF NOT EXISTS Worker (
+    UserID INTEGER PRIMARY KEY REFERENCES User(UserID), Experiences TEXT, Description TEXT
+);
+CREATE TABLE IF NOT EXISTS Location (
+    LocationID INTEGER PRIMARY KEY AUTOINCREMENT, CompanyID INTEGER REFERENCES Company(CompanyID),
+    Number TEXT, Street TEXT, City TEXT, Latitude DECIMAL(9, 6), Longitude DECIMAL(9, 6)
+);
+CREATE TABLE IF NOT EXISTS JobOffer (
+    JobOfferID INTEGER PRIMARY KEY AUTOINCREMENT, LocationID INTEGER REFERENCES Location(LocationID),
+    CreatedBy INTEGER, Status TEXT NOT NULL CHECK (Status IN ('Open', 'Confirmed', 'Running', 'Completed')),
+    Date DATE, StartTime TIME, EndTime TIME, MaxWage DECIMAL(10, 2), WorkingDays INTEGER, Hours INTEGER
+);
+CREATE TABLE IF NOT EXISTS Application (
+    WorkerID INTEGER REFERENCES Worker(UserID), JobOfferID INTEGER REFERENCES JobOffer(JobOfferID),
+    Status TEXT NOT NULL CHECK (Status IN ('Pending', 'Refused', 'Accepted')),
+    Date DATE, WageOffer DECIMAL(10, 2),
+    PRIMARY KEY (JobOfferID, WorkerID)
+);
+CREATE TABLE IF NOT EXISTS ChangeLog (
+    ChangeID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Kind TEXT NOT NULL CHECK (Kind IN ('job_offer', 'application')),
+    JobOfferID INTEGER NOT NULL, WorkerID INTEGER, Status TEXT NOT NULL,
+    CreatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_joboffer_status_date ON JobOffer (Status, Date, JobOfferID);
+CREATE INDEX IF NOT EXISTS idx_joboffer_createdby_status ON JobOffer (CreatedBy, Status);
+CREATE INDEX IF NOT EXISTS idx_application_worker_status ON Application (WorkerID, Status);
+CREATE INDEX IF NOT EXISTS idx_location_company ON Location (CompanyID, LocationID);
+CREATE INDEX IF NOT EXISTS idx_joboffer_status_wage ON JobOffer (Status, MaxWage, JobOfferID);
+CREATE INDEX IF NOT EXISTS idx_location_city ON Location (City, LocationID);
+"""
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+
+_schema_lock = threading.Lock()
+
+
+def translate(operation):
+    # MySQL placeholders and row locks; SQLite locks the whole database
+    # from BEGIN IMMEDIATE on, which is stricter than FOR UPDATE
+    return re.sub(r'\s+FOR\s+UPDATE\b', '', operation.replace('%s', '?'), flags=re.IGNORECASE)
+
+
+def translate_error(e):
+    if isinstance(e, sqlite3.IntegrityError):
+        errno = errorcode.ER_DUP_ENTRY if 'UNIQUE' in str(e) else errorcode.ER_NO_REFERENCED_ROW_2
+        return IntegrityError(msg=str(e), errno=errno)
+    return Error(msg=str(e))
+
+
+class Cursor:
+    def __init__(self, connection, dictionary=False):
+        self._cursor = connection.cursor()
+        self.dictionary = dictionary
+
+    @property
+    def column_names(self):
+        return tuple(column[0] for column in self._cursor.description or ())
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        # SQLite reports the last row of a multi-row INSERT, MySQL the first
+        # (a statement's AUTOINCREMENT IDs are consecutive here)
+        if self._cursor.lastrowid and self._cursor.rowcount > 1:
+            return self._cursor.lastrowid - self._cursor.rowcount + 1
+        return self._cursor.lastrowid
+
+    def _row(self, row):
+        if row is None or not self.dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    def execute(self, operation, params=None):
+        try:
+            self._cursor.execute(translate(operation), tuple(params or ()))
+        except sqlite3.Error as e:
+            raise translate_error(e)
+
+    def executemany(self, operation, seq_params):
+        try:
+            self._cursor.executemany(translate(operation), [tuple(params) for params in seq_params])
+        except sqlite3.Error as e:
+            raise translate_error(e)
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return (self._row(row) for row in self._cursor)
+
+    def close(self):
+        self._cursor.close()
+
+
+class Connection:
+    def __init__(self, database, autocommit=True):
+        # Autocommit mode (isolation_level=None): a statement outside
+        # start_transaction() commits on its own, like the MySQL pool
+        self._connection = sqlite3.connect(database, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self.autocommit = autocommit
+
+    @property
+    def in_transaction(self):
+        return self._connection.in_transaction
+
+    def cursor(self, dictionary=False, **kwargs):
+        return Cursor(self._connection, dictionary=dictionary)
+
+    def start_transaction(self, consistent_snapshot=False):
+        # BEGIN IMMEDIATE already serializes writers, consistent_snapshot is
+        # accepted for mysql-connector's signature
+        self._connection.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        if self._connection.in_transaction:
+            self._connection.execute("COMMIT")
+
+    def rollback(self):
+        if self._connection.in_transaction:
+            self._connection.execute("ROLLBACK")
+
+    def ping(self, reconnect=False):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self._connection.close()
+
+
+def connect(database, autocommit=True, **ignored):
+    # Same signature as mysql.connector.connect for ConnectionPool; host,
+    # user... are ignored
+    return Connection(database, autocommit=autocommit)
+
+
+def create_schema(database):
+    with _schema_lock:
+        conn = sqlite3.connect(database)
+        conn.executescript(SCHEMA)
+        conn.close()
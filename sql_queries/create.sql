@@ -4,6 +4,9 @@ CREATE DATABASE IF NOT EXISTS Job2main
 
 USE Job2main;
 
+-- Baseline schema. Keys and indexes added later live in migrations/,
+-- apply them with: python sql_queries/migrate.py
+
 -- Table: User
 CREATE TABLE IF NOT EXISTS User (
     UserID INT PRIMARY KEY,
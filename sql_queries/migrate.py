@@ -0,0 +1,330 @@
+import argparse
+import os
+import re
+
+import mysql.connector
+
+# Applies sql_queries/migrations/NNN_*.sql in order, once each.
+# Applied versions are recorded in the SchemaMigration table, so running the
+# script again only applies what is new.
+#
+#   python sql_queries/migrate.py             apply pending migrations
+#   python sql_queries/migrate.py --status    list applied / pending migrations
+#   python sql_queries/migrate.py --explain   also print EXPLAIN plans of the
+#                                             route queries before and after
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Queries issued by flask_backend/app.py, with representative parameters
+ROUTE_QUERIES = [
+    ("get_available_jobs", """
+        SELECT J.JobOfferID, J.LocationID, J.Date, J.StartTime, J.EndTime, J.MaxWage, J.WorkingDays, J.Hours, L.Street, L.Number, L.City, C.Name as CompanyName
+        FROM JobOffer as J, Location as L, Company as C
+        WHERE J.LocationID = L.LocationID
+          AND L.CompanyID = C.CompanyID
+          AND J.Status = 'Open'
+          AND (J.Date > %s OR (J.Date = %s AND J.JobOfferID > %s))
+        ORDER BY J.Date ASC, J.JobOfferID ASC
+        LIMIT %s
+    """, ('2024-01-01', '2024-01-01', 0, 101)),
+    ("get_available_jobs (city, sort=-max_wage)", """
+        SELECT J.JobOfferID, J.MaxWage, L.City
+        FROM JobOffer as J JOIN Location as L ON J.LocationID = L.LocationID
+        WHERE J.Status = 'Open'
+          AND L.City = %s
+          AND J.MaxWage >= %s
+        ORDER BY J.MaxWage DESC, J.JobOfferID DESC
+        LIMIT %s
+    """, ('Paris', 15, 101)),
+    ("get_available_jobs (sort=max_wage, projection)", """
+        SELECT J.JobOfferID, J.Date, J.MaxWage
+        FROM JobOffer as J
+        WHERE J.Status = 'Open'
+          AND (J.MaxWage > %s OR (J.MaxWage = %s AND J.JobOfferID > %s))
+        ORDER BY J.MaxWage ASC, J.JobOfferID ASC
+        LIMIT %s
+    """, (15, 15, 0, 101)),
+    ("get_my_job_offers", """
+        SELECT k.Known, j.JobOfferID, j.LocationID, j.Status, j.Date, j.StartTime, j.EndTime,
+               j.MaxWage, j.WorkingDays, j.Hours, l.Street, l.Number, l.City, c.Name as CompanyName
+        FROM (SELECT EXISTS(SELECT 1 FROM Employer WHERE UserID = %s) as Known) as k
+        LEFT JOIN (JobOffer j
+                   JOIN Location l ON j.LocationID = l.LocationID
+                   JOIN Company c ON l.CompanyID = c.CompanyID)
+          ON j.CreatedBy = %s AND j.Status = %s
+    """, (1, 1, 'Open')),
+    ("get_employer_dashboard", """
+        SELECT k.Known, j.JobOfferID, j.Status, j.Date, j.MaxWage,
+               IFNULL(s.Applicants, 0), s.WageOfferSum / s.Applicants as AvgWageOffer, s.MinWageOffer
+        FROM (SELECT EXISTS(SELECT 1 FROM Employer WHERE UserID = %s) as Known) as k
+        LEFT JOIN (JobOffer j
+                   LEFT JOIN ApplicationStats s ON s.JobOfferID = j.JobOfferID)
+          ON j.CreatedBy = %s
+        ORDER BY j.Date DESC, j.JobOfferID DESC
+    """, (1, 1)),
+    ("get_my_applications", """
+        SELECT k.Known, a.JobOfferID, a.WorkerID, a.Status as ApplicationStatus, a.WageOffer,
+               a.Date as ApplicationDate, j.Status as JobStatus, j.Date as JobDate,
+               j.StartTime, j.EndTime, j.MaxWage, j.WorkingDays, j.Hours,
+               l.Street, l.Number, l.City, c.Name as CompanyName
+        FROM (SELECT EXISTS(SELECT 1 FROM Worker WHERE UserID = %s) as Known) as k
+        LEFT JOIN (Application a
+                   JOIN JobOffer j ON a.JobOfferID = j.JobOfferID
+                   JOIN Location l ON j.LocationID = l.LocationID
+                   JOIN Company c ON l.CompanyID = c.CompanyID)
+          ON a.WorkerID = %s AND a.Status = %s
+    """, (1, 1, 'Pending')),
+    ("get_job_employer_info", """
+        SELECT j.JobOfferID, j.CreatedBy as EmployerID, u.FirstName, u.Surname, u.Email,
+               u.PhoneNumber, c.CompanyID, c.Name as CompanyName, l.Street, l.Number, l.City
+        FROM JobOffer j, User u, Location l, Company c
+        WHERE j.CreatedBy = u.UserID
+          AND j.LocationID = l.LocationID
+          AND l.CompanyID = c.CompanyID
+          AND j.JobOfferID = %s
+    """, (1,)),
+    ("get_all_workers", """
+        SELECT U.UserID, U.FirstName, U.Surname, U.Name, U.Email, U.PhoneNumber, W.Experiences, W.Description
+        FROM User as U, Worker as W
+        WHERE U.UserID = W.UserID
+    """, ()),
+    ("get_nearby_jobs", """
+        SELECT J.JobOfferID, L.LocationID,
+               ST_Distance_Sphere(L.Position, POINT(%s, %s)) / 1000 as DistanceKm
+        FROM Location as L
+        JOIN JobOffer as J ON J.LocationID = L.LocationID
+        WHERE MBRCovers(ST_MakeEnvelope(POINT(%s, %s), POINT(%s, %s)), L.Position)
+          AND J.Status = 'Open'
+        HAVING DistanceKm <= %s
+        ORDER BY DistanceKm ASC, J.JobOfferID ASC
+        LIMIT %s
+    """, (28.9784, 41.0082, 28.86, 40.92, 29.10, 41.10, 10, 20)),
+    ("search_workers", """
+        SELECT U.UserID, MATCH(W.Experiences, W.Description) AGAINST (%s IN NATURAL LANGUAGE MODE) as Score
+        FROM Worker as W, User as U
+        WHERE U.UserID = W.UserID
+          AND MATCH(W.Experiences, W.Description) AGAINST (%s IN NATURAL LANGUAGE MODE)
+        ORDER BY Score DESC, U.UserID ASC
+        LIMIT %s
+    """, ('cook', 'cook', 21)),
+    ("search_job_offers", """
+        SELECT J.JobOfferID, M.Score
+        FROM (
+            SELECT Hits.LocationID, SUM(Hits.Score) as Score
+            FROM (
+                SELECT L.LocationID, MATCH(C.Name) AGAINST (%s IN NATURAL LANGUAGE MODE) as Score
+                FROM Company as C, Location as L
+                WHERE L.CompanyID = C.CompanyID
+                  AND MATCH(C.Name) AGAINST (%s IN NATURAL LANGUAGE MODE)
+                UNION ALL
+                SELECT L.LocationID, MATCH(L.Street, L.City) AGAINST (%s IN NATURAL LANGUAGE MODE) as Score
+                FROM Location as L
+                WHERE MATCH(L.Street, L.City) AGAINST (%s IN NATURAL LANGUAGE MODE)
+            ) as Hits
+            GROUP BY Hits.LocationID
+        ) as M, JobOffer as J, Location as L, Company as C
+        WHERE J.LocationID = M.LocationID
+          AND L.LocationID = M.LocationID
+          AND L.CompanyID = C.CompanyID
+          AND J.Status = 'Open'
+        ORDER BY M.Score DESC, J.JobOfferID ASC
+        LIMIT %s
+    """, ('istanbul', 'istanbul', 'istanbul', 'istanbul', 21)),
+    ("apply_to_job", """
+        INSERT INTO Application (JobOfferID, WorkerID, Status, WageOffer, Date)
+        SELECT j.JobOfferID, w.UserID, 'Pending', %s, %s
+        FROM JobOffer j, Worker w
+        WHERE j.JobOfferID = %s
+          AND w.UserID = %s
+          AND j.Status = 'Open'
+          AND j.MaxWage >= %s
+    """, (20, '2025-01-01', 1, 1, 20)),
+    ("update_application_status", """
+        SELECT a.JobOfferID, a.WorkerID, a.Status, j.Status as JobStatus
+        FROM Application a, JobOffer j
+        WHERE a.JobOfferID = j.JobOfferID
+          AND a.JobOfferID = %s AND a.WorkerID = %s
+    """, (1, 1)),
+    ("update_application_status (refuse others)", """
+        SELECT WorkerID FROM Application
+        WHERE JobOfferID = %s AND WorkerID != %s AND Status = 'Pending'
+    """, (1, 1)),
+    ("join_company", """
+        SELECT EXISTS(SELECT 1 FROM Employer WHERE UserID = %s) as EmployerExists,
+               EXISTS(SELECT 1 FROM Company WHERE CompanyID = %s) as CompanyExists,
+               (SELECT Name FROM Company WHERE CompanyID = %s) as CompanyName,
+               EXISTS(SELECT 1 FROM Employer WHERE UserID = %s AND CompanyID = %s) as AlreadyMember
+    """, (1, 1, 1, 1, 1)),
+    ("delete_location", """
+        SELECT EXISTS(SELECT 1 FROM Location WHERE LocationID = %s AND CompanyID = %s) as BelongsToCompany,
+               (SELECT COUNT(*) FROM Location WHERE CompanyID = %s) as CompanyLocations,
+               EXISTS(SELECT 1 FROM JobOffer WHERE LocationID = %s) as HasJobOffers
+    """, (1, 1, 1, 1)),
+    ("create_job_offer", """
+        INSERT INTO JobOffer (LocationID, CreatedBy, Status, Date, StartTime, EndTime, MaxWage, WorkingDays, Hours)
+        SELECT l.LocationID, e.UserID, 'Open', %s, %s, %s, %s, %s, %s
+        FROM Employer e
+        JOIN Location l ON l.CompanyID = e.CompanyID
+        WHERE e.UserID = %s AND l.LocationID = %s
+        LIMIT 1
+    """, ('2025-01-01', '08:00:00', '16:00:00', 20, 5, 8, 1, 1)),
+    ("change feed poll (async_app)", """
+        SELECT c.ChangeID, c.Kind, c.JobOfferID, c.WorkerID, c.Status, c.CreatedAt,
+               j.LocationID, j.Date, j.StartTime, j.EndTime, j.MaxWage, j.WorkingDays, j.Hours,
+               l.Street, l.Number, l.City, co.Name as CompanyName
+        FROM ChangeLog c
+        LEFT JOIN JobOffer j ON c.Kind = 'job_offer' AND j.JobOfferID = c.JobOfferID
+        LEFT JOIN Location l ON l.LocationID = j.LocationID
+        LEFT JOIN Company co ON co.CompanyID = l.CompanyID
+        WHERE c.ChangeID > %s AND c.ChangeID <= %s
+        ORDER BY c.ChangeID
+        LIMIT %s
+    """, (0, 2 ** 63 - 1, 1000)),
+]
+
+
+def get_db_connection():
+    return mysql.connector.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        # password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME', 'Job2main')
+    )
+
+
+def list_migrations():
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = re.match(r'^(\d+)_.*\.sql$', filename)
+        if match:
+            migrations.append((int(match.group(1)), filename))
+    return migrations
+
+
+def split_statements(sql):
+    # Migrations hold plain DDL, so splitting on ';' is enough
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [stmt.strip() for stmt in '\n'.join(lines).split(';') if stmt.strip()]
+
+
+def applied_versions(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS SchemaMigration (
+            Version INT PRIMARY KEY,
+            Name VARCHAR(255),
+            AppliedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # Statements of a migration that went through, while it is not complete
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS SchemaMigrationStep (
+            Version INT,
+            Step INT,
+            AppliedAt DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (Version, Step)
+        )
+    """)
+    cursor.execute("SELECT Version FROM SchemaMigration")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def applied_steps(cursor):
+    # version -> numbers (from 1) of its statements already applied
+    cursor.execute("SELECT Version, Step FROM SchemaMigrationStep")
+    steps = {}
+    for version, step in cursor.fetchall():
+        steps.setdefault(version, set()).add(step)
+    return steps
+
+
+def apply_migrations(conn, dry_run=False):
+    cursor = conn.cursor()
+    done = applied_versions(cursor)
+    steps = applied_steps(cursor)
+    pending = [(v, f) for v, f in list_migrations() if v not in done]
+
+    if not pending:
+        print("Schema is up to date.")
+    for version, filename in pending:
+        print(f"Applying {filename}...")
+        with open(os.path.join(MIGRATIONS_DIR, filename)) as f:
+            statements = split_statements(f.read())
+        if dry_run:
+            for stmt in statements:
+                print(f"  {stmt};")
+            continue
+        # DDL commits implicitly in MySQL, so a file cannot be applied as a
+        # whole: each statement is recorded once it went through, and a
+        # migration that failed halfway resumes at the failed statement.
+        # Applied files must not be edited, steps are counted by position.
+        done_steps = steps.get(version, set())
+        if done_steps:
+            print(f"  resuming: {len(done_steps)} of {len(statements)} statements already applied")
+        for step, stmt in enumerate(statements, 1):
+            if step in done_steps:
+                continue
+            cursor.execute(stmt)
+            cursor.execute(
+                "INSERT INTO SchemaMigrationStep (Version, Step) VALUES (%s, %s)",
+                (version, step)
+            )
+            conn.commit()
+        cursor.execute(
+            "INSERT INTO SchemaMigration (Version, Name) VALUES (%s, %s)",
+            (version, filename)
+        )
+        cursor.execute("DELETE FROM SchemaMigrationStep WHERE Version = %s", (version,))
+        conn.commit()
+
+    cursor.close()
+
+
+def print_status(conn):
+    cursor = conn.cursor()
+    done = applied_versions(cursor)
+    steps = applied_steps(cursor)
+    for version, filename in list_migrations():
+        if version in done:
+            print(f"  [x] {filename}")
+        elif version in steps:
+            print(f"  [~] {filename} ({len(steps[version])} statements applied, failed after)")
+        else:
+            print(f"  [ ] {filename}")
+    cursor.close()
+
+
+def explain_routes(conn, label):
+    print(f"\n===== EXPLAIN ({label}) =====")
+    cursor = conn.cursor(dictionary=True)
+    for name, query, params in ROUTE_QUERIES:
+        print(f"\n-- {name}")
+        try:
+            cursor.execute("EXPLAIN " + query, params)
+        except mysql.connector.Error as e:
+            # e.g. MATCH() before its FULLTEXT index exists
+            print(f"  {e.msg}")
+            continue
+        print(f"  {'table':<12} {'type':<8} {'key':<32} {'rows':>8}  Extra")
+        for row in cursor.fetchall():
+            print(f"  {str(row['table']):<12} {str(row['type']):<8} "
+                  f"{str(row['key']):<32} {str(row['rows']):>8}  {row['Extra'] or ''}")
+    cursor.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Apply schema migrations to the Job2main database")
+    parser.add_argument('--status', action='store_true', help="list applied and pending migrations")
+    parser.add_argument('--dry-run', action='store_true', help="print pending statements without running them")
+    parser.add_argument('--explain', action='store_true', help="EXPLAIN every route query before and after")
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    if args.status:
+        print_status(conn)
+    else:
+        if args.explain:
+            explain_routes(conn, "before")
+        apply_migrations(conn, dry_run=args.dry_run)
+        if args.explain and not args.dry_run:
+            explain_routes(conn, "after")
+    conn.close()
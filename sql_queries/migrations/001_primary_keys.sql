@@ -0,0 +1,16 @@
+-- Primary / unique keys missing from create.sql
+
+-- Table: Worker
+ALTER TABLE Worker
+    ADD PRIMARY KEY (UserID);
+
+-- Table: Application
+-- One application per worker and job offer (apply_to_job relies on it)
+ALTER TABLE Application
+    ADD PRIMARY KEY (JobOfferID, WorkerID);
+
+-- Table: Employer
+-- CompanyID becomes NULL when an employer quits a company, so it cannot be
+-- part of a primary key. A unique key still allows several NULL rows.
+ALTER TABLE Employer
+    ADD UNIQUE KEY uq_employer_user_company (UserID, CompanyID);
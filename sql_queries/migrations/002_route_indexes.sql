@@ -0,0 +1,14 @@
+-- Secondary indexes matched to the queries in flask_backend/app.py
+-- (InnoDB drops the implicit foreign key index a new index can replace)
+
+-- get_available_jobs: WHERE Status = 'Open' ORDER BY Date, JobOfferID (keyset)
+CREATE INDEX idx_joboffer_status_date ON JobOffer (Status, Date, JobOfferID);
+
+-- get_my_job_offers: WHERE CreatedBy = ? [AND Status = ?]
+CREATE INDEX idx_joboffer_createdby_status ON JobOffer (CreatedBy, Status);
+
+-- get_my_applications: WHERE WorkerID = ? [AND Status = ?]
+CREATE INDEX idx_application_worker_status ON Application (WorkerID, Status);
+
+-- delete_location / create_job_offer: WHERE CompanyID = ? [AND LocationID = ?]
+CREATE INDEX idx_location_company ON Location (CompanyID, LocationID);
@@ -0,0 +1,16 @@
+-- Let MySQL allocate IDs instead of SELECT MAX(...) + 1 in the create handlers
+-- (one statement per create, no duplicate keys between concurrent writers)
+
+-- The columns are referenced by foreign keys; their type does not change
+SET FOREIGN_KEY_CHECKS = 0;
+
+ALTER TABLE Company
+    MODIFY CompanyID INT NOT NULL AUTO_INCREMENT;
+
+ALTER TABLE Location
+    MODIFY LocationID INT NOT NULL AUTO_INCREMENT;
+
+ALTER TABLE JobOffer
+    MODIFY JobOfferID INT NOT NULL AUTO_INCREMENT;
+
+SET FOREIGN_KEY_CHECKS = 1;
@@ -0,0 +1,10 @@
+-- Indexes for the filters and sorts of GET /api/joboffers/available
+-- (flask_backend/job_search.py)
+
+-- sort=max_wage / -max_wage and min_wage / max_wage: WHERE Status = 'Open'
+-- ORDER BY MaxWage, JobOfferID (keyset, scanned backwards when descending)
+CREATE INDEX idx_joboffer_status_wage ON JobOffer (Status, MaxWage, JobOfferID);
+
+-- city=: Location lookup by City, then JobOffer rows of those locations
+CREATE INDEX idx_location_city ON Location (City, LocationID);
+CREATE INDEX idx_joboffer_location_status_date ON JobOffer (LocationID, Status, Date);
@@ -0,0 +1,9 @@
+-- FULLTEXT indexes behind GET /api/workers/search and GET /api/joboffers/search
+-- (flask_backend/search.py)
+
+-- Worker profiles: MATCH(Experiences, Description)
+CREATE FULLTEXT INDEX ft_worker_profile ON Worker (Experiences, Description);
+
+-- Job offers are matched through their company name and location address
+CREATE FULLTEXT INDEX ft_company_name ON Company (Name);
+CREATE FULLTEXT INDEX ft_location_address ON Location (Street, City);
@@ -0,0 +1,8 @@
+-- Coordinates of each location, for GET /api/joboffers/nearby (flask_backend/geo.py)
+-- NULL until known: such locations are simply never "nearby"
+ALTER TABLE Location
+    ADD COLUMN Latitude DECIMAL(9, 6) NULL,
+    ADD COLUMN Longitude DECIMAL(9, 6) NULL;
+
+-- Bounding box prefilter: range on Latitude, Longitude checked from the index
+CREATE INDEX idx_location_lat_lon ON Location (Latitude, Longitude);
@@ -0,0 +1,64 @@
+-- Per job offer application summary behind GET /api/employers/<id>/dashboard,
+-- kept up to date by triggers on Application so every writer (API routes,
+-- batch endpoints, data_generation/load_data.py) maintains it.
+-- Average wage offer = WageOfferSum / Applicants.
+--
+-- Verify or recompute from scratch: python sql_queries/rebuild_stats.py --check
+--
+-- With binary logging on, creating triggers needs SUPER or
+-- log_bin_trust_function_creators = 1.
+
+CREATE TABLE IF NOT EXISTS ApplicationStats (
+    JobOfferID INT PRIMARY KEY,
+    Applicants INT NOT NULL DEFAULT 0,
+    Pending INT NOT NULL DEFAULT 0,
+    Accepted INT NOT NULL DEFAULT 0,
+    Refused INT NOT NULL DEFAULT 0,
+    WageOfferSum DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    MinWageOffer DECIMAL(10, 2) NULL,
+    FOREIGN KEY (JobOfferID) REFERENCES JobOffer(JobOfferID)
+);
+
+CREATE TRIGGER trg_application_stats_insert AFTER INSERT ON Application
+FOR EACH ROW
+    INSERT INTO ApplicationStats (JobOfferID, Applicants, Pending, Accepted, Refused, WageOfferSum, MinWageOffer)
+    VALUES (NEW.JobOfferID, 1, NEW.Status = 'Pending', NEW.Status = 'Accepted', NEW.Status = 'Refused',
+            IFNULL(NEW.WageOffer, 0), NEW.WageOffer)
+    ON DUPLICATE KEY UPDATE
+        Applicants = Applicants + 1,
+        Pending = Pending + (NEW.Status = 'Pending'),
+        Accepted = Accepted + (NEW.Status = 'Accepted'),
+        Refused = Refused + (NEW.Status = 'Refused'),
+        WageOfferSum = WageOfferSum + IFNULL(NEW.WageOffer, 0),
+        MinWageOffer = IF(MinWageOffer IS NULL, NEW.WageOffer, LEAST(MinWageOffer, IFNULL(NEW.WageOffer, MinWageOffer)));
+
+-- Status changes only move counters; a changed wage (not done by the API)
+-- recomputes the minimum of that offer
+CREATE TRIGGER trg_application_stats_update AFTER UPDATE ON Application
+FOR EACH ROW
+    UPDATE ApplicationStats SET
+        Pending = Pending + (NEW.Status = 'Pending') - (OLD.Status = 'Pending'),
+        Accepted = Accepted + (NEW.Status = 'Accepted') - (OLD.Status = 'Accepted'),
+        Refused = Refused + (NEW.Status = 'Refused') - (OLD.Status = 'Refused'),
+        WageOfferSum = WageOfferSum + IFNULL(NEW.WageOffer, 0) - IFNULL(OLD.WageOffer, 0),
+        MinWageOffer = IF(NEW.WageOffer <=> OLD.WageOffer, MinWageOffer,
+                          (SELECT MIN(WageOffer) FROM Application WHERE JobOfferID = NEW.JobOfferID))
+    WHERE JobOfferID = NEW.JobOfferID;
+
+CREATE TRIGGER trg_application_stats_delete AFTER DELETE ON Application
+FOR EACH ROW
+    UPDATE ApplicationStats SET
+        Applicants = Applicants - 1,
+        Pending = Pending - (OLD.Status = 'Pending'),
+        Accepted = Accepted - (OLD.Status = 'Accepted'),
+        Refused = Refused - (OLD.Status = 'Refused'),
+        WageOfferSum = WageOfferSum - IFNULL(OLD.WageOffer, 0),
+        MinWageOffer = (SELECT MIN(WageOffer) FROM Application WHERE JobOfferID = OLD.JobOfferID)
+    WHERE JobOfferID = OLD.JobOfferID;
+
+-- Backfill from the applications already there
+INSERT INTO ApplicationStats (JobOfferID, Applicants, Pending, Accepted, Refused, WageOfferSum, MinWageOffer)
+SELECT JobOfferID, COUNT(*), SUM(Status = 'Pending'), SUM(Status = 'Accepted'), SUM(Status = 'Refused'),
+       IFNULL(SUM(WageOffer), 0), MIN(WageOffer)
+FROM Application
+GROUP BY JobOfferID;
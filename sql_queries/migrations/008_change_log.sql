@@ -0,0 +1,19 @@
+-- Transactional outbox behind GET /api/feed (flask_backend/feed.py): the
+-- write routes insert one row per change in the same transaction as the
+-- change itself, so the feed never announces a rolled back write nor misses
+-- a committed one.
+--   job_offer    offer status changes (Open when created, Completed)
+--   application  application status changes (Accepted, Refused)
+-- ChangeID is the event ID clients resume from (Last-Event-ID).
+
+CREATE TABLE IF NOT EXISTS ChangeLog (
+    ChangeID BIGINT AUTO_INCREMENT PRIMARY KEY,
+    Kind ENUM('job_offer', 'application') NOT NULL,
+    JobOfferID INT NOT NULL,
+    WorkerID INT NULL,
+    Status VARCHAR(16) NOT NULL,
+    CreatedAt TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3)
+);
+
+-- Retention: rows older than FEED_RETENTION_DAYS are pruned by CreatedAt
+CREATE INDEX idx_changelog_created ON ChangeLog (CreatedAt);
@@ -0,0 +1,17 @@
+-- R-tree index for GET /api/joboffers/nearby (flask_backend/geo.py).
+-- A B-tree on (Latitude, Longitude) only narrows on Latitude: a bounding
+-- box scanned a whole latitude band, across every longitude.
+--
+-- Position is POINT(Longitude, Latitude) in degrees, kept in sync by MySQL.
+-- SRID 0 (planar): the bounding box of geo.py is a rectangle in degrees,
+-- which ST_MakeEnvelope builds in that SRS only; exact distances still come
+-- from ST_Distance_Sphere. A SPATIAL index needs NOT NULL, so locations
+-- without coordinates sit at (1000, 1000), outside every box.
+ALTER TABLE Location
+    ADD COLUMN Position POINT SRID 0 GENERATED ALWAYS AS (
+        IF(Latitude IS NULL OR Longitude IS NULL, POINT(1000, 1000), POINT(Longitude, Latitude))
+    ) STORED NOT NULL;
+
+CREATE SPATIAL INDEX sidx_location_position ON Location (Position);
+
+DROP INDEX idx_location_lat_lon ON Location;
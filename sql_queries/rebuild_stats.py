@@ -0,0 +1,74 @@
+import argparse
+
+from migrate import get_db_connection
+
+# Verifies and recomputes the ApplicationStats summary table
+# (migrations/007_application_stats.sql) from the Application rows.
+#
+#   python sql_queries/rebuild_stats.py --check   list offers whose summary drifted
+#   python sql_queries/rebuild_stats.py           recompute every summary
+
+COMPUTED = """
+    SELECT JobOfferID, COUNT(*) as Applicants, SUM(Status = 'Pending') as Pending,
+           SUM(Status = 'Accepted') as Accepted, SUM(Status = 'Refused') as Refused,
+           IFNULL(SUM(WageOffer), 0) as WageOfferSum, MIN(WageOffer) as MinWageOffer
+    FROM Application
+    GROUP BY JobOfferID
+"""
+
+# Offers whose stored summary differs from the recomputed one, including
+# summaries left over for offers without applications
+DRIFT_QUERY = f"""
+    SELECT a.JobOfferID, s.Applicants as Stored, a.Applicants as Computed
+    FROM ({COMPUTED}) as a
+    LEFT JOIN ApplicationStats as s ON s.JobOfferID = a.JobOfferID
+    WHERE NOT (s.Applicants <=> a.Applicants AND s.Pending <=> a.Pending
+               AND s.Accepted <=> a.Accepted AND s.Refused <=> a.Refused
+               AND s.WageOfferSum <=> a.WageOfferSum AND s.MinWageOffer <=> a.MinWageOffer)
+    UNION ALL
+    SELECT s.JobOfferID, s.Applicants, 0
+    FROM ApplicationStats as s
+    WHERE s.Applicants != 0
+      AND NOT EXISTS (SELECT 1 FROM Application WHERE JobOfferID = s.JobOfferID)
+"""
+
+
+def check(conn):
+    cursor = conn.cursor()
+    cursor.execute(DRIFT_QUERY)
+    drifted = cursor.fetchall()
+    cursor.close()
+    for job_offer_id, stored, computed in drifted:
+        print(f"  JobOffer {job_offer_id}: {stored} applicants stored, {computed} computed")
+    print(f"{len(drifted)} job offers out of sync.")
+    return not drifted
+
+
+def rebuild(conn):
+    # One transaction: readers keep the old summary until the commit, and the
+    # triggers of concurrent writers wait on the rows being rewritten
+    cursor = conn.cursor()
+    conn.start_transaction()
+    cursor.execute("DELETE FROM ApplicationStats")
+    cursor.execute(f"""
+        INSERT INTO ApplicationStats (JobOfferID, Applicants, Pending, Accepted, Refused, WageOfferSum, MinWageOffer)
+        {COMPUTED}
+    """)
+    rebuilt = cursor.rowcount
+    conn.commit()
+    cursor.close()
+    print(f"Rebuilt the summary of {rebuilt} job offers.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Verify or rebuild the ApplicationStats summary table")
+    parser.add_argument('--check', action='store_true', help="only report drifted summaries (exit code 1 if any)")
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    if args.check:
+        ok = check(conn)
+        conn.close()
+        raise SystemExit(0 if ok else 1)
+    rebuild(conn)
+    conn.close()